@@ -3,7 +3,7 @@ import { Link, useLocation } from 'react-router-dom';
 import { useState, useEffect } from 'react';
 import { clearAuthToken, getAuthToken } from '../../lib/auth';
 import { getMyProfile } from '../../lib/api';
-import { DEFAULT_AVATAR, getDefaultDashboardPath, getProfileDisplayName, hasRole, PROFILE_UPDATED_EVENT, resolveAvatarUrl } from '../../lib/profile';
+import { DEFAULT_AVATAR, getDefaultDashboardPath, getProfileDisplayName, hasRole, PROFILE_UPDATED_EVENT, resolveAvatarThumbnailUrl } from '../../lib/profile';
 import type { UserProfile } from '../../types';
 
 const Navbar = () => {
@@ -48,7 +48,7 @@ const Navbar = () => {
         setIsLoggedIn(true);
         setProfileName(getProfileDisplayName(profile.full_name, profile.email));
         setProfileEmail(profile.email);
-        setProfileAvatar(resolveAvatarUrl(profile.avatar_url));
+        setProfileAvatar(resolveAvatarThumbnailUrl(profile));
         setDashboardPath(getDefaultDashboardPath(profile));
         setSettingsPath(getDefaultDashboardPath(profile) === '/dashboard' ? '/dashboard/settings' : '/user-dashboard/settings');
         setCanSwitchToOwner(hasRole(profile.roles, 'vehicle_owner'));
@@ -74,7 +74,7 @@ const Navbar = () => {
       setIsLoggedIn(true);
       setProfileName(getProfileDisplayName(profile.full_name, profile.email));
       setProfileEmail(profile.email);
-      setProfileAvatar(resolveAvatarUrl(profile.avatar_url));
+      setProfileAvatar(resolveAvatarThumbnailUrl(profile));
       setDashboardPath(getDefaultDashboardPath(profile));
       setSettingsPath(getDefaultDashboardPath(profile) === '/dashboard' ? '/dashboard/settings' : '/user-dashboard/settings');
       setCanSwitchToOwner(hasRole(profile.roles, 'vehicle_owner'));
@@ -3,7 +3,7 @@ import { Link } from 'react-router-dom';
 import { useEffect, useState } from 'react';
 import { clearAuthToken } from '../../lib/auth';
 import { getMyProfile } from '../../lib/api';
-import { DEFAULT_AVATAR, getProfileDisplayName, getRoleLabel, hasRole, PROFILE_UPDATED_EVENT, resolveAvatarUrl } from '../../lib/profile';
+import { DEFAULT_AVATAR, getProfileDisplayName, getRoleLabel, hasRole, PROFILE_UPDATED_EVENT, resolveAvatarThumbnailUrl } from '../../lib/profile';
 import type { UserProfile } from '../../types';
 
 const DashboardNavbar = () => {
@@ -19,7 +19,7 @@ const DashboardNavbar = () => {
                 const profile = await getMyProfile();
                 setUserName(getProfileDisplayName(profile.full_name, profile.email));
                 setRoleLabel(getRoleLabel(profile.roles));
-                setAvatarSrc(resolveAvatarUrl(profile.avatar_url));
+                setAvatarSrc(resolveAvatarThumbnailUrl(profile));
                 setRenterDestination(hasRole(profile.roles, 'renter') || hasRole(profile.roles, 'user') ? '/user-dashboard' : '/');
             } catch {
                 // Keep fallback labels if profile request fails.
@@ -35,7 +35,7 @@ const DashboardNavbar = () => {
 
             setUserName(getProfileDisplayName(profile.full_name, profile.email));
             setRoleLabel(getRoleLabel(profile.roles));
-            setAvatarSrc(resolveAvatarUrl(profile.avatar_url));
+            setAvatarSrc(resolveAvatarThumbnailUrl(profile));
             setRenterDestination(hasRole(profile.roles, 'renter') || hasRole(profile.roles, 'user') ? '/user-dashboard' : '/');
         };
 
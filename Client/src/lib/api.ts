@@ -1,4 +1,13 @@
-import type { AuthResponse, OwnerEarningsOverview, PublicUserProfile, RentApi, UserProfile, UserRole, VehicleApi } from '../types';
+import type {
+  AuthResponse,
+  OwnerEarningsOverview,
+  PublicUserProfile,
+  RentApi,
+  UserProfile,
+  UserRole,
+  VehicleApi,
+  VehicleFacetsApi,
+} from '../types';
 import { clearAuthToken, getAuthToken } from './auth';
 import { notifyProfileUpdated } from './profile';
 
@@ -7,6 +16,16 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000
 type RequestMethod = 'GET' | 'POST' | 'PATCH' | 'DELETE';
 type RawVehicleApi = VehicleApi & { _id?: string };
 type RawRentApi = RentApi & { _id?: string };
+export type Page<T> = { items: T[]; next_cursor: string | null };
+
+class ApiError extends Error {
+  readonly status: number;
+
+  constructor(message: string, status: number) {
+    super(message);
+    this.status = status;
+  }
+}
 
 function normalizeVehicle(vehicle: RawVehicleApi): VehicleApi {
   const urls = Array.isArray(vehicle.image_urls) ? vehicle.image_urls.filter(Boolean) : [];
@@ -69,7 +88,7 @@ async function apiRequest<T>(
       clearAuthToken();
     }
 
-    throw new Error(errorMessage);
+    throw new ApiError(errorMessage, response.status);
   }
 
   if (response.status === 204) {
@@ -79,6 +98,25 @@ async function apiRequest<T>(
   return response.json() as Promise<T>;
 }
 
+function withCursor(path: string, cursor?: string | null): string {
+  if (!cursor) return path;
+  const separator = path.includes('?') ? '&' : '?';
+  return `${path}${separator}cursor=${encodeURIComponent(cursor)}`;
+}
+
+// Walks every page. Only for lists that must be complete, such as the owner's own fleet used to
+// label rents; listings shown to the user load one page and follow `next_cursor` on demand.
+async function fetchAllPages<T>(path: string, useAuth = false): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const page: Page<T> = await apiRequest<Page<T>>(withCursor(path, cursor), 'GET', undefined, useAuth);
+    items.push(...page.items);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return items;
+}
+
 export async function loginWithEmail(email: string, password: string): Promise<AuthResponse> {
   return apiRequest<AuthResponse>('/auth/login', 'POST', { email, password });
 }
@@ -130,23 +168,58 @@ export async function registerSocial(
   await apiRequest('/auth/register/social', 'POST', payload, true, idToken);
 }
 
-export async function getPublicVehicles(): Promise<VehicleApi[]> {
-  const vehicles = await apiRequest<RawVehicleApi[]>('/vehicles');
-  return vehicles.map(normalizeVehicle);
+export type VehicleSearchFilters = {
+  types?: string[];
+  fuels?: string[];
+};
+
+function vehicleSearchQuery(filters: VehicleSearchFilters): URLSearchParams {
+  const query = new URLSearchParams();
+  filters.types?.forEach((type) => query.append('type', type));
+  filters.fuels?.forEach((fuel) => query.append('fuel', fuel));
+  return query;
+}
+
+export async function searchPublicVehicles(
+  filters: VehicleSearchFilters,
+  cursor?: string | null,
+  limit = 24,
+): Promise<Page<VehicleApi>> {
+  const query = vehicleSearchQuery(filters);
+  query.set('limit', String(limit));
+  if (cursor) query.set('cursor', cursor);
+  const page = await apiRequest<Page<RawVehicleApi>>(`/vehicles/search?${query.toString()}`);
+  return { items: page.items.map(normalizeVehicle), next_cursor: page.next_cursor };
+}
+
+export async function getVehicleFacets(filters: VehicleSearchFilters): Promise<VehicleFacetsApi> {
+  const query = vehicleSearchQuery(filters).toString();
+  return apiRequest<VehicleFacetsApi>(query ? `/vehicles/facets?${query}` : '/vehicles/facets');
 }
 
 export async function getPublicVehicleById(vehicleId: string): Promise<VehicleApi | null> {
-  const vehicles = await getPublicVehicles();
-  return vehicles.find((vehicle) => vehicle.vehicleid === vehicleId) || null;
+  try {
+    const vehicle = await apiRequest<RawVehicleApi>(`/vehicles/public/${encodeURIComponent(vehicleId)}`);
+    return normalizeVehicle(vehicle);
+  } catch (err) {
+    if (err instanceof ApiError && err.status === 404) return null;
+    throw err;
+  }
 }
 
-export async function getMyRents(): Promise<RentApi[]> {
-  const rents = await apiRequest<RawRentApi[]>('/rents/', 'GET', undefined, true);
-  return rents.map(normalizeRent);
+export async function getMyRentsPage(cursor?: string | null, limit = 20): Promise<Page<RentApi>> {
+  const page = await apiRequest<Page<RawRentApi>>(withCursor(`/rents/?limit=${limit}`, cursor), 'GET', undefined, true);
+  return { items: page.items.map(normalizeRent), next_cursor: page.next_cursor };
+}
+
+export async function getOwnerRentsPage(cursor?: string | null, limit = 20): Promise<Page<RentApi>> {
+  const page = await apiRequest<Page<RawRentApi>>(withCursor(`/rents/owner?limit=${limit}`, cursor), 'GET', undefined, true);
+  return { items: page.items.map(normalizeRent), next_cursor: page.next_cursor };
 }
 
+// The dashboard's booking counts and pending list are computed over every rent the owner has.
 export async function getOwnerRents(): Promise<RentApi[]> {
-  const rents = await apiRequest<RawRentApi[]>('/rents/owner', 'GET', undefined, true);
+  const rents = await fetchAllPages<RawRentApi>('/rents/owner?limit=200', true);
   return rents.map(normalizeRent);
 }
 
@@ -155,7 +228,7 @@ export async function getOwnerEarnings(): Promise<OwnerEarningsOverview> {
 }
 
 export async function getMyVehicles(): Promise<VehicleApi[]> {
-  const vehicles = await apiRequest<RawVehicleApi[]>('/vehicles/', 'GET', undefined, true);
+  const vehicles = await fetchAllPages<RawVehicleApi>('/vehicles/?limit=200', true);
   return vehicles.map(normalizeVehicle);
 }
 
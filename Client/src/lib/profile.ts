@@ -1,4 +1,4 @@
-import type { UserProfile, UserRole } from '../types';
+import type { UserProfile, UserRole, VehicleApi } from '../types';
 
 export const DEFAULT_AVATAR =
   'https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?auto=format&fit=facearea&facepad=2&w=256&h=256&q=80';
@@ -102,6 +102,17 @@ export function resolveAvatarUrl(avatarUrl?: string | null): string {
   return resolveBackendAssetUrl(avatarUrl, DEFAULT_AVATAR);
 }
 
+export function resolveAvatarThumbnailUrl(profile: Pick<UserProfile, 'avatar_url' | 'avatar_variants'>): string {
+  return resolveAvatarUrl(profile.avatar_variants?.thumbnail_url || profile.avatar_url);
+}
+
+export function getVehicleThumbnail(vehicle: Pick<VehicleApi, 'thumbnail_url' | 'image_urls' | 'image_url'>): string {
+  if (vehicle.thumbnail_url) {
+    return resolveBackendAssetUrl(vehicle.thumbnail_url, getPrimaryVehicleImage(vehicle.image_urls, vehicle.image_url));
+  }
+  return getPrimaryVehicleImage(vehicle.image_urls, vehicle.image_url);
+}
+
 export function getPrimaryVehicleImage(
   imageUrls?: string[] | null,
   legacyImageUrl?: string | null,
@@ -1,49 +1,84 @@
-import React, { useState, useMemo } from 'react';
+import React, { useState } from 'react';
 import CarCard from '../components/cards/CarCard';
 import { Filter, X } from 'lucide-react';
-import { getPublicVehicles } from '../lib/api';
-import { getPrimaryVehicleImage } from '../lib/profile';
-import type { Car } from '../types';
+import { getVehicleFacets, searchPublicVehicles } from '../lib/api';
+import { getVehicleThumbnail } from '../lib/profile';
+import type { Car, VehicleApi, VehicleFacetCountApi, VehicleFacetsApi } from '../types';
 
 const VEHICLE_TYPES = ['Sedan', 'SUV', 'Coupe', 'Hatchback', 'Convertible', 'Truck'];
 const FUEL_TYPES = ['Petrol', 'Diesel', 'Electric', 'Hybrid'];
 
+function toCar(vehicle: VehicleApi): Car {
+    return {
+        id: vehicle.vehicleid,
+        name: `${vehicle.brand} ${vehicle.model}`,
+        price: vehicle.price,
+        rating: 4.8,
+        reviews: 0,
+        location: vehicle.location,
+        seats: vehicle.seats ?? 5,
+        type: vehicle.type,
+        fuelType: vehicle.fuel,
+        image: getVehicleThumbnail(vehicle),
+    };
+}
+
+// The known options first, then any other value the catalog has, each with its count.
+function facetOptions(known: string[], counts: VehicleFacetCountApi[] | undefined): { value: string; count?: number }[] {
+    const byValue = new Map((counts ?? []).map((facet) => [String(facet.value), facet.count]));
+    const extra = [...byValue.keys()].filter((value) => !known.includes(value));
+    return [...known, ...extra].map((value) => ({ value, count: counts ? byValue.get(value) ?? 0 : undefined }));
+}
+
 const SearchVehicles: React.FC = () => {
     const [vehicles, setVehicles] = React.useState<Car[]>([]);
+    const [facets, setFacets] = React.useState<VehicleFacetsApi | null>(null);
+    const [nextCursor, setNextCursor] = React.useState<string | null>(null);
     const [loading, setLoading] = React.useState(true);
+    const [loadingMore, setLoadingMore] = React.useState(false);
     const [error, setError] = React.useState('');
     const [selectedTypes, setSelectedTypes] = useState<string[]>([]);
     const [selectedFuelTypes, setSelectedFuelTypes] = useState<string[]>([]);
     const [showFilters, setShowFilters] = useState(false);
 
     React.useEffect(() => {
+        let cancelled = false;
+        const filters = { types: selectedTypes, fuels: selectedFuelTypes };
         const loadVehicles = async () => {
             setLoading(true);
             setError('');
             try {
-                const result = await getPublicVehicles();
-                const mapped = result.map((vehicle) => ({
-                    id: vehicle.vehicleid,
-                    name: `${vehicle.brand} ${vehicle.model}`,
-                    price: vehicle.price,
-                    rating: 4.8,
-                    reviews: 0,
-                    location: vehicle.location,
-                    seats: vehicle.seats ?? 5,
-                    type: vehicle.type,
-                    fuelType: vehicle.fuel,
-                    image: getPrimaryVehicleImage(vehicle.image_urls, vehicle.image_url),
-                }));
-                setVehicles(mapped);
+                const [page, counts] = await Promise.all([searchPublicVehicles(filters), getVehicleFacets(filters)]);
+                if (cancelled) return;
+                setVehicles(page.items.map(toCar));
+                setNextCursor(page.next_cursor);
+                setFacets(counts);
             } catch (err) {
-                setError(err instanceof Error ? err.message : 'Failed to load vehicles');
+                if (!cancelled) setError(err instanceof Error ? err.message : 'Failed to load vehicles');
             } finally {
-                setLoading(false);
+                if (!cancelled) setLoading(false);
             }
         };
 
         void loadVehicles();
-    }, []);
+        return () => {
+            cancelled = true;
+        };
+    }, [selectedTypes, selectedFuelTypes]);
+
+    const loadMore = async () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        try {
+            const page = await searchPublicVehicles({ types: selectedTypes, fuels: selectedFuelTypes }, nextCursor);
+            setVehicles(prev => [...prev, ...page.items.map(toCar)]);
+            setNextCursor(page.next_cursor);
+        } catch (err) {
+            setError(err instanceof Error ? err.message : 'Failed to load vehicles');
+        } finally {
+            setLoadingMore(false);
+        }
+    };
 
     const toggleType = (type: string) => {
         setSelectedTypes(prev =>
@@ -61,13 +96,9 @@ const SearchVehicles: React.FC = () => {
         );
     };
 
-    const filteredVehicles = useMemo(() => {
-        return vehicles.filter(car => {
-            const typeMatch = selectedTypes.length === 0 || (car.type && selectedTypes.includes(car.type));
-            const fuelMatch = selectedFuelTypes.length === 0 || (car.fuelType && selectedFuelTypes.includes(car.fuelType));
-            return typeMatch && fuelMatch;
-        });
-    }, [vehicles, selectedTypes, selectedFuelTypes]);
+    const typeOptions = facetOptions(VEHICLE_TYPES, facets?.type);
+    const fuelOptions = facetOptions(FUEL_TYPES, facets?.fuel);
+    const resultCount = facets?.total ?? vehicles.length;
 
     const clearFilters = () => {
         setSelectedTypes([]);
@@ -106,7 +137,7 @@ const SearchVehicles: React.FC = () => {
                             <div className="mb-8">
                                 <h4 className="font-medium mb-3 text-gray-900">Vehicle Type</h4>
                                 <div className="space-y-2">
-                                    {VEHICLE_TYPES.map(type => (
+                                    {typeOptions.map(({ value: type, count }) => (
                                         <label key={type} className="flex items-center gap-2 cursor-pointer group">
                                             <div className={`w-5 h-5 rounded border flex items-center justify-center transition-colors ${selectedTypes.includes(type) ? 'bg-orange-500 border-orange-500' : 'border-gray-300 group-hover:border-orange-400'}`}>
                                                 {selectedTypes.includes(type) && <Filter size={12} className="text-white" />}
@@ -120,6 +151,7 @@ const SearchVehicles: React.FC = () => {
                                             <span className={`text-sm ${selectedTypes.includes(type) ? 'text-gray-900 font-medium' : 'text-gray-600'}`}>
                                                 {type}
                                             </span>
+                                            {count !== undefined && <span className="ml-auto text-xs text-gray-400">{count}</span>}
                                         </label>
                                     ))}
                                 </div>
@@ -129,7 +161,7 @@ const SearchVehicles: React.FC = () => {
                             <div>
                                 <h4 className="font-medium mb-3 text-gray-900">Fuel Type</h4>
                                 <div className="space-y-2">
-                                    {FUEL_TYPES.map(type => (
+                                    {fuelOptions.map(({ value: type, count }) => (
                                         <label key={type} className="flex items-center gap-2 cursor-pointer group">
                                             <div className={`w-5 h-5 rounded border flex items-center justify-center transition-colors ${selectedFuelTypes.includes(type) ? 'bg-orange-500 border-orange-500' : 'border-gray-300 group-hover:border-orange-400'}`}>
                                                 {selectedFuelTypes.includes(type) && <Filter size={12} className="text-white" />}
@@ -143,6 +175,7 @@ const SearchVehicles: React.FC = () => {
                                             <span className={`text-sm ${selectedFuelTypes.includes(type) ? 'text-gray-900 font-medium' : 'text-gray-600'}`}>
                                                 {type}
                                             </span>
+                                            {count !== undefined && <span className="ml-auto text-xs text-gray-400">{count}</span>}
                                         </label>
                                     ))}
                                 </div>
@@ -156,7 +189,7 @@ const SearchVehicles: React.FC = () => {
                             <div>
                                 <h1 className="text-2xl font-bold text-gray-900">Available Vehicles</h1>
                                 <p className="text-gray-500 mt-1">
-                                    Showing {filteredVehicles.length} result{filteredVehicles.length !== 1 ? 's' : ''}
+                                    Showing {resultCount} result{resultCount !== 1 ? 's' : ''}
                                 </p>
                             </div>
                         </div>
@@ -169,12 +202,25 @@ const SearchVehicles: React.FC = () => {
                             <div className="text-center py-20 bg-white rounded-xl shadow-sm border border-dashed border-red-200">
                                 <p className="text-red-600">{error}</p>
                             </div>
-                        ) : filteredVehicles.length > 0 ? (
-                            <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
-                                {filteredVehicles.map(car => (
-                                    <CarCard key={car.id} {...car} />
-                                ))}
-                            </div>
+                        ) : vehicles.length > 0 ? (
+                            <>
+                                <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
+                                    {vehicles.map(car => (
+                                        <CarCard key={car.id} {...car} />
+                                    ))}
+                                </div>
+                                {nextCursor && (
+                                    <div className="text-center mt-8">
+                                        <button
+                                            onClick={() => void loadMore()}
+                                            disabled={loadingMore}
+                                            className="px-6 py-2 rounded-lg border border-gray-300 bg-white text-gray-700 font-medium hover:border-orange-400 disabled:opacity-50"
+                                        >
+                                            {loadingMore ? 'Loading...' : 'Load more'}
+                                        </button>
+                                    </div>
+                                )}
+                            </>
                         ) : (
                             <div className="text-center py-20 bg-white rounded-xl shadow-sm border border-dashed border-gray-300">
                                 <div className="inline-flex justify-center items-center w-16 h-16 rounded-full bg-gray-100 mb-4">
@@ -2,9 +2,10 @@ import React from 'react';
 import { Calendar, Eye } from 'lucide-react';
 import LoadingScreen from '../../components/common/LoadingScreen';
 import Modal from '../../components/common/Modal';
-import { acceptOwnerRent, cancelOwnerRent, completeOwnerRent, getMyVehicles, getOwnerRents, getUserPublicProfile } from '../../lib/api';
+import { acceptOwnerRent, cancelOwnerRent, completeOwnerRent, getMyVehicles, getOwnerRentsPage, getUserPublicProfile } from '../../lib/api';
 import { formatLkr } from '../../lib/currency';
 import { getProfileDisplayName } from '../../lib/profile';
+import type { RentApi } from '../../types';
 
 type BookingRequestRow = {
   id: string;
@@ -21,6 +22,17 @@ type BookingRequestRow = {
   note: string | null;
 };
 
+const statusOrder: Record<BookingRequestRow['status'], number> = {
+  Pending: 0,
+  Accepted: 1,
+  Completed: 2,
+  Cancelled: 3,
+};
+
+// Pending requests first; within a status the server's newest-first order is kept.
+const sortByStatus = (rows: BookingRequestRow[]) =>
+  [...rows].sort((a, b) => statusOrder[a.status] - statusOrder[b.status]);
+
 const BookingRequests = () => {
   const [requests, setRequests] = React.useState<BookingRequestRow[]>([]);
   const [loading, setLoading] = React.useState(true);
@@ -28,26 +40,16 @@ const BookingRequests = () => {
   const [search, setSearch] = React.useState('');
   const [selectedRequest, setSelectedRequest] = React.useState<BookingRequestRow | null>(null);
   const [submittingId, setSubmittingId] = React.useState<string | null>(null);
+  const [nextCursor, setNextCursor] = React.useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = React.useState(false);
+  // Looked up once and reused for every page of requests.
+  const vehicleByIdRef = React.useRef<Map<string, { name: string; price: number }> | null>(null);
+  const renterNameByUidRef = React.useRef(new Map<string, string>());
 
-  const loadRequests = React.useCallback(async () => {
-    setLoading(true);
-    setError('');
-    try {
-      const [rents, vehicles] = await Promise.all([getOwnerRents(), getMyVehicles()]);
-      const renterIds = Array.from(new Set(rents.map((rent) => rent.renter_uid)));
-      const renterEntries = await Promise.all(
-        renterIds.map(async (uid) => {
-          try {
-            const profile = await getUserPublicProfile(uid);
-            return [uid, getProfileDisplayName(profile.full_name, profile.email)] as const;
-          } catch {
-            return [uid, uid] as const;
-          }
-        }),
-      );
-      const renterNameByUid = new Map(renterEntries);
-
-      const vehicleById = new Map(
+  const toRows = React.useCallback(async (rents: RentApi[]) => {
+    if (!vehicleByIdRef.current) {
+      const vehicles = await getMyVehicles();
+      vehicleByIdRef.current = new Map(
         vehicles.map((vehicle) => [
           vehicle.vehicleid,
           {
@@ -56,57 +58,89 @@ const BookingRequests = () => {
           },
         ]),
       );
+    }
+    const vehicleById = vehicleByIdRef.current;
 
-      const mapped = rents.map<BookingRequestRow>((rent) => {
-        const vehicleInfo = vehicleById.get(rent.vehicle_id);
-        const start = new Date(rent.start_date);
-        const end = new Date(rent.end_date);
-        const days = Math.max(1, Math.ceil((end.getTime() - start.getTime()) / (1000 * 60 * 60 * 24)));
-        const amount = vehicleInfo ? vehicleInfo.price * days : 0;
-        const status: BookingRequestRow['status'] =
-          rent.booking_status === 'cancelled'
-            ? 'Cancelled'
-            : rent.booking_status === 'completed' || end <= new Date()
-              ? 'Completed'
-              : rent.booking_status === 'accepted'
-                ? 'Accepted'
-                : 'Pending';
+    const renterNameByUid = renterNameByUidRef.current;
+    const renterIds = Array.from(new Set(rents.map((rent) => rent.renter_uid))).filter((uid) => !renterNameByUid.has(uid));
+    const renterEntries = await Promise.all(
+      renterIds.map(async (uid) => {
+        try {
+          const profile = await getUserPublicProfile(uid);
+          return [uid, getProfileDisplayName(profile.full_name, profile.email)] as const;
+        } catch {
+          return [uid, uid] as const;
+        }
+      }),
+    );
+    renterEntries.forEach(([uid, name]) => renterNameByUid.set(uid, name));
 
-        return {
-          id: rent.rentid,
-          renterUid: rent.renter_uid,
-          renterName: renterNameByUid.get(rent.renter_uid) || rent.renter_uid,
-          vehicleName: vehicleInfo?.name || `Vehicle #${rent.vehicle_id}`,
-          dateRange: `${start.toLocaleDateString()} - ${end.toLocaleDateString()}`,
-          amountLabel: amount > 0 ? formatLkr(amount) : '-',
-          status,
-          pickupOption: rent.pickup_option || 'self_pickup',
-          deliveryAddress: rent.delivery_address || null,
-          insurancePlan: rent.insurance_plan || 'basic',
-          childSeatCount: rent.child_seat_count ?? 0,
-          note: rent.note || null,
-        };
-      });
+    return rents.map<BookingRequestRow>((rent) => {
+      const vehicleInfo = vehicleById.get(rent.vehicle_id);
+      const start = new Date(rent.start_date);
+      const end = new Date(rent.end_date);
+      const days = Math.max(1, Math.ceil((end.getTime() - start.getTime()) / (1000 * 60 * 60 * 24)));
+      const amount = vehicleInfo ? vehicleInfo.price * days : 0;
+      const status: BookingRequestRow['status'] =
+        rent.booking_status === 'cancelled'
+          ? 'Cancelled'
+          : rent.booking_status === 'completed' || end <= new Date()
+            ? 'Completed'
+            : rent.booking_status === 'accepted'
+              ? 'Accepted'
+              : 'Pending';
 
-      const sortOrder: Record<BookingRequestRow['status'], number> = {
-        Pending: 0,
-        Accepted: 1,
-        Completed: 2,
-        Cancelled: 3,
+      return {
+        id: rent.rentid,
+        renterUid: rent.renter_uid,
+        renterName: renterNameByUid.get(rent.renter_uid) || rent.renter_uid,
+        vehicleName: vehicleInfo?.name || `Vehicle #${rent.vehicle_id}`,
+        dateRange: `${start.toLocaleDateString()} - ${end.toLocaleDateString()}`,
+        amountLabel: amount > 0 ? formatLkr(amount) : '-',
+        status,
+        pickupOption: rent.pickup_option || 'self_pickup',
+        deliveryAddress: rent.delivery_address || null,
+        insurancePlan: rent.insurance_plan || 'basic',
+        childSeatCount: rent.child_seat_count ?? 0,
+        note: rent.note || null,
       };
-      mapped.sort((a, b) => sortOrder[a.status] - sortOrder[b.status]);
-      setRequests(mapped);
+    });
+  }, []);
+
+  const loadRequests = React.useCallback(async () => {
+    setLoading(true);
+    setError('');
+    try {
+      const page = await getOwnerRentsPage();
+      const rows = await toRows(page.items);
+      setRequests(sortByStatus(rows));
+      setNextCursor(page.next_cursor);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load booking requests');
     } finally {
       setLoading(false);
     }
-  }, []);
+  }, [toRows]);
 
   React.useEffect(() => {
     void loadRequests();
   }, [loadRequests]);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await getOwnerRentsPage(nextCursor);
+      const rows = await toRows(page.items);
+      setRequests((current) => sortByStatus([...current, ...rows]));
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'Failed to load booking requests');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleAccept = async (request: BookingRequestRow) => {
     if (!request.id) {
       setError('This booking request is missing an ID and cannot be accepted.');
@@ -293,6 +327,18 @@ const BookingRequests = () => {
         </div>
       )}
 
+      {nextCursor && (
+        <div className="text-center">
+          <button
+            onClick={() => void loadMore()}
+            disabled={loadingMore}
+            className="px-6 py-2 rounded-lg bg-white border border-gray-200 text-gray-700 text-sm font-bold hover:bg-gray-50 transition disabled:opacity-60 disabled:cursor-not-allowed"
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
+
       <Modal
         isOpen={selectedRequest !== null}
         onClose={() => setSelectedRequest(null)}
@@ -1,6 +1,6 @@
 import React from 'react';
 import { Calendar, Clock } from 'lucide-react';
-import { getMyRents, getPublicVehicles, getUserPublicProfile } from '../../lib/api';
+import { getMyRentsPage, getPublicVehicleById, getUserPublicProfile } from '../../lib/api';
 import LoadingScreen from '../../components/common/LoadingScreen';
 import { getPrimaryVehicleImage, getProfileDisplayName } from '../../lib/profile';
 import type { RentApi } from '../../types';
@@ -16,42 +16,58 @@ const UserBookings = () => {
     const [displayByRentId, setDisplayByRentId] = React.useState<Map<string, BookingDisplay>>(new Map());
     const [loading, setLoading] = React.useState(true);
     const [error, setError] = React.useState('');
+    const [nextCursor, setNextCursor] = React.useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = React.useState(false);
+
+    // Only the vehicles and owners on the loaded bookings are looked up, one request each.
+    const describe = React.useCallback(async (rents: RentApi[]) => {
+        const [vehicleEntries, ownerEntries] = await Promise.all([
+            Promise.all(
+                Array.from(new Set(rents.map((booking) => booking.vehicle_id))).map(async (vehicleId) => {
+                    try {
+                        return [vehicleId, await getPublicVehicleById(vehicleId)] as const;
+                    } catch {
+                        return [vehicleId, null] as const;
+                    }
+                }),
+            ),
+            Promise.all(
+                Array.from(new Set(rents.map((booking) => booking.owner_uid))).map(async (uid) => {
+                    try {
+                        const profile = await getUserPublicProfile(uid);
+                        return [uid, getProfileDisplayName(profile.full_name, profile.email)] as const;
+                    } catch {
+                        return [uid, 'Owner'] as const;
+                    }
+                }),
+            ),
+        ]);
+
+        const vehicleById = new Map(vehicleEntries);
+        const ownerNameByUid = new Map(ownerEntries);
+
+        return rents.map((booking) => {
+            const vehicle = vehicleById.get(booking.vehicle_id);
+            return [
+                booking.rentid,
+                {
+                    ownerName: ownerNameByUid.get(booking.owner_uid) || 'Owner',
+                    vehicleName: vehicle ? `${vehicle.brand} ${vehicle.model}` : 'Vehicle',
+                    vehicleImage: getPrimaryVehicleImage(vehicle?.image_urls, vehicle?.image_url),
+                },
+            ] as const;
+        });
+    }, []);
 
     React.useEffect(() => {
         const loadBookings = async () => {
             setLoading(true);
             setError('');
             try {
-                const result = await getMyRents();
-                setBookings(result);
-
-                const [vehicles, ownerEntries] = await Promise.all([
-                    getPublicVehicles(),
-                    Promise.all(
-                        Array.from(new Set(result.map((booking) => booking.owner_uid))).map(async (uid) => {
-                            try {
-                                const profile = await getUserPublicProfile(uid);
-                                return [uid, getProfileDisplayName(profile.full_name, profile.email)] as const;
-                            } catch {
-                                return [uid, 'Owner'] as const;
-                            }
-                        }),
-                    ),
-                ]);
-
-                const vehicleById = new Map(vehicles.map((vehicle) => [vehicle.vehicleid, vehicle]));
-                const ownerNameByUid = new Map(ownerEntries);
-
-                const nextDisplayByRentId = new Map<string, BookingDisplay>();
-                result.forEach((booking) => {
-                    const vehicle = vehicleById.get(booking.vehicle_id);
-                    nextDisplayByRentId.set(booking.rentid, {
-                        ownerName: ownerNameByUid.get(booking.owner_uid) || 'Owner',
-                        vehicleName: vehicle ? `${vehicle.brand} ${vehicle.model}` : 'Vehicle',
-                        vehicleImage: getPrimaryVehicleImage(vehicle?.image_urls, vehicle?.image_url),
-                    });
-                });
-                setDisplayByRentId(nextDisplayByRentId);
+                const page = await getMyRentsPage();
+                setBookings(page.items);
+                setNextCursor(page.next_cursor);
+                setDisplayByRentId(new Map(await describe(page.items)));
             } catch (err) {
                 setError(err instanceof Error ? err.message : 'Failed to load bookings');
             } finally {
@@ -59,7 +75,23 @@ const UserBookings = () => {
             }
         };
         void loadBookings();
-    }, []);
+    }, [describe]);
+
+    const loadMore = async () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        try {
+            const page = await getMyRentsPage(nextCursor);
+            const entries = await describe(page.items);
+            setBookings((current) => [...current, ...page.items]);
+            setNextCursor(page.next_cursor);
+            setDisplayByRentId((current) => new Map([...current, ...entries]));
+        } catch (err) {
+            setError(err instanceof Error ? err.message : 'Failed to load bookings');
+        } finally {
+            setLoadingMore(false);
+        }
+    };
 
     const getStatusColor = (status: string) => {
         switch (status.toLowerCase()) {
@@ -158,6 +190,18 @@ const UserBookings = () => {
                     </div>
                 )})}
             </div>
+
+            {nextCursor && (
+                <div className="text-center">
+                    <button
+                        onClick={() => void loadMore()}
+                        disabled={loadingMore}
+                        className="px-6 py-2 rounded-lg bg-white border border-gray-200 text-gray-700 font-bold hover:bg-gray-50 transition text-sm disabled:opacity-60 disabled:cursor-not-allowed"
+                    >
+                        {loadingMore ? 'Loading...' : 'Load more'}
+                    </button>
+                </div>
+            )}
         </div>
     );
 };
@@ -47,6 +47,7 @@ export interface UserProfile {
   phone: string;
   roles: UserRole[];
   avatar_url?: string | null;
+  avatar_variants?: ImageVariantsApi | null;
 }
 
 export interface PublicUserProfile {
@@ -55,6 +56,20 @@ export interface PublicUserProfile {
   email: string;
 }
 
+export interface ImageVariantsApi {
+  source_url: string;
+  thumbnail_url: string;
+  webp_url: string;
+  width?: number | null;
+  height?: number | null;
+}
+
+export interface GeoPointApi {
+  type: 'Point';
+  // GeoJSON order: [longitude, latitude]
+  coordinates: [number, number];
+}
+
 export interface VehicleApi {
   vehicleid: string;
   owner_uid: string;
@@ -70,6 +85,23 @@ export interface VehicleApi {
   model: string;
   image_urls?: string[] | null;
   image_url?: string | null;
+  image_variants?: ImageVariantsApi[];
+  thumbnail_url?: string | null;
+  geo?: GeoPointApi | null;
+}
+
+export interface VehicleFacetCountApi {
+  value: string | number;
+  count: number;
+}
+
+export interface VehicleFacetsApi {
+  total: number;
+  type: VehicleFacetCountApi[];
+  fuel: VehicleFacetCountApi[];
+  transmission: VehicleFacetCountApi[];
+  seats: VehicleFacetCountApi[];
+  price: { min: number; max: number | null; count: number }[];
 }
 
 export interface RentApi {
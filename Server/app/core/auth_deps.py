@@ -1,16 +1,21 @@
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from firebase_admin import auth
 
+from app.core.token_cache import token_cache
+
 # We use HTTPBearer to get the "Bearer <token>" from the Authorization header
 http_bearer = HTTPBearer()
 
-def get_current_user(creds: HTTPAuthorizationCredentials = Depends(http_bearer)):
+async def get_current_user(creds: HTTPAuthorizationCredentials = Depends(http_bearer)):
     """
     A dependency to verify the Firebase ID token.
     
     It takes the Bearer token from the Authorization header, verifies it
     using the Firebase Admin SDK, and returns the decoded token (user data).
+    Verified tokens are cached until their `exp`, so repeat requests skip the
+    signature check and never leave the event loop.
     """
     if not creds:
         raise HTTPException(
@@ -18,12 +23,16 @@ def get_current_user(creds: HTTPAuthorizationCredentials = Depends(http_bearer))
             detail="Bearer token missing or invalid."
         )
     
+    # Get the token from the credentials
+    id_token = creds.credentials
+    cached = token_cache.get(id_token)
+    if cached is not None:
+        return cached
+
     try:
-        # Get the token from the credentials
-        id_token = creds.credentials
-        # Verify the token using Firebase Admin SDK
-        decoded_token = auth.verify_id_token(id_token)
-        return decoded_token
+        # Verify the token using Firebase Admin SDK (blocking, so keep it off the event loop).
+        # Not on the admin executor: authentication must not queue behind slow create_user calls.
+        decoded_token = await run_in_threadpool(auth.verify_id_token, id_token)
     except auth.InvalidIdTokenError as e:
         # Token is invalid (e.g., expired, malformed, wrong signature)
         raise HTTPException(
@@ -36,3 +45,5 @@ def get_current_user(creds: HTTPAuthorizationCredentials = Depends(http_bearer))
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred during authentication: {e}"
         )
+    token_cache.put(id_token, decoded_token)
+    return decoded_token
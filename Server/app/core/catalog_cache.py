@@ -0,0 +1,36 @@
+import json
+import os
+
+from app.core.ttl_cache import TTLCache
+
+# Process-wide cache of public catalog pages (`/vehicles`, `/vehicles/search`).
+# Vehicle writes in VehicleRepository invalidate it, so this process never
+# serves a page older than its last write; the TTL bounds how long another
+# worker's writes take to show up.
+catalog_cache = TTLCache(
+    ttl=float(os.getenv("CATALOG_CACHE_TTL", "15")),
+    max_entries=int(os.getenv("CATALOG_CACHE_SIZE", "512")),
+)
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        normalized = {key: _normalize(item) for key, item in value.items()}
+        if isinstance(normalized.get("$in"), list):
+            normalized["$in"] = sorted(set(normalized["$in"]), key=repr)
+        if "i" in str(normalized.get("$options", "")) and isinstance(normalized.get("$regex"), str):
+            normalized["$regex"] = normalized["$regex"].lower()
+        return normalized
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def query_cache_key(kind: str, query: dict | None = None, *, text: str | None = None, **params) -> str:
+    """The same key for queries that match the same vehicles, whatever their filter order or case."""
+    normalized_text = " ".join(text.lower().split()) if text else None
+    return json.dumps(
+        {"kind": kind, "q": normalized_text, "filter": _normalize(query or {}), **params},
+        sort_keys=True,
+        default=str,
+    )
@@ -3,6 +3,8 @@ import re
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from pydantic import BaseModel
 
+from app.core.db_monitoring import command_listener
+
 class DBMotorClient(BaseModel):
     client: AsyncIOMotorClient | None = None
     db: AsyncIOMotorDatabase | None = None
@@ -35,8 +37,11 @@ async def connect_to_mongo():
 
     print("Connecting to MongoDB...")
     try:
-        # Add a short serverSelectionTimeoutMS to fail fast on auth/network errors
-        db.client = AsyncIOMotorClient(mongodb_url, serverSelectionTimeoutMS=5000)
+        # Add a short serverSelectionTimeoutMS to fail fast on auth/network errors;
+        # the listener attributes every command to the request that issued it (see /metrics)
+        db.client = AsyncIOMotorClient(
+            mongodb_url, serverSelectionTimeoutMS=5000, event_listeners=[command_listener]
+        )
         # Force a quick round-trip to detect auth issues early
         await db.client.admin.command("ping")
         db.db = db.client[db_name]
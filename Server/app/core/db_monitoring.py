@@ -0,0 +1,145 @@
+"""Per-request MongoDB command accounting.
+
+`command_listener` is registered on the Motor client and sees every command
+pymongo sends. While a request is being handled, `DbMetricsMiddleware` keeps
+a `RequestDbStats` in a context variable; Motor copies the caller's context
+into the executor thread that runs each operation, so the listener adds the
+command to the stats of the request that issued it. When the request ends the
+middleware records the totals in per-route histograms, served by `/metrics`,
+and in debug mode reports them in a `Server-Timing` header.
+"""
+
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from pymongo import monitoring
+
+from app.core.metrics import REGISTRY, Counter, Histogram
+
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+_COMMAND_COUNT_BUCKETS = (0, 1, 2, 3, 4, 6, 8, 12, 16, 32, 64)
+_ROUTE_LABELS = ("method", "route")
+
+REQUEST_DURATION = REGISTRY.register(
+    Histogram("http_request_duration_seconds", "Time spent handling the request.", _LATENCY_BUCKETS, _ROUTE_LABELS)
+)
+REQUEST_DB_COMMANDS = REGISTRY.register(
+    Histogram("http_request_db_commands", "MongoDB commands issued per request.", _COMMAND_COUNT_BUCKETS, _ROUTE_LABELS)
+)
+REQUEST_DB_SECONDS = REGISTRY.register(
+    Histogram("http_request_db_seconds", "Total MongoDB command time per request.", _LATENCY_BUCKETS, _ROUTE_LABELS)
+)
+REQUEST_DB_SLOWEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "http_request_db_slowest_command_seconds",
+        "Duration of the slowest MongoDB command of each request.",
+        _LATENCY_BUCKETS,
+        _ROUTE_LABELS,
+    )
+)
+DB_COMMANDS = REGISTRY.register(
+    Counter("mongodb_commands_total", "MongoDB commands by name and outcome.", ("command", "outcome"))
+)
+
+
+def _env_flag(name: str) -> bool:
+    return (os.getenv(name) or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+class RequestDbStats:
+    """Commands issued on behalf of one request. Updated from Motor's executor threads."""
+
+    def __init__(self):
+        self.commands = 0
+        self.seconds = 0.0
+        self.slowest_command: str | None = None
+        self.slowest_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, command_name: str, seconds: float) -> None:
+        with self._lock:
+            self.commands += 1
+            self.seconds += seconds
+            if seconds >= self.slowest_seconds:
+                self.slowest_command = command_name
+                self.slowest_seconds = seconds
+
+    def server_timing(self, total_seconds: float) -> str:
+        entries = [
+            f'db;dur={self.seconds * 1000:.2f};desc="{self.commands} commands"',
+            f"app;dur={total_seconds * 1000:.2f}",
+        ]
+        if self.slowest_command:
+            entries.append(f'db-slowest;dur={self.slowest_seconds * 1000:.2f};desc="{self.slowest_command}"')
+        return ", ".join(entries)
+
+
+_current_stats: ContextVar[RequestDbStats | None] = ContextVar("request_db_stats", default=None)
+
+
+def current_db_stats() -> RequestDbStats | None:
+    return _current_stats.get()
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    # Handshake and heartbeat commands are driver chatter, not work done for a request.
+    _IGNORED = frozenset({"hello", "ismaster", "isMaster", "saslStart", "saslContinue", "endSessions"})
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        self._record(event, "success")
+
+    def failed(self, event) -> None:
+        self._record(event, "failure")
+
+    def _record(self, event, outcome: str) -> None:
+        if event.command_name in self._IGNORED:
+            return
+        DB_COMMANDS.inc(command=event.command_name, outcome=outcome)
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(event.command_name, event.duration_micros / 1_000_000)
+
+
+command_listener = CommandMetricsListener()
+
+
+class DbMetricsMiddleware:
+    """Pure ASGI middleware that scopes a `RequestDbStats` to each HTTP request."""
+
+    def __init__(self, app, server_timing: bool | None = None):
+        self.app = app
+        self.server_timing = _env_flag("DEBUG") if server_timing is None else server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDbStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and self.server_timing:
+                headers = list(message.get("headers", []))
+                timing = stats.server_timing(time.perf_counter() - started)
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            # The matched route's template keeps label cardinality bounded; unmatched paths share one label.
+            route = scope.get("route")
+            labels = {"method": scope["method"], "route": getattr(route, "path", None) or "unmatched"}
+            REQUEST_DURATION.observe(time.perf_counter() - started, **labels)
+            REQUEST_DB_COMMANDS.observe(stats.commands, **labels)
+            REQUEST_DB_SECONDS.observe(stats.seconds, **labels)
+            REQUEST_DB_SLOWEST_SECONDS.observe(stats.slowest_seconds, **labels)
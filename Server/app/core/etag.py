@@ -0,0 +1,60 @@
+"""Strong ETags and `If-None-Match` handling for conditional GETs.
+
+Versioned repositories (``BaseRepository.versioned``) increment a ``version``
+field on every write, so a document's ETag is a digest of its id and version,
+and a page's ETag is a digest of the ids and versions on it plus its cursor:
+an insert, delete or update that changes the page changes its ETag. Neither
+needs the response body, so a matching request is answered with an empty
+``304 Not Modified`` before anything is serialized.
+"""
+
+import hashlib
+import json
+from typing import Iterable
+
+from fastapi import Response, status
+
+from app.repositories.base import VERSION_FIELD
+
+# Authenticated responses may be stored by the browser but not by shared caches,
+# and must be revalidated before every reuse.
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+PUBLIC_CACHE_CONTROL = "no-cache"
+
+
+def _digest(value) -> str:
+    raw = json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+    return '"' + hashlib.sha256(raw).hexdigest()[:32] + '"'
+
+
+def _version_key(doc: dict) -> list:
+    # Documents written before versioning have no `version` yet; their first write sets it to 1.
+    return [str(doc.get("_id")), doc.get(VERSION_FIELD, 0)]
+
+
+def document_etag(doc: dict) -> str:
+    return _digest(_version_key(doc))
+
+
+def page_etag(scope: str, docs: Iterable[dict], next_cursor: str | None) -> str:
+    """ETag of one page of a listing; `scope` tells apart listings that could hold the same documents."""
+    return _digest([scope, [_version_key(doc) for doc in docs], next_cursor])
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """`If-None-Match` uses the weak comparison, so `W/"x"` matches `"x"`."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return any(candidate == "*" or candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def conditional_response(
+    response: Response, etag: str, if_none_match: str | None, *, cache_control: str = PRIVATE_CACHE_CONTROL
+) -> Response | None:
+    """Put the validators on `response`; return a bodiless 304 instead when the client's copy is current."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,68 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+# The Firebase Admin SDK is synchronous. Its user-management calls run on a small dedicated
+# pool so a signup burst can neither stall the event loop nor exhaust the shared threadpool.
+# Token verification stays on the shared threadpool so it never waits behind them.
+_admin_executor: ThreadPoolExecutor | None = None
+
+# Pooled keep-alive client for the Identity Toolkit REST API, created on first use.
+_http_client: httpx.AsyncClient | None = None
+
+
+def _admin_pool() -> ThreadPoolExecutor:
+    global _admin_executor
+    if _admin_executor is None:
+        _admin_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("FIREBASE_ADMIN_MAX_WORKERS", "8")),
+            thread_name_prefix="firebase-admin",
+        )
+    return _admin_executor
+
+
+async def run_admin_call(func, *args, **kwargs):
+    """
+    Runs a blocking Firebase Admin SDK user-management call on the bounded admin executor.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_admin_pool(), functools.partial(func, *args, **kwargs))
+
+
+def identity_toolkit_url(path: str) -> str:
+    """
+    Builds an Identity Toolkit REST URL, honouring FIREBASE_AUTH_EMULATOR_HOST like the Admin SDK does.
+    """
+    emulator_host = os.getenv("FIREBASE_AUTH_EMULATOR_HOST")
+    if emulator_host:
+        return f"http://{emulator_host}/identitytoolkit.googleapis.com/v1/{path}"
+    return f"https://identitytoolkit.googleapis.com/v1/{path}"
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("IDENTITY_HTTP_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=20,
+            ),
+        )
+    return _http_client
+
+
+async def close_identity_clients():
+    """
+    Closes the pooled HTTP client and the admin executor on app shutdown.
+    """
+    global _http_client, _admin_executor
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if _admin_executor is not None:
+        _admin_executor.shutdown(wait=False)
+        _admin_executor = None
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def _token_key(id_token: str) -> str:
+    # Keep only a digest in memory so a heap dump does not leak usable bearer tokens.
+    return hashlib.sha256(id_token.encode("utf-8")).hexdigest()
+
+
+class TokenCache:
+    """
+    A bounded, thread-safe cache of verified ID tokens.
+
+    Entries expire at the token's own `exp` claim (optionally capped by
+    `max_ttl` seconds) and are evicted least-recently-used once `max_entries`
+    is reached. Only successfully verified tokens are stored.
+    """
+
+    def __init__(self, max_entries: int = 10_000, max_ttl: float | None = None, clock=time.time):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, id_token: str) -> dict | None:
+        key = _token_key(id_token)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims = entry
+            if now >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(claims)
+
+    def put(self, id_token: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+        now = self._clock()
+        expires_at = float(exp)
+        if self.max_ttl is not None:
+            expires_at = min(expires_at, now + self.max_ttl)
+        if expires_at <= now:
+            return
+
+        key = _token_key(id_token)
+        with self._lock:
+            self._entries[key] = (expires_at, dict(claims))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.expirations = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _env_float(name: str) -> float | None:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+# Process-wide cache used by `get_current_user`.
+token_cache = TokenCache(
+    max_entries=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000")),
+    max_ttl=_env_float("AUTH_TOKEN_CACHE_MAX_TTL"),
+)
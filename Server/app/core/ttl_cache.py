@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class TTLCache:
+    """
+    A small bounded, thread-safe cache whose entries expire `ttl` seconds after
+    they are stored.
+
+    Once `max_entries` is reached the least recently used entry is evicted.
+    Values are returned as stored, so callers should cache immutable data or
+    copies they will not mutate.
+
+    `get_or_load` coalesces concurrent misses on a key into one load, and
+    `invalidate` drops everything, including loads already in flight, so a
+    value read before a write is never stored after it.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1_000, clock=time.monotonic):
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> task loading it; only touched from the event loop
+        self._loading: dict[Hashable, asyncio.Task] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now >= entry[0]:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires_at = self._clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for `key`, running `load` once for all concurrent callers on a miss."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, load, self._generation))
+            self._loading[key] = task
+        else:
+            self.coalesced += 1
+        # A caller that gives up must not cancel the load the others are waiting on.
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[Any]], generation: int) -> Any:
+        try:
+            value = await load()
+        finally:
+            if self._loading.get(key) is asyncio.current_task():
+                del self._loading[key]
+        if generation == self._generation and value is not None:
+            self.put(key, value)
+        return value
+
+    def invalidate(self) -> None:
+        """Drop every entry; loads that started earlier still answer their callers but are not stored."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.invalidations += 1
+        self._loading.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.hits = self.misses = self.evictions = self.coalesced = self.invalidations = 0
+        self._loading.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "coalesced": self.coalesced,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,121 @@
+import os
+import re
+import stat
+from email.utils import formatdate
+from mimetypes import guess_type
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+# Upload handlers name files `{owner}_{uuid4().hex}{ext}` and derived images
+# `{stem}_w300.webp` / `{stem}_full.webp`, so a URL never points at different bytes.
+IMMUTABLE_NAME = re.compile(r"_[0-9a-f]{32}(?:_w\d+|_full)?\.[A-Za-z0-9]+(?:\.(?:br|gz))?$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+# Precompressed siblings, in order of preference.
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _accepts(header: str | None, token: str) -> bool:
+    """True if `token` is listed in an Accept-style header without `q=0`."""
+    for item in (header or "").split(","):
+        value, *params = [part.strip() for part in item.split(";")]
+        if value.lower() != token:
+            continue
+        for param in params:
+            name, _, weight = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    return float(weight) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def strong_etag(stat_result: os.stat_result) -> str:
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+class UploadsStaticFiles(StaticFiles):
+    """
+    StaticFiles for user uploads with long-lived caching.
+
+    - uuid-named files get `Cache-Control: immutable`; anything else is revalidated.
+    - ETags are strong (size + nanosecond mtime) so `If-Range` works with byte ranges.
+    - `foo.ext.br` / `foo.ext.gz` siblings are served to clients that accept them. Image
+      variants are never substituted: `_full.webp` is downscaled, so it is only served at its own URL.
+    - When `accel_redirect_prefix` is set, the body is handed to the fronting nginx via
+      `X-Accel-Redirect` so it can use sendfile; otherwise Starlette's FileResponse streams it
+      (and uses `http.response.pathsend` on servers that support zero-copy).
+    """
+
+    def __init__(self, *args, accel_redirect_prefix: str | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.accel_redirect_prefix = accel_redirect_prefix.rstrip("/") if accel_redirect_prefix else None
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] in ("GET", "HEAD"):
+            request_headers = Headers(scope=scope)
+            for candidate, encoding in self._variant_candidates(path, request_headers):
+                try:
+                    full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, candidate)
+                except (OSError, ValueError):
+                    continue
+                if stat_result and stat.S_ISREG(stat_result.st_mode):
+                    return self._serve(candidate, full_path, stat_result, scope, source_path=path, encoding=encoding)
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        relative = os.path.relpath(full_path, os.path.realpath(self.directory))
+        return self._serve(relative, full_path, stat_result, scope, source_path=relative, status_code=status_code)
+
+    def _variant_candidates(self, path: str, request_headers: Headers) -> list[tuple[str, str | None]]:
+        candidates = []
+        accept_encoding = request_headers.get("accept-encoding")
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if _accepts(accept_encoding, encoding):
+                candidates.append((path + suffix, encoding))
+        return candidates
+
+    def _response_headers(self, served_path: str, stat_result: os.stat_result) -> dict:
+        immutable = IMMUTABLE_NAME.search(os.path.basename(served_path)) is not None
+        return {
+            "cache-control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+            "etag": strong_etag(stat_result),
+            "vary": "Accept-Encoding",
+        }
+
+    def _serve(
+        self,
+        served_path: str,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        *,
+        source_path: str,
+        encoding: str | None = None,
+        status_code: int = 200,
+    ) -> Response:
+        headers = self._response_headers(served_path, stat_result)
+        # A precompressed sibling keeps the media type of the file that was asked for.
+        media_type = guess_type(source_path if encoding else served_path)[0] or "application/octet-stream"
+        if encoding:
+            headers["content-encoding"] = encoding
+
+        if self.accel_redirect_prefix:
+            headers["last-modified"] = formatdate(stat_result.st_mtime, usegmt=True)
+            response = Response(status_code=status_code, media_type=media_type, headers=headers)
+            response.headers["x-accel-redirect"] = f"{self.accel_redirect_prefix}/{served_path.replace(os.sep, '/')}"
+        else:
+            response = FileResponse(
+                full_path, status_code=status_code, headers=headers, media_type=media_type, stat_result=stat_result
+            )
+
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -1,7 +1,7 @@
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+import os
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from pathlib import Path
@@ -20,7 +20,12 @@ import app.routers.rents as rents
 
 
 # --- Import DB Connection Handlers ---
-from app.core.db import connect_to_mongo, close_mongo_connection
+from app.core.db import connect_to_mongo, close_mongo_connection, get_database
+from app.core.db_monitoring import DbMetricsMiddleware
+from app.core.identity import close_identity_clients
+from app.core.uploads_static import UploadsStaticFiles
+from app.services.image_variants import shutdown_image_pool
+from app.repositories.registry import ensure_all_indexes
 
 
 @asynccontextmanager
@@ -30,8 +35,11 @@ async def lifespan(app: FastAPI):
     """
     # On startup
     await connect_to_mongo()
+    await ensure_all_indexes(get_database())
     yield
     # On shutdown
+    await close_identity_clients()
+    shutdown_image_pool()
     await close_mongo_connection()
 
 
@@ -55,9 +63,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so per-route timings cover CORS handling; Server-Timing is added when DEBUG is set.
+app.add_middleware(DbMetricsMiddleware)
+
 uploads_dir = Path(__file__).resolve().parents[1] / "uploads"
 uploads_dir.mkdir(parents=True, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=str(uploads_dir)), name="uploads")
+app.mount(
+    "/uploads",
+    UploadsStaticFiles(
+        directory=str(uploads_dir),
+        accel_redirect_prefix=os.getenv("UPLOADS_ACCEL_REDIRECT_PREFIX") or None,
+    ),
+    name="uploads",
+)
 
 # --- Include Routers ---
 app.include_router(general.router)
@@ -1,5 +1,69 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import Any, List
+from pymongo import IndexModel, ReturnDocument
+from pymongo.errors import OperationFailure
+from typing import Any, ClassVar, List, Tuple
+
+from app.repositories.ids import OBJECT_ID_POLICY, codec_for
+from app.repositories.pagination import SortSpec, apply_cursor, encode_cursor
+
+# Server error codes for "an index with this name/key already exists with a different definition".
+_INDEX_CONFLICT_CODES = {85, 86}
+
+# Write counter kept on the documents of versioned repositories; see `BaseRepository.versioned`.
+VERSION_FIELD = "version"
+
+# Index options that change what an index holds or how it behaves; `key` and `weights` are compared too.
+_INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+def _index_definition(document: dict) -> dict:
+    """The comparable parts of an `IndexModel.document` or an `index_information()` entry.
+
+    The server stores a text index's fields as `_fts`/`_ftsx` keys plus a
+    `weights` map, so declared text fields are folded the same way and
+    compared through their weights (1 unless declared otherwise).
+    """
+    raw_key = document["key"]
+    weights = dict(document.get("weights") or {})
+    key = []
+    for field, kind in raw_key.items() if isinstance(raw_key, Mapping) else raw_key:
+        if kind == "text" and field != "_fts":
+            weights.setdefault(field, 1)
+            if ("_fts", "text") not in key:
+                key += [("_fts", "text"), ("_ftsx", 1)]
+            continue
+        key.append((field, int(kind) if isinstance(kind, (int, float)) else kind))
+    definition = {option: document.get(option) for option in _INDEX_OPTIONS}
+    definition["unique"] = bool(definition["unique"])
+    definition["sparse"] = bool(definition["sparse"])
+    definition.update(key=key, weights=weights or None)
+    return definition
+
+
+def _same_index(existing: dict, wanted: dict) -> bool:
+    """Whether the stored index `existing` already is the declared index `wanted`."""
+    if _index_definition(existing) != _index_definition(wanted):
+        return False
+    # the server fills in every collation default, so only the declared settings are compared
+    have, want = existing.get("collation"), wanted.get("collation")
+    if not want:
+        return not have
+    return bool(have) and all(have.get(option) == value for option, value in want.items())
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """A representative query a repository issues, checked by the index report.
+
+    Either a `find` (filter + optional sort) or, when `pipeline` is set, an
+    `aggregate` on the repository's collection.
+    """
+    name: str
+    filter: dict = field(default_factory=dict)
+    sort: SortSpec | None = None
+    pipeline: list | None = None
 
 
 class BaseRepository:
@@ -11,33 +75,119 @@ class BaseRepository:
         await repo.get_by_id("some_id")
     """
 
+    # Secondary indexes the collection needs; created on startup by `ensure_indexes`.
+    indexes: ClassVar[List[IndexModel]] = []
+    # Query shapes issued against the collection, for `scripts/index_report.py`.
+    query_shapes: ClassVar[List[QueryShape]] = []
+    # How `_id`s are stored; see app/repositories/ids.py.
+    id_policy: ClassVar[str] = OBJECT_ID_POLICY
+    # Whether every write through the repository increments the document's
+    # `version`, which the HTTP ETags are derived from (app/core/etag.py).
+    versioned: ClassVar[bool] = False
+
     def __init__(self, db: AsyncIOMotorDatabase, collection_name: str):
         self.db = db
         self.collection_name = collection_name
         self.collection = db[collection_name]
+        self.ids = codec_for(collection_name, self.id_policy)
+
+    def id_filter(self, id_: Any, **conditions: Any) -> dict:
+        """Filter matching `id_` in its stored form, plus any extra equality conditions."""
+        return {"_id": self.ids.condition(id_), **conditions}
+
+    def versioned_update(self, update: dict) -> dict:
+        """`update` plus the version increment, for versioned repositories."""
+        if not self.versioned:
+            return update
+        return {**update, "$inc": {**update.get("$inc", {}), VERSION_FIELD: 1}}
 
     async def create(self, doc: dict) -> dict:
-        result = await self.collection.insert_one(doc)
-        created = await self.collection.find_one({"_id": result.inserted_id})
+        # The server stores exactly what we send, so the created document is
+        # built locally instead of being read back.
+        created = dict(doc)
+        if "_id" in created:
+            created["_id"] = self.ids.encode(created["_id"])
+        if self.versioned:
+            created[VERSION_FIELD] = 1
+        result = await self.collection.insert_one(created)
+        created["_id"] = result.inserted_id
         return created
 
-    async def get_by_id(self, id_: Any) -> dict | None:
-        return await self.collection.find_one({"_id": id_})
+    async def get_by_id(self, id_: Any, *, session: Any = None) -> dict | None:
+        return await self.collection.find_one(self.id_filter(id_), session=session)
 
     async def update_by_id(self, id_: Any, update: dict) -> dict | None:
         if not update:
             return await self.get_by_id(id_)
-        result = await self.collection.update_one({"_id": id_}, {"$set": update})
-        if result.matched_count == 0:
-            return None
-        return await self.get_by_id(id_)
+        return await self.update_returning(self.id_filter(id_), {"$set": update})
+
+    async def update_returning(
+        self,
+        filter_: dict,
+        update: dict,
+        *,
+        return_document: ReturnDocument = ReturnDocument.AFTER,
+        session: Any = None,
+    ) -> dict | None:
+        """Apply `update` to the first match and return it (as stored afterwards by default), in one round trip."""
+        return await self.collection.find_one_and_update(
+            filter_, self.versioned_update(update), return_document=return_document, session=session
+        )
 
     async def delete_by_id(self, id_: Any) -> bool:
-        result = await self.collection.delete_one({"_id": id_})
+        result = await self.collection.delete_one(self.id_filter(id_))
         return result.deleted_count == 1
 
-    async def list(self, filter_: dict = None, limit: int = 200) -> List[dict]:
+    async def delete_returning(self, filter_: dict) -> dict | None:
+        """Delete the first match and return the removed document, in one round trip."""
+        return await self.collection.find_one_and_delete(filter_)
+
+    async def list(self, filter_: dict = None, limit: int | None = 200) -> List[dict]:
         filter_ = filter_ or {}
         cursor = self.collection.find(filter_)
         docs = await cursor.to_list(length=limit)
         return docs
+
+    async def list_page(
+        self,
+        filter_: dict = None,
+        *,
+        sort: SortSpec,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> Tuple[List[dict], str | None]:
+        """Return one keyset-paginated page and the cursor for the next one (None on the last page)."""
+        query = apply_cursor(filter_ or {}, sort, cursor)
+        # Fetch one extra document to learn whether another page exists.
+        docs = await self.collection.find(query).sort(sort).limit(limit + 1).to_list(length=limit + 1)
+        if len(docs) <= limit:
+            return docs, None
+        docs = docs[:limit]
+        return docs, encode_cursor(docs[-1], sort)
+
+    async def ensure_indexes(self) -> List[str]:
+        """Create the declared indexes. Safe to call on every startup.
+
+        If an index was previously created under the same name (or key) with a
+        different definition (key, text weights, uniqueness, sparseness, partial
+        filter, TTL or collation), the stale one is dropped and rebuilt.
+        """
+        if not self.indexes:
+            return []
+        try:
+            return await self.collection.create_indexes(self.indexes)
+        except OperationFailure as exc:
+            if exc.code not in _INDEX_CONFLICT_CODES:
+                raise
+        existing = await self.collection.index_information()
+        for model in self.indexes:
+            wanted = model.document
+            wanted_key = _index_definition(wanted)["key"]
+            for name, info in existing.items():
+                if name == "_id_":
+                    continue
+                same_name = name == wanted["name"]
+                same_key = _index_definition(info)["key"] == wanted_key
+                if (same_name or same_key) and not (same_name and _same_index(info, wanted)):
+                    await self.collection.drop_index(name)
+        return await self.collection.create_indexes(self.indexes)
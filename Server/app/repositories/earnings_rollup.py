@@ -0,0 +1,131 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DeleteMany, IndexModel, ReplaceOne, UpdateOne
+
+from app.repositories.base import BaseRepository, QueryShape
+from app.repositories.ids import STRING_POLICY
+
+EARNINGS_ROLLUP_COLLECTION = "owner_earnings_monthly"
+
+EARNINGS_ROLLUP_INDEXES = [
+    IndexModel([("owner_uid", ASCENDING), ("year", ASCENDING), ("month", ASCENDING)], name="owner_month"),
+]
+
+# One document per (owner_uid, year, month) plus one all-time document per owner.
+# Keys are deterministic so every update is a single-document upsert.
+TOTAL_BUCKET = "total"
+MonthKey = Tuple[int, int]
+
+
+def month_bucket_id(owner_uid: str, year: int, month: int) -> str:
+    return f"{owner_uid}:{year:04d}-{month:02d}"
+
+
+def total_bucket_id(owner_uid: str) -> str:
+    return f"{owner_uid}:{TOTAL_BUCKET}"
+
+
+def build_owner_buckets(owner_uid: str, months: Dict[MonthKey, Tuple[float, int]]) -> Dict:
+    """Bucket documents keyed like `get_buckets` for `{(year, month): (amount, bookings)}`."""
+    buckets: Dict = {}
+    for (year, month), (amount, bookings) in sorted(months.items()):
+        buckets[(year, month)] = {
+            "_id": month_bucket_id(owner_uid, year, month),
+            "owner_uid": owner_uid,
+            "year": year,
+            "month": month,
+            "amount": round(amount, 2),
+            "bookings": bookings,
+        }
+    buckets[TOTAL_BUCKET] = {
+        "_id": total_bucket_id(owner_uid),
+        "owner_uid": owner_uid,
+        "year": None,
+        "month": None,
+        "amount": round(sum(amount for amount, _ in months.values()), 2),
+        "bookings": sum(bookings for _, bookings in months.values()),
+    }
+    return buckets
+
+
+class EarningsRollupRepository(BaseRepository):
+    indexes = EARNINGS_ROLLUP_INDEXES
+    # Bucket ids are "<owner_uid>:<YYYY-MM>" / "<owner_uid>:total".
+    id_policy = STRING_POLICY
+    query_shapes = [
+        QueryShape("get_buckets", {"_id": {"$in": ["owner_1:2026-01", "owner_1:total"]}}),
+        QueryShape("by_owner", {"owner_uid": "owner_1"}),
+    ]
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        super().__init__(db, EARNINGS_ROLLUP_COLLECTION)
+
+    async def apply_delta(
+        self, *, owner_uid: str, year: int, month: int, amount: float, bookings: int, session: Any = None
+    ) -> None:
+        inc = {"$inc": {"amount": amount, "bookings": bookings}}
+        # An owner without a total bucket has had no completed rent since the one-time backfill,
+        # so the bucket this first delta creates already holds their full history.
+        first_total = {"owner_uid": owner_uid, "year": None, "month": None, "rebuilt_at": datetime.now(timezone.utc)}
+        await self.collection.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": month_bucket_id(owner_uid, year, month)},
+                    {**inc, "$setOnInsert": {"owner_uid": owner_uid, "year": year, "month": month}},
+                    upsert=True,
+                ),
+                UpdateOne(
+                    {"_id": total_bucket_id(owner_uid)},
+                    {**inc, "$setOnInsert": first_total},
+                    upsert=True,
+                ),
+            ],
+            ordered=False,
+            session=session,
+        )
+
+    async def get_buckets(self, *, owner_uid: str, months: List[MonthKey]) -> Dict:
+        ids = [month_bucket_id(owner_uid, year, month) for year, month in months] + [total_bucket_id(owner_uid)]
+        docs = await self.collection.find({"_id": {"$in": ids}}).to_list(length=len(ids))
+        buckets: Dict = {}
+        for doc in docs:
+            key = TOTAL_BUCKET if doc.get("year") is None else (doc["year"], doc["month"])
+            buckets[key] = doc
+        return buckets
+
+    async def replace_owner(self, *, owner_uid: str, months: Dict[MonthKey, Tuple[float, int]]) -> Dict:
+        buckets = build_owner_buckets(owner_uid, months)
+        # marks the rollup as backfilled; increments alone never set it
+        buckets[TOTAL_BUCKET]["rebuilt_at"] = datetime.now(timezone.utc)
+        # Upsert each bucket by its deterministic id, then drop the owner's buckets that no longer exist.
+        # Unlike delete-then-insert, two rebuilds running at once can't collide on _id.
+        ids = [doc["_id"] for doc in buckets.values()]
+        requests = [ReplaceOne({"_id": doc["_id"]}, dict(doc), upsert=True) for doc in buckets.values()]
+        requests.append(DeleteMany({"owner_uid": owner_uid, "_id": {"$nin": ids}}))
+        await self.collection.bulk_write(requests, ordered=False)
+        return buckets
+
+
+# Backwards-compatible function-style API
+async def apply_earnings_delta(
+    db: AsyncIOMotorDatabase, *, owner_uid: str, year: int, month: int, amount: float, bookings: int, session: Any = None
+) -> None:
+    repo = EarningsRollupRepository(db)
+    await repo.apply_delta(owner_uid=owner_uid, year=year, month=month, amount=amount, bookings=bookings, session=session)
+
+
+async def get_earnings_buckets(db: AsyncIOMotorDatabase, *, owner_uid: str, months: List[MonthKey]) -> Dict:
+    repo = EarningsRollupRepository(db)
+    return await repo.get_buckets(owner_uid=owner_uid, months=months)
+
+
+async def replace_owner_earnings(db: AsyncIOMotorDatabase, *, owner_uid: str, months: Dict[MonthKey, Tuple[float, int]]) -> Dict:
+    repo = EarningsRollupRepository(db)
+    return await repo.replace_owner(owner_uid=owner_uid, months=months)
+
+
+async def ensure_earnings_rollup_indexes(db: AsyncIOMotorDatabase) -> List[str]:
+    repo = EarningsRollupRepository(db)
+    return await repo.ensure_indexes()
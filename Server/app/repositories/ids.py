@@ -0,0 +1,120 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DeleteOne, InsertOne
+
+# How a collection stores its `_id`s:
+#   objectid - generated ids are ObjectIds; a 24-hex string always means the ObjectId,
+#              any other string (e.g. a client-chosen vehicle id) is stored as-is.
+#   string   - ids are opaque strings and never converted (Firebase uids).
+#   mixed    - legacy data holds both forms; lookups match either. Only meant for
+#              collections that `scripts/migrate_object_ids.py` has not converted yet.
+OBJECT_ID_POLICY = "objectid"
+STRING_POLICY = "string"
+MIXED_POLICY = "mixed"
+ID_POLICIES = (OBJECT_ID_POLICY, STRING_POLICY, MIXED_POLICY)
+
+_OBJECT_ID_HEX = re.compile(r"^[0-9a-fA-F]{24}$")
+
+
+def parse_policy_overrides(raw: str | None) -> Dict[str, str]:
+    """Parse `collection=policy` pairs, e.g. "vehicles=mixed,rents=mixed"."""
+    overrides: Dict[str, str] = {}
+    for item in (raw or "").split(","):
+        if not item.strip():
+            continue
+        collection, _, policy = item.partition("=")
+        policy = policy.strip().lower()
+        if policy not in ID_POLICIES:
+            raise ValueError(f"Unknown id policy {policy!r} for collection {collection.strip()!r}")
+        overrides[collection.strip()] = policy
+    return overrides
+
+
+# Deployments that still hold mixed ids can opt individual collections back into
+# dual-form lookups until the migration has run.
+ID_POLICY_OVERRIDES = parse_policy_overrides(os.getenv("MONGO_ID_POLICY_OVERRIDES"))
+
+
+def looks_like_object_id(value: Any) -> bool:
+    return isinstance(value, str) and bool(_OBJECT_ID_HEX.match(value))
+
+
+@dataclass(frozen=True)
+class IdCodec:
+    """Translate between the string ids the API exposes and the stored `_id`.
+
+    The stored form is decided from the id format and the collection policy, so
+    every lookup is a single query on `_id`.
+    """
+    policy: str = OBJECT_ID_POLICY
+
+    def encode(self, value: Any) -> Any:
+        """The canonical stored form of `value`."""
+        if self.policy != STRING_POLICY and looks_like_object_id(value):
+            return ObjectId(value)
+        return value
+
+    def condition(self, value: Any) -> Any:
+        """The `_id` condition that finds `value`."""
+        stored = self.encode(value)
+        if self.policy == MIXED_POLICY and isinstance(stored, ObjectId):
+            return {"$in": [stored, str(stored)]}
+        return stored
+
+    @staticmethod
+    def decode(doc: dict | None) -> dict | None:
+        """Expose the document's `_id` as a string, in place."""
+        if doc and "_id" in doc and not isinstance(doc["_id"], str):
+            doc["_id"] = str(doc["_id"])
+        return doc
+
+
+def codec_for(collection_name: str, default_policy: str = OBJECT_ID_POLICY) -> IdCodec:
+    return IdCodec(ID_POLICY_OVERRIDES.get(collection_name, default_policy))
+
+
+# `_id`s that were stored as strings but are ObjectId hex, i.e. what the migration converts.
+STRING_OBJECT_ID_FILTER = {"_id": {"$type": "string", "$regex": _OBJECT_ID_HEX.pattern}}
+
+
+async def migrate_string_object_ids(
+    db: AsyncIOMotorDatabase, *, collection_name: str, apply: bool = False, batch_size: int = 500
+) -> dict:
+    """Re-key documents whose `_id` is an ObjectId hex string to the ObjectId itself.
+
+    `_id` is immutable, so each document is re-inserted under the new key and the
+    old one deleted, batch by batch in `_id` order. Documents whose ObjectId twin
+    already exists are left alone and reported as conflicts.
+    """
+    collection = db[collection_name]
+    summary: dict = {"collection": collection_name, "scanned": 0, "migrated": 0, "conflicts": []}
+    last_id: str | None = None
+    while True:
+        query = dict(STRING_OBJECT_ID_FILTER)
+        if last_id is not None:
+            query = {"$and": [query, {"_id": {"$gt": last_id}}]}
+        docs = await collection.find(query).sort([("_id", ASCENDING)]).limit(batch_size).to_list(length=batch_size)
+        if not docs:
+            return summary
+        last_id = docs[-1]["_id"]
+        summary["scanned"] += len(docs)
+
+        targets = [ObjectId(doc["_id"]) for doc in docs]
+        taken = await collection.find({"_id": {"$in": targets}}).to_list(length=len(targets))
+        taken_ids = {str(doc["_id"]) for doc in taken}
+        summary["conflicts"].extend(doc["_id"] for doc in docs if doc["_id"] in taken_ids)
+
+        requests: List[Any] = []
+        for doc in docs:
+            if doc["_id"] in taken_ids:
+                continue
+            requests.append(InsertOne({**doc, "_id": ObjectId(doc["_id"])}))
+            requests.append(DeleteOne({"_id": doc["_id"]}))
+        if apply and requests:
+            await collection.bulk_write(requests, ordered=True)
+        summary["migrated"] += len(requests) // 2
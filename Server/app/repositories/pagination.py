@@ -0,0 +1,108 @@
+"""Keyset (cursor) pagination helpers shared by the repositories.
+
+A page is described by a sort spec such as ``[("start_date", -1), ("_id", -1)]``
+whose last key is always ``_id`` so every position is unique. The cursor handed
+to clients is an opaque, URL-safe encoding of the sort values of the last
+document on the page; the next page is fetched with a range predicate on those
+values, which an index on the same keys serves as a plain range scan no matter
+how deep the client pages.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, List, Tuple
+
+from bson import ObjectId, json_util
+
+SortSpec = List[Tuple[str, int]]
+
+# BSON comparison order for the value types we store. Range operators only
+# match values of the same type, so crossing a type boundary needs a `$type`
+# clause (e.g. string `_id`s sort before ObjectId `_id`s).
+_BSON_TYPE_ORDER = ["null", "number", "string", "object", "array", "objectId", "bool", "date"]
+
+
+# Decode dates as aware UTC values so they compare with the aware datetimes the schemas produce.
+_CURSOR_JSON_OPTIONS = json_util.JSONOptions(tz_aware=True)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a client-supplied cursor cannot be decoded for the requested sort."""
+
+
+def _bson_type(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, ObjectId):
+        return "objectId"
+    if isinstance(value, datetime):
+        return "date"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+def encode_cursor(doc: dict, sort: SortSpec) -> str:
+    values = [doc.get(field) for field, _ in sort]
+    raw = json_util.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort: SortSpec) -> list:
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")), json_options=_CURSOR_JSON_OPTIONS)
+    except (binascii.Error, ValueError, UnicodeError):
+        raise InvalidCursorError("Malformed pagination cursor")
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise InvalidCursorError("Pagination cursor does not match this listing")
+    return values
+
+
+def _after(field: str, direction: int, value: Any) -> dict | None:
+    """Predicate matching values strictly after `value` in `direction` order, or None if nothing sorts after it."""
+    value_type = _bson_type(value)
+    position = _BSON_TYPE_ORDER.index(value_type)
+    beyond = _BSON_TYPE_ORDER[position + 1:] if direction > 0 else _BSON_TYPE_ORDER[:position]
+
+    clauses = []
+    if value_type != "null":
+        clauses.append({field: {"$gt" if direction > 0 else "$lt": value}})
+    if "null" in beyond:
+        # A missing field sorts as null, but `$type: "null"` only matches an explicit null;
+        # equality with None matches both.
+        beyond.remove("null")
+        clauses.append({field: None})
+    if beyond:
+        clauses.append({field: {"$type": beyond}})
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$or": clauses}
+
+
+def keyset_filter(sort: SortSpec, values: list) -> dict:
+    """Build the predicate selecting documents positioned after `values` in `sort` order."""
+    branches = []
+    for index, (field, direction) in enumerate(sort):
+        branch = {prefix_field: values[i] for i, (prefix_field, _) in enumerate(sort[:index])}
+        after = _after(field, direction, values[index])
+        if after is None:
+            continue
+        branches.append({"$and": [branch, after]} if branch else after)
+    return branches[0] if len(branches) == 1 else {"$or": branches}
+
+
+def apply_cursor(filter_: dict, sort: SortSpec, cursor: str | None) -> dict:
+    if not cursor:
+        return filter_
+    after = keyset_filter(sort, decode_cursor(cursor, sort))
+    return {"$and": [filter_, after]} if filter_ else after
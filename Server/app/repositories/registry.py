@@ -0,0 +1,114 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Dict, Iterable, List, Tuple, Type
+
+from app.repositories.base import BaseRepository, QueryShape
+from app.repositories.earnings_rollup import EarningsRollupRepository
+from app.repositories.rent import RentRepository
+from app.repositories.user import UserRepository
+from app.repositories.vehicle import VehicleRepository
+from app.repositories.vehicle_calendar import VehicleCalendarRepository
+
+# Every repository whose declared indexes are ensured on startup.
+REPOSITORIES: Tuple[Type[BaseRepository], ...] = (
+    UserRepository,
+    VehicleRepository,
+    RentRepository,
+    EarningsRollupRepository,
+    VehicleCalendarRepository,
+)
+
+# Plan stages that read documents without an index.
+_SCAN_STAGES = {"COLLSCAN"}
+# Plan stages that sort in memory instead of walking an index in order.
+_BLOCKING_SORT_STAGES = {"SORT"}
+
+
+async def ensure_all_indexes(db: AsyncIOMotorDatabase) -> Dict[str, List[str]]:
+    """Ensure the declared indexes of every registered repository; returns index names per collection."""
+    created = {}
+    for repository_cls in REPOSITORIES:
+        repo = repository_cls(db)
+        created[repo.collection_name] = await repo.ensure_indexes()
+    return created
+
+
+def _plan_stages(plan: dict) -> Iterable[dict]:
+    if not isinstance(plan, dict):
+        return
+    yield plan
+    for key in ("inputStage", "queryPlan", "innerStage", "outerStage"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+def _query_planners(explain: dict) -> Iterable[dict]:
+    # find explains, and aggregates pushed down entirely to the query layer, carry
+    # `queryPlanner` at the top; other aggregates carry it inside the first `$cursor` stage.
+    if "queryPlanner" in explain:
+        yield explain["queryPlanner"]
+    for stage in explain.get("stages", []):
+        cursor = stage.get("$cursor") if isinstance(stage, dict) else None
+        if cursor and "queryPlanner" in cursor:
+            yield cursor["queryPlanner"]
+    for shard in (explain.get("shards") or {}).values():
+        yield from _query_planners(shard)
+
+
+def summarize_plan(explain: dict) -> dict:
+    """Reduce an explain() document to the facts the index report needs."""
+    stages: List[str] = []
+    indexes: List[str] = []
+    for planner in _query_planners(explain):
+        for stage in _plan_stages(planner.get("winningPlan", {})):
+            name = stage.get("stage")
+            if name:
+                stages.append(name)
+            if stage.get("indexName"):
+                indexes.append(stage["indexName"])
+    stats = explain.get("executionStats") or {}
+    return {
+        "stages": stages,
+        "indexes": indexes,
+        "collection_scan": any(stage in _SCAN_STAGES for stage in stages),
+        "in_memory_sort": any(stage in _BLOCKING_SORT_STAGES for stage in stages),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+    }
+
+
+async def explain_shape(
+    db: AsyncIOMotorDatabase, collection_name: str, shape: QueryShape, verbosity: str = "queryPlanner"
+) -> dict:
+    if shape.pipeline is not None:
+        command = {"aggregate": collection_name, "pipeline": shape.pipeline, "cursor": {}}
+    else:
+        command = {"find": collection_name, "filter": shape.filter}
+        if shape.sort:
+            command["sort"] = dict(shape.sort)
+    explain = await db.command("explain", command, verbosity=verbosity)
+    return summarize_plan(explain)
+
+
+async def index_report(
+    db: AsyncIOMotorDatabase,
+    *,
+    extra_shapes: Dict[str, List[QueryShape]] | None = None,
+    verbosity: str = "queryPlanner",
+) -> List[dict]:
+    """Explain every registered query shape and return one report row per shape."""
+    shapes_by_collection: Dict[str, List[QueryShape]] = {}
+    for repository_cls in REPOSITORIES:
+        repo = repository_cls(db)
+        shapes_by_collection.setdefault(repo.collection_name, []).extend(repository_cls.query_shapes)
+    for collection_name, shapes in (extra_shapes or {}).items():
+        shapes_by_collection.setdefault(collection_name, []).extend(shapes)
+
+    rows = []
+    for collection_name, shapes in shapes_by_collection.items():
+        for shape in shapes:
+            summary = await explain_shape(db, collection_name, shape, verbosity=verbosity)
+            rows.append({"collection": collection_name, "shape": shape.name, **summary})
+    return rows
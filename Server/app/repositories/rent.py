@@ -1,101 +1,159 @@
+from datetime import datetime, timezone
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List, Any
-from bson import ObjectId
-from bson.errors import InvalidId
-from app.repositories.base import BaseRepository
+from typing import Any, Iterable, List, Tuple
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
+from app.repositories.base import BaseRepository, QueryShape
+from app.repositories.ids import IdCodec
 
 RENT_COLLECTION = "rents"
 
+# Keyset order for renter and owner listings: most recent bookings first.
+RENT_PAGE_SORT = [("start_date", DESCENDING), ("_id", DESCENDING)]
+
+RENT_INDEXES = [
+    IndexModel([("renter_uid", ASCENDING), ("start_date", DESCENDING), ("_id", DESCENDING)], name="renter_page"),
+    IndexModel([("owner_uid", ASCENDING), ("start_date", DESCENDING), ("_id", DESCENDING)], name="owner_page"),
+    IndexModel([("owner_uid", ASCENDING), ("end_date", DESCENDING), ("_id", DESCENDING)], name="owner_recent"),
+    # Booking intervals per vehicle, for availability and overlap checks. The trailing
+    # status key lets the overlap query be answered from the index alone.
+    IndexModel(
+        [("vehicle_id", ASCENDING), ("start_date", ASCENDING), ("end_date", ASCENDING), ("booking_status", ASCENDING)],
+        name="vehicle_interval",
+    ),
+]
+
+# Bookings that hold a vehicle for their dates.
+BLOCKING_RENT_STATUSES = ("pending", "accepted")
 
-def _stringify_id(doc: dict) -> dict:
-    if not doc:
-        return doc
-    if "_id" in doc and not isinstance(doc["_id"], str):
-        doc["_id"] = str(doc["_id"])
-    return doc
 
+def build_overlap_query(*, vehicle_ids: List[str], start_date: datetime, end_date: datetime) -> dict:
+    """Blocking rents on any of `vehicle_ids` that overlap the half-open interval [start_date, end_date)."""
+    return {
+        "vehicle_id": {"$in": list(vehicle_ids)},
+        "start_date": {"$lt": end_date},
+        "end_date": {"$gt": start_date},
+        "booking_status": {"$in": list(BLOCKING_RENT_STATUSES)},
+    }
 
-def _to_object_id(value: Any) -> ObjectId | None:
-    if isinstance(value, ObjectId):
-        return value
-    if not isinstance(value, str):
-        return None
-    try:
-        return ObjectId(value)
-    except (InvalidId, TypeError):
-        return None
+
+def _stringify_id(doc: dict) -> dict:
+    return IdCodec.decode(doc)
 
 
 class RentRepository(BaseRepository):
+    indexes = RENT_INDEXES
+    versioned = True
+    query_shapes = [
+        QueryShape("get_by_id", {"_id": "rent_1"}),
+        QueryShape("page_by_renter", {"renter_uid": "renter_1"}, sort=RENT_PAGE_SORT),
+        QueryShape("page_by_owner", {"owner_uid": "owner_1"}, sort=RENT_PAGE_SORT),
+        QueryShape(
+            "overlapping_bookings",
+            build_overlap_query(
+                vehicle_ids=["veh_1", "veh_2"],
+                start_date=datetime(2026, 6, 3, tzinfo=timezone.utc),
+                end_date=datetime(2026, 6, 7, tzinfo=timezone.utc),
+            ),
+        ),
+        QueryShape(
+            "recent_completed_by_owner",
+            {"owner_uid": "owner_1", "booking_status": "completed"},
+            sort=[("end_date", DESCENDING), ("_id", DESCENDING)],
+        ),
+    ]
+
     def __init__(self, db: AsyncIOMotorDatabase):
         super().__init__(db, RENT_COLLECTION)
 
-    async def create_rent(self, *, renter_uid: str, rent_doc: dict) -> dict:
+    async def create_rent(self, *, renter_uid: str, rent_doc: dict, rent_id: Any = None) -> dict:
         doc = rent_doc.copy()
         doc["renter_uid"] = renter_uid
         doc["booking_status"] = "pending"
 
-        # Always auto-generate id at DB level; ignore any client-provided rentid
+        # Ids are generated server-side (or by the booking service, which needs the id
+        # before the insert); any client-provided rentid is ignored.
         doc.pop("rentid", None)
+        doc.pop("_id", None)
+        if rent_id is not None:
+            doc["_id"] = rent_id
 
         created = await self.create(doc)
         return _stringify_id(created)
 
     async def accept_rent(self, *, owner_uid: str, rent_id: Any) -> dict | None:
-        result = await self.collection.update_one(
-            {"_id": rent_id, "owner_uid": owner_uid},
+        updated = await self.update_returning(
+            self.id_filter(rent_id, owner_uid=owner_uid),
             {"$set": {"booking_status": "accepted"}},
         )
-        if result.matched_count == 0:
-            oid = _to_object_id(rent_id)
-            if oid is None:
-                return None
-            result = await self.collection.update_one(
-                {"_id": oid, "owner_uid": owner_uid},
-                {"$set": {"booking_status": "accepted"}},
-            )
-            if result.matched_count == 0:
-                return None
-            updated = await self.get_by_id(oid)
-            return _stringify_id(updated)
-        updated = await self.get_by_id(rent_id)
         return _stringify_id(updated)
 
-    async def set_rent_status(self, *, owner_uid: str, rent_id: Any, booking_status: str) -> dict | None:
-        result = await self.collection.update_one(
-            {"_id": rent_id, "owner_uid": owner_uid},
-            {"$set": {"booking_status": booking_status}},
-        )
-        if result.matched_count == 0:
-            oid = _to_object_id(rent_id)
-            if oid is None:
-                return None
-            result = await self.collection.update_one(
-                {"_id": oid, "owner_uid": owner_uid},
-                {"$set": {"booking_status": booking_status}},
-            )
-            if result.matched_count == 0:
-                return None
-            updated = await self.get_by_id(oid)
-            return _stringify_id(updated)
-        updated = await self.get_by_id(rent_id)
+    async def set_rent_status(
+        self, *, owner_uid: str, rent_id: Any, booking_status: str, extra_fields: dict | None = None
+    ) -> dict | None:
+        update = {"$set": {**(extra_fields or {}), "booking_status": booking_status}}
+        updated = await self.update_returning(self.id_filter(rent_id, owner_uid=owner_uid), update)
         return _stringify_id(updated)
 
-    async def get_rent_by_id(self, *, rent_id: Any) -> dict | None:
-        doc = await self.get_by_id(rent_id)
-        if doc is None:
-            oid = _to_object_id(rent_id)
-            if oid is not None:
-                doc = await self.get_by_id(oid)
+    async def transition_status(
+        self,
+        *,
+        owner_uid: str,
+        rent_id: Any,
+        from_statuses: Iterable[str],
+        to_status: str,
+        earned_amount: float | None = None,
+        session: Any = None,
+    ) -> dict | None:
+        """Move the owner's rent to `to_status` only if it is currently in one of `from_statuses`.
+
+        `earned_amount`, when given, is written in the same `$set` as the status.
+        Returns the rent as it was before the change, or None when nothing matched.
+        """
+        changes: dict = {"booking_status": to_status}
+        if earned_amount is not None:
+            changes["earned_amount"] = earned_amount
+        before = await self.update_returning(
+            self.id_filter(rent_id, owner_uid=owner_uid, booking_status={"$in": list(from_statuses)}),
+            {"$set": changes},
+            return_document=ReturnDocument.BEFORE,
+            session=session,
+        )
+        return _stringify_id(before)
+
+    async def get_rent_by_id(self, *, rent_id: Any, session: Any = None) -> dict | None:
+        doc = await self.get_by_id(rent_id, session=session)
         return _stringify_id(doc)
 
+    async def booked_vehicle_ids(self, *, vehicle_ids: List[str], start_date: datetime, end_date: datetime) -> set:
+        """Which of `vehicle_ids` have a blocking booking overlapping [start_date, end_date)."""
+        if not vehicle_ids:
+            return set()
+        # Projecting only indexed fields lets the vehicle_interval index cover the query.
+        cursor = self.collection.find(
+            build_overlap_query(vehicle_ids=vehicle_ids, start_date=start_date, end_date=end_date),
+            {"vehicle_id": 1, "_id": 0},
+        )
+        return {doc["vehicle_id"] async for doc in cursor}
+
     async def list_rents_by_renter(self, *, renter_uid: str) -> List[dict]:
-        docs = await self.list({"renter_uid": renter_uid}, limit=200)
+        docs = await self.list({"renter_uid": renter_uid}, limit=None)
         return [_stringify_id(d) for d in docs]
 
-    async def list_rents_by_owner(self, *, owner_uid: str) -> List[dict]:
-        docs = await self.list({"owner_uid": owner_uid}, limit=200)
-        return [_stringify_id(d) for d in docs]
+    async def page_rents_by_renter(
+        self, *, renter_uid: str, limit: int = 50, cursor: str | None = None
+    ) -> Tuple[List[dict], str | None]:
+        docs, next_cursor = await self.list_page(
+            {"renter_uid": renter_uid}, sort=RENT_PAGE_SORT, limit=limit, cursor=cursor
+        )
+        return [_stringify_id(d) for d in docs], next_cursor
+
+    async def page_rents_by_owner(
+        self, *, owner_uid: str, limit: int = 50, cursor: str | None = None
+    ) -> Tuple[List[dict], str | None]:
+        docs, next_cursor = await self.list_page(
+            {"owner_uid": owner_uid}, sort=RENT_PAGE_SORT, limit=limit, cursor=cursor
+        )
+        return [_stringify_id(d) for d in docs], next_cursor
 
     async def update_rent(self, *, renter_uid: str, rent_id: Any, update_fields: dict) -> dict | None:
         # Only allow renter to update the record
@@ -104,29 +162,17 @@ class RentRepository(BaseRepository):
         update_fields.pop("owner_uid", None)
         update_fields.pop("vehicle_id", None)
 
-        result = await self.collection.update_one({"_id": rent_id, "renter_uid": renter_uid}, {"$set": update_fields})
-        if result.matched_count == 0:
-            oid = _to_object_id(rent_id)
-            if oid is None:
-                return None
-            result = await self.collection.update_one({"_id": oid, "renter_uid": renter_uid}, {"$set": update_fields})
-            if result.matched_count == 0:
-                return None
-            updated = await self.get_by_id(oid)
-            return _stringify_id(updated)
-        updated = await self.get_by_id(rent_id)
+        filter_ = self.id_filter(rent_id, renter_uid=renter_uid)
+        if not update_fields:
+            return _stringify_id(await self.collection.find_one(filter_))
+        updated = await self.update_returning(filter_, {"$set": update_fields})
         return _stringify_id(updated)
 
-    async def delete_rent(self, *, renter_uid: str, rent_id: Any) -> bool:
+    async def delete_rent(self, *, renter_uid: str, rent_id: Any) -> dict | None:
+        """Delete the renter's booking and return it as it was, or None if nothing matched."""
         # Only renter can delete their rent
-        result = await self.collection.delete_one({"_id": rent_id, "renter_uid": renter_uid})
-        if result.deleted_count == 1:
-            return True
-        oid = _to_object_id(rent_id)
-        if oid is None:
-            return False
-        result = await self.collection.delete_one({"_id": oid, "renter_uid": renter_uid})
-        return result.deleted_count == 1
+        deleted = await self.delete_returning(self.id_filter(rent_id, renter_uid=renter_uid))
+        return _stringify_id(deleted)
 
 
 # Backwards-compatible function-style API
@@ -145,9 +191,23 @@ async def list_rents_by_renter(db: AsyncIOMotorDatabase, *, renter_uid: str) ->
     return await repo.list_rents_by_renter(renter_uid=renter_uid)
 
 
-async def list_rents_by_owner(db: AsyncIOMotorDatabase, *, owner_uid: str) -> List[dict]:
+async def page_rents_by_renter(
+    db: AsyncIOMotorDatabase, *, renter_uid: str, limit: int = 50, cursor: str | None = None
+) -> Tuple[List[dict], str | None]:
+    repo = RentRepository(db)
+    return await repo.page_rents_by_renter(renter_uid=renter_uid, limit=limit, cursor=cursor)
+
+
+async def page_rents_by_owner(
+    db: AsyncIOMotorDatabase, *, owner_uid: str, limit: int = 50, cursor: str | None = None
+) -> Tuple[List[dict], str | None]:
+    repo = RentRepository(db)
+    return await repo.page_rents_by_owner(owner_uid=owner_uid, limit=limit, cursor=cursor)
+
+
+async def ensure_rent_indexes(db: AsyncIOMotorDatabase) -> List[str]:
     repo = RentRepository(db)
-    return await repo.list_rents_by_owner(owner_uid=owner_uid)
+    return await repo.ensure_indexes()
 
 
 async def update_rent(db: AsyncIOMotorDatabase, *, renter_uid: str, rent_id: str, update_fields: dict) -> dict | None:
@@ -166,11 +226,14 @@ async def set_rent_status(
     owner_uid: str,
     rent_id: str,
     booking_status: str,
+    extra_fields: dict | None = None,
 ) -> dict | None:
     repo = RentRepository(db)
-    return await repo.set_rent_status(owner_uid=owner_uid, rent_id=rent_id, booking_status=booking_status)
+    return await repo.set_rent_status(
+        owner_uid=owner_uid, rent_id=rent_id, booking_status=booking_status, extra_fields=extra_fields
+    )
 
 
-async def delete_rent(db: AsyncIOMotorDatabase, *, renter_uid: str, rent_id: str) -> bool:
+async def delete_rent(db: AsyncIOMotorDatabase, *, renter_uid: str, rent_id: str) -> dict | None:
     repo = RentRepository(db)
     return await repo.delete_rent(renter_uid=renter_uid, rent_id=rent_id)
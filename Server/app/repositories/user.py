@@ -1,12 +1,21 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.schemas import UserProfileBase
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, QueryShape
+from app.repositories.ids import STRING_POLICY
 
 # The name of our MongoDB collection
 USER_COLLECTION = "users"
 
 
 class UserRepository(BaseRepository):
+    # Profiles are keyed by Firebase uid and only ever read by `_id`.
+    indexes = []
+    id_policy = STRING_POLICY
+    versioned = True
+    query_shapes = [
+        QueryShape("get_by_uid", {"_id": "uid_1"}),
+    ]
+
     def __init__(self, db: AsyncIOMotorDatabase):
         super().__init__(db, USER_COLLECTION)
 
@@ -22,6 +31,14 @@ class UserRepository(BaseRepository):
     async def update_user_profile_by_uid(self, *, uid: str, update_data: dict) -> dict | None:
         return await self.update_by_id(uid, update_data)
 
+    async def set_avatar_variants(self, *, uid: str, variants: dict) -> bool:
+        # Only attach variants if the avatar they were rendered from is still current.
+        result = await self.collection.update_one(
+            {"_id": uid, "avatar_url": variants["source_url"]},
+            self.versioned_update({"$set": {"avatar_variants": variants}}),
+        )
+        return result.matched_count == 1
+
     async def delete_user_profile_by_uid(self, *, uid: str) -> bool:
         return await self.delete_by_id(uid)
 
@@ -42,6 +59,11 @@ async def update_user_profile_by_uid(db: AsyncIOMotorDatabase, *, uid: str, upda
     return await repo.update_user_profile_by_uid(uid=uid, update_data=update_data)
 
 
+async def set_avatar_variants(db: AsyncIOMotorDatabase, *, uid: str, variants: dict) -> bool:
+    repo = UserRepository(db)
+    return await repo.set_avatar_variants(uid=uid, variants=variants)
+
+
 async def delete_user_profile_by_uid(db: AsyncIOMotorDatabase, *, uid: str) -> bool:
     repo = UserRepository(db)
     return await repo.delete_user_profile_by_uid(uid=uid)
\ No newline at end of file
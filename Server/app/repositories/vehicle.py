@@ -1,38 +1,240 @@
+import re
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List, Any
-from bson import ObjectId
-from bson.errors import InvalidId
-from app.repositories.base import BaseRepository
+from typing import List, Any, Tuple
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, TEXT, IndexModel
+from app.core.catalog_cache import catalog_cache
+from app.repositories.base import BaseRepository, QueryShape
+from app.repositories.ids import IdCodec
+from app.repositories.pagination import apply_cursor, encode_cursor
 
 VEHICLE_COLLECTION = "vehicles"
 
+# Keyset order for the owner and public catalog listings.
+VEHICLE_PAGE_SORT = [("_id", ASCENDING)]
+
+# Sort orders exposed by the public search endpoint. `_id` is always the final
+# key so results are deterministic across pages.
+VEHICLE_SEARCH_SORTS = {
+    "newest": [("_id", DESCENDING)],
+    "price_asc": [("price", ASCENDING), ("_id", ASCENDING)],
+    "price_desc": [("price", DESCENDING), ("_id", DESCENDING)],
+    "year_desc": [("year", DESCENDING), ("_id", DESCENDING)],
+}
+
+# Compound indexes backing the search filters. Equality fields come first,
+# then the sort key, so filter + sort + price range is a single index scan.
+VEHICLE_SEARCH_INDEXES = [
+    IndexModel([("type", ASCENDING), ("fuel", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)], name="search_type_fuel_price"),
+    IndexModel([("fuel", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)], name="search_fuel_price"),
+    IndexModel([("transmission", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)], name="search_transmission_price"),
+    IndexModel([("location_lc", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)], name="search_location_price"),
+    IndexModel([("price", ASCENDING), ("_id", ASCENDING)], name="search_price"),
+    IndexModel([("year", DESCENDING), ("_id", DESCENDING)], name="search_year"),
+]
+
+# Free-text search weights: a hit on the make or model counts most, then the
+# town, then the descriptive fields. `transmission` is included so queries like
+# "toyota colombo automatic" can match every token.
+VEHICLE_TEXT_WEIGHTS = {"brand": 10, "model": 10, "location": 5, "type": 3, "transmission": 2, "fuel": 2}
+
+# Relevance order for text search. `text_score` is computed per query, so the
+# cursor carries the score of the last result alongside its `_id`.
+VEHICLE_RELEVANCE_SORT = [("text_score", DESCENDING), ("_id", ASCENDING)]
+
+# Sidebar facets. Each facet is counted with every filter except its own, so
+# picking "SUV" still shows how many Sedans the other filters would match.
+VEHICLE_FACET_FIELDS = ("type", "fuel", "transmission", "seats")
+# Lower bounds of the price buckets; the last bucket is open-ended.
+VEHICLE_PRICE_BUCKETS = [0, 25, 50, 75, 100, 150, 200, 300]
+
+VEHICLE_INDEXES = [
+    IndexModel([("owner_uid", ASCENDING), ("_id", ASCENDING)], name="owner_page"),
+    *VEHICLE_SEARCH_INDEXES,
+    # Vehicles without `geo` are left out of the index and never returned by proximity search.
+    IndexModel([("geo", GEOSPHERE)], name="geo"),
+    # Brand and place names are not English words, so no stemming or stop words.
+    IndexModel(
+        [(field, TEXT) for field in VEHICLE_TEXT_WEIGHTS],
+        name="search_text",
+        weights=VEHICLE_TEXT_WEIGHTS,
+        default_language="none",
+    ),
+]
+
 
 def _stringify_id(doc: dict) -> dict:
-    if not doc:
-        return doc
-    if "_id" in doc and not isinstance(doc["_id"], str):
-        doc["_id"] = str(doc["_id"])
-    return doc
+    return IdCodec.decode(doc)
 
 
-def _to_object_id(value: Any) -> ObjectId | None:
-    if isinstance(value, ObjectId):
-        return value
-    if not isinstance(value, str):
-        return None
-    try:
-        return ObjectId(value)
-    except (InvalidId, TypeError):
+def location_key(location: str | None) -> str | None:
+    """Value stored as `location_lc`: the trimmed, lowercased `location` that location search matches on."""
+    if not isinstance(location, str) or not location.strip():
         return None
+    return location.strip().lower()
+
+
+def build_vehicle_search_query(
+    *,
+    types: List[str] | None = None,
+    fuels: List[str] | None = None,
+    transmissions: List[str] | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    min_seats: int | None = None,
+    location: str | None = None,
+    availability: bool | None = None,
+) -> dict:
+    """Translate search filters into a MongoDB query document."""
+    query: dict = {}
+    if types:
+        query["type"] = {"$in": list(types)}
+    if fuels:
+        query["fuel"] = {"$in": list(fuels)}
+    if transmissions:
+        query["transmission"] = {"$in": list(transmissions)}
+
+    price: dict = {}
+    if min_price is not None:
+        price["$gte"] = min_price
+    if max_price is not None:
+        price["$lte"] = max_price
+    if price:
+        query["price"] = price
+
+    if min_seats is not None:
+        query["seats"] = {"$gte": min_seats}
+    if location_key(location):
+        # Case-sensitive anchored prefix on the lowercased copy: "Colombo" finds "Colombo 07" as a
+        # tight range scan of `search_location_price`, which a case-insensitive regex can't get.
+        query["location_lc"] = {"$regex": f"^{re.escape(location_key(location))}"}
+    if availability is not None:
+        query["availability"] = availability
+    return query
+
+
+def build_near_pipeline(
+    *, lng: float, lat: float, max_distance_m: float, limit: int, query: dict | None = None
+) -> list:
+    """Nearest-first vehicles within `max_distance_m` of the point.
+
+    `$geoNear` walks the 2dsphere index outwards from the point and stops after
+    `limit` results, so the cost follows the limit, not the catalog size.
+    """
+    geo_near = {
+        "near": {"type": "Point", "coordinates": [lng, lat]},
+        "distanceField": "distance_m",
+        "maxDistance": max_distance_m,
+        "spherical": True,
+        "key": "geo",
+    }
+    if query:
+        geo_near["query"] = query
+    return [{"$geoNear": geo_near}, {"$limit": limit}]
+
+
+def build_text_search_pipeline(*, text: str, query: dict | None = None, limit: int, cursor: str | None = None) -> list:
+    """Vehicles matching any token of `text` (plus `query`), most relevant first.
+
+    The `$text` match is served by the `search_text` index; only the matching
+    vehicles are scored and sorted, and `limit` caps what is returned.
+    """
+    stages = [
+        {"$match": {"$text": {"$search": text}, **(query or {})}},
+        {"$addFields": {"text_score": {"$meta": "textScore"}}},
+    ]
+    after = apply_cursor({}, VEHICLE_RELEVANCE_SORT, cursor)
+    if after:
+        stages.append({"$match": after})
+    stages.append({"$sort": dict(VEHICLE_RELEVANCE_SORT)})
+    stages.append({"$limit": limit})
+    return stages
+
+
+def build_vehicle_facet_pipeline(*, query: dict | None = None, text: str | None = None) -> list:
+    """Counts per facet value and price bucket for `query`, as one `$facet` aggregation.
+
+    Filters on non-facet fields (location, availability, text) run first and
+    can use the search indexes; each facet then applies the other facets'
+    filters to that shared set.
+    """
+    query = query or {}
+    faceted = (*VEHICLE_FACET_FIELDS, "price")
+    shared = {key: value for key, value in query.items() if key not in faceted}
+    if text:
+        shared = {"$text": {"$search": text}, **shared}
+
+    def others(field: str) -> dict:
+        return {key: value for key, value in query.items() if key in faceted and key != field}
+
+    facets = {"total": [{"$match": others("")}, {"$count": "count"}]}
+    for field in VEHICLE_FACET_FIELDS:
+        facets[field] = [
+            {"$match": {**others(field), field: {"$ne": None}}},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+        ]
+    facets["price"] = [
+        {"$match": {**others("price"), "price": {"$type": "number"}}},
+        {
+            "$bucket": {
+                "groupBy": "$price",
+                "boundaries": VEHICLE_PRICE_BUCKETS,
+                "default": VEHICLE_PRICE_BUCKETS[-1],
+                "output": {"count": {"$sum": 1}},
+            }
+        },
+    ]
+    return [{"$match": shared}, {"$facet": facets}]
+
+
+def _price_bucket(bucket: dict) -> dict:
+    lower = bucket["_id"]
+    index = VEHICLE_PRICE_BUCKETS.index(lower)
+    upper = VEHICLE_PRICE_BUCKETS[index + 1] if index + 1 < len(VEHICLE_PRICE_BUCKETS) else None
+    return {"min": lower, "max": upper, "count": bucket["count"]}
 
 
 class VehicleRepository(BaseRepository):
+    indexes = VEHICLE_INDEXES
+    versioned = True
+    query_shapes = [
+        QueryShape("get_by_id", {"_id": "veh_1"}),
+        QueryShape("page_by_owner", {"owner_uid": "owner_1"}, sort=VEHICLE_PAGE_SORT),
+        QueryShape("page_all", {}, sort=VEHICLE_PAGE_SORT),
+        QueryShape(
+            "search_type_fuel_price",
+            build_vehicle_search_query(types=["SUV"], fuels=["Petrol"], min_price=20, max_price=120),
+            sort=VEHICLE_SEARCH_SORTS["price_asc"],
+        ),
+        QueryShape(
+            "search_transmission",
+            build_vehicle_search_query(transmissions=["automatic"]),
+            sort=VEHICLE_SEARCH_SORTS["price_desc"],
+        ),
+        QueryShape("search_location", build_vehicle_search_query(location="Colombo"), sort=VEHICLE_SEARCH_SORTS["price_asc"]),
+        QueryShape("search_newest", {}, sort=VEHICLE_SEARCH_SORTS["newest"]),
+        QueryShape("search_year", {}, sort=VEHICLE_SEARCH_SORTS["year_desc"]),
+        QueryShape(
+            "text_search",
+            pipeline=build_text_search_pipeline(text="toyota colombo automatic", query={"availability": True}, limit=25),
+        ),
+        QueryShape(
+            "facets",
+            pipeline=build_vehicle_facet_pipeline(query=build_vehicle_search_query(types=["SUV"], location="Colombo")),
+        ),
+        QueryShape(
+            "near",
+            pipeline=build_near_pipeline(lng=79.8612, lat=6.9271, max_distance_m=10_000, limit=20, query={"availability": True}),
+        ),
+    ]
+
     def __init__(self, db: AsyncIOMotorDatabase):
         super().__init__(db, VEHICLE_COLLECTION)
 
     async def create_vehicle(self, *, owner_uid: str, vehicle_doc: dict) -> dict:
         vehicle_doc = vehicle_doc.copy()
         vehicle_doc["owner_uid"] = owner_uid
+        vehicle_doc["location_lc"] = location_key(vehicle_doc.get("location"))
 
         if vehicle_doc.get("vehicleid"):
             vehicle_doc["_id"] = vehicle_doc.pop("vehicleid")
@@ -40,51 +242,121 @@ class VehicleRepository(BaseRepository):
             vehicle_doc.pop("vehicleid", None)
 
         created = await self.create(vehicle_doc)
+        catalog_cache.invalidate()
         return _stringify_id(created)
 
     async def get_vehicle_by_id(self, *, vehicle_id: Any) -> dict | None:
         doc = await self.get_by_id(vehicle_id)
-        if doc is None:
-            oid = _to_object_id(vehicle_id)
-            if oid is not None:
-                doc = await self.get_by_id(oid)
         return _stringify_id(doc)
 
     async def list_vehicles_by_owner(self, *, owner_uid: str) -> List[dict]:
-        docs = await self.list({"owner_uid": owner_uid}, limit=200)
+        docs = await self.list({"owner_uid": owner_uid}, limit=None)
         return [_stringify_id(d) for d in docs]
 
+    async def page_vehicles_by_owner(
+        self, *, owner_uid: str, limit: int = 50, cursor: str | None = None
+    ) -> Tuple[List[dict], str | None]:
+        docs, next_cursor = await self.list_page(
+            {"owner_uid": owner_uid}, sort=VEHICLE_PAGE_SORT, limit=limit, cursor=cursor
+        )
+        return [_stringify_id(d) for d in docs], next_cursor
+
     async def list_all_vehicles(self, *, limit: int = 200) -> List[dict]:
         docs = await self.list({}, limit=limit)
         return [_stringify_id(d) for d in docs]
 
+    async def page_all_vehicles(self, *, limit: int = 50, cursor: str | None = None) -> Tuple[List[dict], str | None]:
+        docs, next_cursor = await self.list_page({}, sort=VEHICLE_PAGE_SORT, limit=limit, cursor=cursor)
+        return [_stringify_id(d) for d in docs], next_cursor
+
+    async def search_vehicles(
+        self, *, query: dict, sort: str = "newest", limit: int = 24, cursor: str | None = None
+    ) -> Tuple[List[dict], str | None]:
+        docs, next_cursor = await self.list_page(query, sort=VEHICLE_SEARCH_SORTS[sort], limit=limit, cursor=cursor)
+        return [_stringify_id(d) for d in docs], next_cursor
+
+    async def text_page(
+        self, *, text: str, query: dict | None = None, limit: int = 24, cursor: str | None = None
+    ) -> Tuple[List[dict], str | None]:
+        """One relevance-ordered page of raw documents and the cursor for the next one, like `list_page`."""
+        pipeline = build_text_search_pipeline(text=text, query=query, limit=limit + 1, cursor=cursor)
+        docs = await self.collection.aggregate(pipeline).to_list(length=limit + 1)
+        if len(docs) <= limit:
+            return docs, None
+        docs = docs[:limit]
+        return docs, encode_cursor(docs[-1], VEHICLE_RELEVANCE_SORT)
+
+    async def search_text(
+        self, *, text: str, query: dict | None = None, limit: int = 24, cursor: str | None = None
+    ) -> Tuple[List[dict], str | None]:
+        docs, next_cursor = await self.text_page(text=text, query=query, limit=limit, cursor=cursor)
+        return [_stringify_id(d) for d in docs], next_cursor
+
+    async def facet_counts(self, *, query: dict | None = None, text: str | None = None) -> dict:
+        pipeline = build_vehicle_facet_pipeline(query=query, text=text)
+        result = (await self.collection.aggregate(pipeline).to_list(length=1))[0]
+        counts = {field: [{"value": g["_id"], "count": g["count"]} for g in result[field]] for field in VEHICLE_FACET_FIELDS}
+        counts["price"] = [_price_bucket(b) for b in result["price"]]
+        counts["total"] = result["total"][0]["count"] if result["total"] else 0
+        return counts
+
+    async def find_near(
+        self, *, lng: float, lat: float, max_distance_m: float, limit: int = 20, query: dict | None = None
+    ) -> List[dict]:
+        pipeline = build_near_pipeline(lng=lng, lat=lat, max_distance_m=max_distance_m, limit=limit, query=query)
+        docs = await self.collection.aggregate(pipeline).to_list(length=limit)
+        return [_stringify_id(d) for d in docs]
+
     async def update_vehicle(self, *, owner_uid: str, vehicle_id: Any, update_fields: dict) -> dict | None:
         update_fields.pop("owner_uid", None)
         update_fields.pop("_id", None)
         update_fields.pop("vehicleid", None)
+        update_fields.pop("location_lc", None)
+        if "location" in update_fields:
+            update_fields["location_lc"] = location_key(update_fields["location"])
+
+        # Restrict update to owner.
+        filter_ = self.id_filter(vehicle_id, owner_uid=owner_uid)
+        if not update_fields:
+            return _stringify_id(await self.collection.find_one(filter_))
+        updated = await self.update_returning(filter_, {"$set": update_fields})
+        if updated is not None:
+            catalog_cache.invalidate()
+        return _stringify_id(updated)
 
-        # Restrict update to owner; support both string and ObjectId ids.
-        result = await self.collection.update_one({"_id": vehicle_id, "owner_uid": owner_uid}, {"$set": update_fields})
-        if result.matched_count == 0:
-            oid = _to_object_id(vehicle_id)
-            if oid is not None:
-                result = await self.collection.update_one({"_id": oid, "owner_uid": owner_uid}, {"$set": update_fields})
-                if result.matched_count == 0:
-                    return None
-                updated = await self.get_by_id(oid)
-                return _stringify_id(updated)
-            return None
-        updated = await self.get_by_id(vehicle_id)
+    async def set_availability(
+        self, *, owner_uid: str, vehicle_id: Any, available: bool, session: Any = None
+    ) -> dict | None:
+        updated = await self.update_returning(
+            self.id_filter(vehicle_id, owner_uid=owner_uid),
+            {"$set": {"availability": available}},
+            session=session,
+        )
+        # Inside a transaction the caller invalidates once it commits; clearing now would let a
+        # concurrent load re-cache the pre-commit catalog for the whole TTL.
+        if updated is not None and session is None:
+            catalog_cache.invalidate()
         return _stringify_id(updated)
 
+    async def add_image_variants(self, *, vehicle_id: Any, variants: dict) -> bool:
+        """Attach generated variants, but only while the source image is still on the vehicle."""
+        source_url = variants["source_url"]
+        result = await self.collection.update_one(
+            {
+                "_id": self.ids.condition(vehicle_id),
+                "image_urls": source_url,
+                "image_variants.source_url": {"$ne": source_url},
+            },
+            self.versioned_update({"$push": {"image_variants": variants}}),
+        )
+        if result.matched_count:
+            catalog_cache.invalidate()
+        return result.matched_count == 1
+
     async def delete_vehicle(self, *, owner_uid: str, vehicle_id: Any) -> bool:
-        result = await self.collection.delete_one({"_id": vehicle_id, "owner_uid": owner_uid})
-        if result.deleted_count == 1:
-            return True
-        oid = _to_object_id(vehicle_id)
-        if oid is None:
-            return False
-        result = await self.collection.delete_one({"_id": oid, "owner_uid": owner_uid})
+        result = await self.collection.delete_one(self.id_filter(vehicle_id, owner_uid=owner_uid))
+        if result.deleted_count:
+            catalog_cache.invalidate()
         return result.deleted_count == 1
 
 
@@ -104,16 +376,82 @@ async def list_vehicles_by_owner(db: AsyncIOMotorDatabase, *, owner_uid: str) ->
     return await repo.list_vehicles_by_owner(owner_uid=owner_uid)
 
 
+async def page_vehicles_by_owner(
+    db: AsyncIOMotorDatabase, *, owner_uid: str, limit: int = 50, cursor: str | None = None
+) -> Tuple[List[dict], str | None]:
+    repo = VehicleRepository(db)
+    return await repo.page_vehicles_by_owner(owner_uid=owner_uid, limit=limit, cursor=cursor)
+
+
 async def list_all_vehicles(db: AsyncIOMotorDatabase, *, limit: int = 200) -> List[dict]:
     repo = VehicleRepository(db)
     return await repo.list_all_vehicles(limit=limit)
 
 
+async def page_all_vehicles(
+    db: AsyncIOMotorDatabase, *, limit: int = 50, cursor: str | None = None
+) -> Tuple[List[dict], str | None]:
+    repo = VehicleRepository(db)
+    return await repo.page_all_vehicles(limit=limit, cursor=cursor)
+
+
+async def search_vehicles(
+    db: AsyncIOMotorDatabase,
+    *,
+    query: dict,
+    sort: str = "newest",
+    limit: int = 24,
+    cursor: str | None = None,
+) -> Tuple[List[dict], str | None]:
+    repo = VehicleRepository(db)
+    return await repo.search_vehicles(query=query, sort=sort, limit=limit, cursor=cursor)
+
+
+async def search_vehicles_text(
+    db: AsyncIOMotorDatabase,
+    *,
+    text: str,
+    query: dict | None = None,
+    limit: int = 24,
+    cursor: str | None = None,
+) -> Tuple[List[dict], str | None]:
+    repo = VehicleRepository(db)
+    return await repo.search_text(text=text, query=query, limit=limit, cursor=cursor)
+
+
+async def count_vehicle_facets(db: AsyncIOMotorDatabase, *, query: dict | None = None, text: str | None = None) -> dict:
+    repo = VehicleRepository(db)
+    return await repo.facet_counts(query=query, text=text)
+
+
+async def find_vehicles_near(
+    db: AsyncIOMotorDatabase,
+    *,
+    lng: float,
+    lat: float,
+    max_distance_m: float,
+    limit: int = 20,
+    query: dict | None = None,
+) -> List[dict]:
+    repo = VehicleRepository(db)
+    return await repo.find_near(lng=lng, lat=lat, max_distance_m=max_distance_m, limit=limit, query=query)
+
+
+async def ensure_vehicle_indexes(db: AsyncIOMotorDatabase) -> List[str]:
+    repo = VehicleRepository(db)
+    return await repo.ensure_indexes()
+
+
 async def update_vehicle(db: AsyncIOMotorDatabase, *, owner_uid: str, vehicle_id: str, update_fields: dict) -> dict | None:
     repo = VehicleRepository(db)
     return await repo.update_vehicle(owner_uid=owner_uid, vehicle_id=vehicle_id, update_fields=update_fields)
 
 
+async def add_vehicle_image_variants(db: AsyncIOMotorDatabase, *, vehicle_id: str, variants: dict) -> bool:
+    repo = VehicleRepository(db)
+    return await repo.add_image_variants(vehicle_id=vehicle_id, variants=variants)
+
+
 async def delete_vehicle(db: AsyncIOMotorDatabase, *, owner_uid: str, vehicle_id: str) -> bool:
     repo = VehicleRepository(db)
     return await repo.delete_vehicle(owner_uid=owner_uid, vehicle_id=vehicle_id)
@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+from typing import Any, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+from app.repositories.base import BaseRepository, QueryShape
+from app.repositories.ids import STRING_POLICY
+from app.repositories.rent import RENT_COLLECTION, BLOCKING_RENT_STATUSES
+
+# One document per vehicle: {"_id": <vehicle_id>, "slots": [{"rent_id", "start_date", "end_date"}, ...]}.
+# Every pending or accepted rent holds a slot, and a slot is only added by a
+# write that is conditional on no other slot overlapping it, so two bookings
+# for the same dates can never both succeed.
+VEHICLE_CALENDAR_COLLECTION = "vehicle_calendars"
+
+
+def _overlapping_slot(*, rent_id: str, start_date: datetime, end_date: datetime) -> dict:
+    return {"rent_id": {"$ne": rent_id}, "start_date": {"$lt": end_date}, "end_date": {"$gt": start_date}}
+
+
+class VehicleCalendarRepository(BaseRepository):
+    # Only ever addressed by `_id`, which is the vehicle id as stored on rents.
+    indexes = []
+    id_policy = STRING_POLICY
+    query_shapes = [
+        QueryShape("get_by_vehicle", {"_id": "veh_1"}),
+    ]
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        super().__init__(db, VEHICLE_CALENDAR_COLLECTION)
+
+    async def reserve(
+        self, *, vehicle_id: str, rent_id: str, start_date: datetime, end_date: datetime, session: Any = None
+    ) -> bool:
+        """Atomically add a slot for `rent_id` unless another rent's slot overlaps it.
+
+        Slots held by `rent_id` itself are ignored, so a booking can be moved to
+        dates that overlap its current ones.
+        """
+        slot = {"rent_id": rent_id, "start_date": start_date, "end_date": end_date}
+        free = {
+            "_id": vehicle_id,
+            "slots": {"$not": {"$elemMatch": _overlapping_slot(rent_id=rent_id, start_date=start_date, end_date=end_date)}},
+        }
+        for _ in range(2):
+            result = await self.collection.update_one(free, {"$push": {"slots": slot}}, session=session)
+            if result.matched_count:
+                return True
+            if await self.collection.find_one({"_id": vehicle_id}, session=session) is not None:
+                return False
+            # First booking since calendars were introduced: build it from the existing rents, then retry.
+            await self._seed(vehicle_id, session=session)
+        return False
+
+    async def release(self, *, vehicle_id: str, rent_id: str, session: Any = None) -> None:
+        """Drop the rent's slots, along with any slot that has already ended."""
+        now = datetime.now(timezone.utc)
+        await self.collection.update_one(
+            {"_id": vehicle_id},
+            {"$pull": {"slots": {"$or": [{"rent_id": rent_id}, {"end_date": {"$lt": now}}]}}},
+            session=session,
+        )
+
+    async def release_slot(
+        self, *, vehicle_id: str, rent_id: str, start_date: datetime, end_date: datetime, session: Any = None
+    ) -> None:
+        """Drop one specific slot of the rent, e.g. its old dates after it was moved."""
+        await self.collection.update_one(
+            {"_id": vehicle_id},
+            {"$pull": {"slots": {"rent_id": rent_id, "start_date": start_date, "end_date": end_date}}},
+            session=session,
+        )
+
+    async def _seed(self, vehicle_id: str, *, session: Any = None) -> None:
+        cursor = self.db[RENT_COLLECTION].find(
+            {"vehicle_id": vehicle_id, "booking_status": {"$in": list(BLOCKING_RENT_STATUSES)}},
+            {"start_date": 1, "end_date": 1},
+            session=session,
+        )
+        slots: List[dict] = []
+        async for rent in cursor:
+            # Rents written with string dates predate the schema's datetime fields and cannot be compared.
+            if isinstance(rent.get("start_date"), datetime) and isinstance(rent.get("end_date"), datetime):
+                slots.append({"rent_id": str(rent["_id"]), "start_date": rent["start_date"], "end_date": rent["end_date"]})
+        try:
+            await self.collection.insert_one({"_id": vehicle_id, "slots": slots}, session=session)
+        except DuplicateKeyError:
+            # Another request seeded it first.
+            pass
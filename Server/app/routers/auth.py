@@ -1,5 +1,5 @@
 import os
-import requests
+import httpx
 from fastapi import APIRouter, HTTPException, Depends, status
 from firebase_admin import auth
 from motor.motor_asyncio import AsyncIOMotorDatabase
@@ -7,6 +7,7 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 # Import dependencies
 from app.core.db import get_database
 from app.core.auth_deps import get_current_user
+from app.core.identity import get_http_client, identity_toolkit_url, run_admin_call
 
 # Import schemas
 from app.schemas import (
@@ -41,7 +42,7 @@ async def register_email_user(
     """
     # A. Create user in Firebase
     try:
-        user = auth.create_user(email=payload.email, password=payload.password)
+        user = await run_admin_call(auth.create_user, email=payload.email, password=payload.password)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Firebase error: {e}")
 
@@ -71,7 +72,7 @@ async def register_email_user(
     except Exception as e:
         # Rollback: Delete Firebase user if DB write fails
         try:
-            auth.delete_user(user.uid)
+            await run_admin_call(auth.delete_user, user.uid)
         except:
             pass 
         raise HTTPException(status_code=500, detail=f"Database error: {e}")
@@ -124,7 +125,7 @@ async def register_social_user(
 # 3. LOGIN: EMAIL & PASSWORD
 # ==========================================
 @router.post("/login", response_model=AuthResponse)
-def login_user(payload: LoginRequest):
+async def login_user(payload: LoginRequest):
     """
     Exchanges Email/Password for a Firebase ID Token via REST API.
     """
@@ -132,7 +133,7 @@ def login_user(payload: LoginRequest):
     if not api_key:
         raise HTTPException(status_code=500, detail="FIREBASE_API_KEY not set")
 
-    url = f"https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key={api_key}"
+    url = identity_toolkit_url("accounts:signInWithPassword")
     data = {
         "email": payload.email, 
         "password": payload.password, 
@@ -140,8 +141,8 @@ def login_user(payload: LoginRequest):
     }
 
     try:
-        resp = requests.post(url, json=data, timeout=10)
-    except requests.RequestException as e:
+        resp = await get_http_client().post(url, params={"key": api_key}, json=data)
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"Auth provider error: {e}")
 
     if resp.status_code != 200:
@@ -1,25 +1,227 @@
-from fastapi import APIRouter, Depends, Query
-from typing import List
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse
+from typing import Annotated, List, Literal
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.core.catalog_cache import catalog_cache, query_cache_key
 from app.core.db import get_database
-from app.schemas import Vehicle
-from app.repositories.vehicle import list_all_vehicles
+from app.core.etag import PUBLIC_CACHE_CONTROL, conditional_response, document_etag, page_etag
+from app.core.metrics import REGISTRY, gauge_lines
+from app.core.token_cache import token_cache
+from app.schemas import NearbyVehicles, Vehicle, VehicleFacets, VehiclePage
+from app.repositories.pagination import InvalidCursorError
+from app.repositories.vehicle import (
+    get_vehicle_by_id,
+    page_all_vehicles,
+    search_vehicles,
+    search_vehicles_text,
+    build_vehicle_search_query,
+    find_vehicles_near,
+)
+from app.services.availability import search_available_vehicles
+from app.services.vehicle_facets import facet_cache, get_vehicle_facets
 
 router = APIRouter(tags=["General"])
 
 
+def _as_utc(value: datetime) -> datetime:
+    # Rent dates are stored in UTC; a bare date-time from the query string is taken as UTC too.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
 @router.get("/", response_model=dict)
 def read_root():
     """A public endpoint that anyone can access."""
     return {"message": "Welcome! This is a public endpoint."}
 
 
-@router.get("/vehicles", response_model=List[Vehicle])
+@router.get("/cache/stats", response_model=dict)
+def cache_stats():
+    """Size, hit ratio and eviction/coalescing/invalidation counts of the in-process caches."""
+    return {"catalog": catalog_cache.stats(), "facets": facet_cache.stats(), "auth_tokens": token_cache.stats()}
+
+
+def _cache_metrics() -> list:
+    lines = []
+    stats = cache_stats()
+    for field in ("size", "hits", "misses", "evictions", "hit_ratio"):
+        samples = {(cache,): values[field] for cache, values in stats.items() if field in values}
+        lines.extend(gauge_lines(f"app_cache_{field}", f"In-process cache {field.replace('_', ' ')}.", ("cache",), samples))
+    return lines
+
+
+REGISTRY.add_collector(_cache_metrics)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint: per-route latency and MongoDB command histograms, cache gauges."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/vehicles", response_model=VehiclePage)
 async def public_list_vehicles(
+    response: Response,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+    cursor: Annotated[str | None, Query(description="`next_cursor` from the previous page.")] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """Public endpoint to list all vehicles, one page of `limit` at a time.
+
+    Responses carry an `ETag`; send it back as `If-None-Match` to get an empty
+    `304` while the page is unchanged.
+    """
+
+    async def load() -> tuple:
+        docs, next_cursor = await page_all_vehicles(db=db, limit=limit, cursor=cursor)
+        return {"items": docs, "next_cursor": next_cursor}, page_etag("vehicles", docs, next_cursor)
+
+    try:
+        page, etag = await catalog_cache.get_or_load(query_cache_key("page_all", limit=limit, cursor=cursor), load)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    not_modified = conditional_response(response, etag, if_none_match, cache_control=PUBLIC_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+    return page
+
+
+@router.get("/vehicles/public/{vehicle_id}", response_model=Vehicle)
+async def public_get_vehicle(
+    vehicle_id: str,
+    response: Response,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """Public endpoint to read one vehicle by id, for the vehicle details and booking pages."""
+    doc = await get_vehicle_by_id(db=db, vehicle_id=vehicle_id)
+    if not doc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found")
+    not_modified = conditional_response(response, document_etag(doc), if_none_match, cache_control=PUBLIC_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+    return doc
+
+
+@router.get("/vehicles/search", response_model=VehiclePage)
+async def public_search_vehicles(
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    q: str | None = Query(
+        None,
+        max_length=200,
+        description="Free text over brand, model, location, type, transmission and fuel. Results are ordered by relevance and `sort` is ignored.",
+    ),
+    type: List[str] | None = Query(None, description="Vehicle type; repeat to match any of several."),
+    fuel: List[str] | None = Query(None, description="Fuel type; repeat to match any of several."),
+    transmission: List[str] | None = Query(None, description="Transmission; repeat to match any of several."),
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    min_seats: int | None = Query(None, ge=1),
+    location: str | None = Query(None, description="Case-insensitive location prefix."),
+    availability: bool | None = Query(None),
+    available_from: datetime | None = Query(None, description="Only vehicles with no pending or accepted booking from this time..."),
+    available_to: datetime | None = Query(None, description="...until this time. Both bounds are required together."),
+    sort: Literal["newest", "price_asc", "price_desc", "year_desc"] = Query("newest"),
+    limit: int = Query(24, ge=1, le=100),
+    cursor: str | None = Query(None, description="`next_cursor` from the previous page."),
+):
+    """Public search endpoint. Filters, sorts and pages in MongoDB so only the requested page is returned."""
+    text = q.strip() if q else None
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="min_price cannot exceed max_price")
+    if (available_from is None) != (available_to is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="available_from and available_to must be given together"
+        )
+    if available_from is not None:
+        available_from, available_to = _as_utc(available_from), _as_utc(available_to)
+    if available_from is not None and available_from >= available_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="available_from must be before available_to")
+
+    query = build_vehicle_search_query(
+        types=type,
+        fuels=fuel,
+        transmissions=transmission,
+        min_price=min_price,
+        max_price=max_price,
+        min_seats=min_seats,
+        location=location,
+        availability=availability,
+    )
+    try:
+        if available_from is not None:
+            # Depends on bookings as well as vehicles, so it is never cached.
+            docs, next_cursor = await search_available_vehicles(
+                db,
+                query=query,
+                start_date=available_from,
+                end_date=available_to,
+                sort=sort,
+                limit=limit,
+                cursor=cursor,
+                text=text,
+            )
+            return {"items": docs, "next_cursor": next_cursor}
+
+        async def load() -> dict:
+            if text:
+                docs, next_cursor = await search_vehicles_text(db=db, text=text, query=query, limit=limit, cursor=cursor)
+            else:
+                docs, next_cursor = await search_vehicles(db=db, query=query, sort=sort, limit=limit, cursor=cursor)
+            return {"items": docs, "next_cursor": next_cursor}
+
+        key = query_cache_key("search", query, text=text, sort=None if text else sort, limit=limit, cursor=cursor)
+        return await catalog_cache.get_or_load(key, load)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/vehicles/facets", response_model=VehicleFacets)
+async def public_vehicle_facets(
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    q: str | None = Query(None, max_length=200, description="Free text, as for `/vehicles/search`."),
+    type: List[str] | None = Query(None),
+    fuel: List[str] | None = Query(None),
+    transmission: List[str] | None = Query(None),
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    min_seats: int | None = Query(None, ge=1),
+    location: str | None = Query(None, description="Case-insensitive location prefix."),
+    availability: bool | None = Query(None),
+):
+    """Public endpoint with the search sidebar's counts per type, fuel, transmission, seats and price bucket.
+
+    Takes the same filters as `/vehicles/search`. Counts are cached for a few
+    seconds per distinct filter set.
+    """
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="min_price cannot exceed max_price")
+    query = build_vehicle_search_query(
+        types=type,
+        fuels=fuel,
+        transmissions=transmission,
+        min_price=min_price,
+        max_price=max_price,
+        min_seats=min_seats,
+        location=location,
+        availability=availability,
+    )
+    text = q.strip() if q else None
+    return await get_vehicle_facets(db, query=query, text=text or None)
+
+
+@router.get("/vehicles/near", response_model=NearbyVehicles)
+async def public_vehicles_near(
     db: AsyncIOMotorDatabase = Depends(get_database),
-    limit: int = Query(200, ge=1, le=1000),
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=500, description="Search radius around the point."),
+    availability: bool | None = Query(None),
+    limit: int = Query(20, ge=1, le=100),
 ):
-    """Public endpoint to list all vehicles. Limits results to `limit`."""
-    docs = await list_all_vehicles(db=db, limit=limit)
-    return docs
\ No newline at end of file
+    """Public proximity search: vehicles with coordinates within `radius_km`, nearest first."""
+    query = {"availability": availability} if availability is not None else None
+    docs = await find_vehicles_near(db=db, lng=lng, lat=lat, max_distance_m=radius_km * 1000, limit=limit, query=query)
+    return {"items": docs}
@@ -1,22 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Response, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List
+from typing import Annotated
 
 from app.core.db import get_database
+from app.core.etag import conditional_response, page_etag
 from app.core.auth_deps import get_current_user
-from app.schemas import RentCreate, Rent, RentUpdate, OwnerEarningsOverview
+from app.schemas import RentCreate, Rent, RentUpdate, RentPage, OwnerEarningsOverview
+from app.repositories.pagination import InvalidCursorError
 from app.repositories.rent import (
-    create_rent,
+    BLOCKING_RENT_STATUSES,
     get_rent_by_id,
-    list_rents_by_renter,
-    list_rents_by_owner,
-    update_rent,
-    accept_rent,
-    set_rent_status,
+    page_rents_by_renter,
+    page_rents_by_owner,
     delete_rent,
 )
-from app.repositories.vehicle import get_vehicle_by_id, update_vehicle
-from app.services.owner_earnings import get_owner_earnings_overview
+from app.repositories.vehicle import get_vehicle_by_id
+from app.services.bookings import (
+    BookingConflictError,
+    BookingError,
+    BookingRentNotFoundError,
+    BookingVehicleNotFoundError,
+    create_booking,
+    release_booking,
+    reschedule_booking,
+)
+from app.services.owner_earnings import record_rent_status_change, rollup_owner_earnings_overview
+from app.services.rent_transitions import (
+    InvalidRentTransitionError,
+    RentNotFoundError,
+    RentNotOwnedError,
+    RentVehicleNotFoundError,
+    transition_rent,
+)
 
 router = APIRouter(
     prefix="/rents",
@@ -24,13 +39,12 @@ router = APIRouter(
 )
 
 
-async def _get_owner_rent_or_404(db: AsyncIOMotorDatabase, owner_uid: str, rent_id: str) -> dict:
-    rent = await get_rent_by_id(db=db, rent_id=rent_id)
-    if not rent:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rent not found")
-    if rent.get("owner_uid") != owner_uid:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
-    return rent
+def _booking_http_error(error: BookingError) -> HTTPException:
+    if isinstance(error, (BookingVehicleNotFoundError, BookingRentNotFoundError)):
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(error))
+    if isinstance(error, BookingConflictError):
+        return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(error))
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
 
 
 @router.post("/", response_model=Rent, status_code=201)
@@ -41,30 +55,48 @@ async def create_rent_endpoint(
 ):
     renter_uid = decoded_token.get("uid")
     try:
-        created = await create_rent(db=db, renter_uid=renter_uid, rent_doc=payload.model_dump())
+        created = await create_booking(db, renter_uid=renter_uid, rent_doc=payload.model_dump())
         return created
+    except BookingError as e:
+        raise _booking_http_error(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DB error: {e}")
 
 
-@router.get("/", response_model=List[Rent])
+@router.get("/", response_model=RentPage)
 async def list_my_rents(
     decoded_token: dict = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database),
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+    cursor: Annotated[str | None, Query(description="`next_cursor` from the previous page.")] = None,
 ):
     renter_uid = decoded_token.get("uid")
-    docs = await list_rents_by_renter(db=db, renter_uid=renter_uid)
-    return docs
+    try:
+        docs, next_cursor = await page_rents_by_renter(db=db, renter_uid=renter_uid, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"items": docs, "next_cursor": next_cursor}
 
 
-@router.get("/owner", response_model=List[Rent])
+@router.get("/owner", response_model=RentPage)
 async def list_owner_rents(
+    response: Response,
     decoded_token: dict = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database),
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+    cursor: Annotated[str | None, Query(description="`next_cursor` from the previous page.")] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
     owner_uid = decoded_token.get("uid")
-    docs = await list_rents_by_owner(db=db, owner_uid=owner_uid)
-    return docs
+    try:
+        docs, next_cursor = await page_rents_by_owner(db=db, owner_uid=owner_uid, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    etag = page_etag(f"rents/owner/{owner_uid}", docs, next_cursor)
+    not_modified = conditional_response(response, etag, if_none_match)
+    if not_modified is not None:
+        return not_modified
+    return {"items": docs, "next_cursor": next_cursor}
 
 
 @router.get("/owner/earnings", response_model=OwnerEarningsOverview)
@@ -73,7 +105,7 @@ async def get_owner_earnings(
     db: AsyncIOMotorDatabase = Depends(get_database),
 ):
     owner_uid = decoded_token.get("uid")
-    return await get_owner_earnings_overview(db=db, owner_uid=owner_uid)
+    return await rollup_owner_earnings_overview(db=db, owner_uid=owner_uid)
 
 
 @router.get("/{rent_id}", response_model=Rent)
@@ -100,38 +132,37 @@ async def patch_rent(
     db: AsyncIOMotorDatabase = Depends(get_database),
 ):
     renter_uid = decoded_token.get("uid")
-    updated = await update_rent(db=db, renter_uid=renter_uid, rent_id=rent_id, update_fields=payload.model_dump(exclude_unset=True))
+    try:
+        updated = await reschedule_booking(
+            db, renter_uid=renter_uid, rent_id=rent_id, update_fields=payload.model_dump(exclude_unset=True)
+        )
+    except BookingError as e:
+        raise _booking_http_error(e)
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rent not found or not owned by you")
     return updated
 
 
+async def _transition_or_http_error(db: AsyncIOMotorDatabase, owner_uid: str, rent_id: str, action: str) -> dict:
+    try:
+        return await transition_rent(db, owner_uid=owner_uid, rent_id=rent_id, action=action)
+    except RentNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rent not found")
+    except RentNotOwnedError:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
+    except RentVehicleNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except InvalidRentTransitionError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
 @router.post("/{rent_id}/accept", response_model=Rent)
 async def accept_rent_request(
     rent_id: str,
     decoded_token: dict = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database),
 ):
-    owner_uid = decoded_token.get("uid")
-    rent = await _get_owner_rent_or_404(db, owner_uid, rent_id)
-
-    vehicle = await get_vehicle_by_id(db=db, vehicle_id=rent["vehicle_id"])
-    if not vehicle:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found")
-
-    updated_vehicle = await update_vehicle(
-        db=db,
-        owner_uid=owner_uid,
-        vehicle_id=rent["vehicle_id"],
-        update_fields={"availability": False},
-    )
-    if not updated_vehicle:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found or not owned by you")
-
-    updated_rent = await accept_rent(db=db, owner_uid=owner_uid, rent_id=rent_id)
-    if not updated_rent:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rent not found or not owned by you")
-    return updated_rent
+    return await _transition_or_http_error(db, decoded_token.get("uid"), rent_id, "accept")
 
 
 @router.post("/{rent_id}/cancel", response_model=Rent)
@@ -140,22 +171,7 @@ async def cancel_rent_request(
     decoded_token: dict = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database),
 ):
-    owner_uid = decoded_token.get("uid")
-    rent = await _get_owner_rent_or_404(db, owner_uid, rent_id)
-
-    updated_vehicle = await update_vehicle(
-        db=db,
-        owner_uid=owner_uid,
-        vehicle_id=rent["vehicle_id"],
-        update_fields={"availability": True},
-    )
-    if not updated_vehicle:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found or not owned by you")
-
-    updated_rent = await set_rent_status(db=db, owner_uid=owner_uid, rent_id=rent_id, booking_status="cancelled")
-    if not updated_rent:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rent not found or not owned by you")
-    return updated_rent
+    return await _transition_or_http_error(db, decoded_token.get("uid"), rent_id, "cancel")
 
 
 @router.post("/{rent_id}/complete", response_model=Rent)
@@ -164,22 +180,7 @@ async def complete_rent_request(
     decoded_token: dict = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database),
 ):
-    owner_uid = decoded_token.get("uid")
-    rent = await _get_owner_rent_or_404(db, owner_uid, rent_id)
-
-    updated_vehicle = await update_vehicle(
-        db=db,
-        owner_uid=owner_uid,
-        vehicle_id=rent["vehicle_id"],
-        update_fields={"availability": True},
-    )
-    if not updated_vehicle:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found or not owned by you")
-
-    updated_rent = await set_rent_status(db=db, owner_uid=owner_uid, rent_id=rent_id, booking_status="completed")
-    if not updated_rent:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rent not found or not owned by you")
-    return updated_rent
+    return await _transition_or_http_error(db, decoded_token.get("uid"), rent_id, "complete")
 
 
 @router.delete("/{rent_id}", status_code=204)
@@ -189,7 +190,14 @@ async def remove_rent(
     db: AsyncIOMotorDatabase = Depends(get_database),
 ):
     renter_uid = decoded_token.get("uid")
-    ok = await delete_rent(db=db, renter_uid=renter_uid, rent_id=rent_id)
-    if not ok:
+    deleted = await delete_rent(db=db, renter_uid=renter_uid, rent_id=rent_id)
+    if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rent not found or not owned by you")
+    if deleted.get("booking_status") in BLOCKING_RENT_STATUSES:
+        await release_booking(db, rent=deleted)
+    if deleted.get("booking_status") == "completed":
+        # Take the booking back out of the owner's rollup; the stored earned_amount
+        # means the vehicle is only needed for bookings completed before it existed.
+        vehicle = None if "earned_amount" in deleted else await get_vehicle_by_id(db=db, vehicle_id=deleted["vehicle_id"])
+        await record_rent_status_change(db, before=deleted, after={**deleted, "booking_status": "deleted"}, vehicle=vehicle)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,18 +1,22 @@
 from pathlib import Path
+from typing import Annotated
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response, UploadFile, File
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Response, UploadFile, File
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 # Import our new dependencies and schemas
 from app.core.auth_deps import get_current_user
 from app.core.db import get_database
+from app.core.etag import conditional_response, document_etag
 from app.repositories.user import (
     get_user_profile_by_uid,
     update_user_profile_by_uid,
     delete_user_profile_by_uid,
 )
 from app.schemas import UserProfile, UserProfileUpdate, PublicUserProfile
+from app.services.image_variants import schedule_avatar_variants
+from app.services.uploads import UploadRejectedError, save_upload
 
 router = APIRouter(
     prefix="/users",
@@ -26,8 +30,10 @@ ALLOWED_IMAGE_TYPES = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp":
 
 @router.get("/me", response_model=UserProfile)
 async def read_current_user(
+    response: Response,
     decoded_token: dict = Depends(get_current_user),
-    db: AsyncIOMotorDatabase = Depends(get_database) # Inject the DB
+    db: AsyncIOMotorDatabase = Depends(get_database), # Inject the DB
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
     """
     Get the current user's Firebase token info AND their MongoDB profile.
@@ -48,6 +54,11 @@ async def read_current_user(
             detail="User profile not found in database."
         )
     
+    # Answer a repeat poll with 304 while the profile's version is unchanged
+    not_modified = conditional_response(response, document_etag(profile), if_none_match)
+    if not_modified is not None:
+        return not_modified
+
     # `profile` is a dict from Mongo, including `_id`
     # The UserProfile schema will automatically map `_id` to `uid`
     # because we used Field(alias="_id") and Config.populate_by_name
@@ -118,19 +129,19 @@ async def upload_avatar(
             detail="Unsupported image type. Use JPG, PNG, or WEBP.",
         )
 
-    content = await avatar.read()
-    if not content:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded file is empty.")
-    if len(content) > MAX_AVATAR_SIZE_BYTES:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Image exceeds 5MB limit.")
-
     user_uid = decoded_token.get("uid")
     filename = f"{user_uid}_{uuid4().hex}{extension}"
     destination = UPLOAD_DIR / filename
-    destination.write_bytes(content)
+    try:
+        await save_upload(avatar, destination, max_bytes=MAX_AVATAR_SIZE_BYTES)
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     avatar_url = f"/uploads/{filename}"
-    updated = await update_user_profile_by_uid(db, uid=user_uid, update_data={"avatar_url": avatar_url})
+    updated = await update_user_profile_by_uid(
+        db, uid=user_uid, update_data={"avatar_url": avatar_url, "avatar_variants": None}
+    )
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found")
+    schedule_avatar_variants(db, uid=user_uid, avatar_url=avatar_url, path=destination)
     return updated
@@ -2,18 +2,23 @@ from pathlib import Path
 from urllib.parse import urlparse
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response, UploadFile, File, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Response, UploadFile, File, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List
+from typing import Annotated
 
 from app.core.db import get_database
+from app.core.etag import conditional_response, document_etag
 from app.core.auth_deps import get_current_user
-from app.schemas import VehicleCreate, Vehicle, VehicleUpdate
+from app.schemas import VehicleCreate, Vehicle, VehicleUpdate, VehiclePage
 from app.schemas.vehicles_schema import normalize_vehicle_image_url, normalize_vehicle_image_urls
+from app.repositories.pagination import InvalidCursorError
+from app.services.geocoding import geocode_location
+from app.services.image_variants import remove_variant_files, schedule_vehicle_image_variants
+from app.services.uploads import UploadRejectedError, save_upload
 from app.repositories.vehicle import (
     create_vehicle,
     get_vehicle_by_id,
-    list_vehicles_by_owner,
+    page_vehicles_by_owner,
     update_vehicle,
     delete_vehicle,
 )
@@ -48,34 +53,47 @@ async def create_vehicle_endpoint(
     db: AsyncIOMotorDatabase = Depends(get_database),
 ):
     owner_uid = decoded_token.get("uid")
+    vehicle_doc = payload.model_dump()
+    if vehicle_doc.get("geo") is None:
+        vehicle_doc["geo"] = geocode_location(vehicle_doc.get("location"))
     try:
-        created = await create_vehicle(db=db, owner_uid=owner_uid, vehicle_doc=payload.model_dump())
+        created = await create_vehicle(db=db, owner_uid=owner_uid, vehicle_doc=vehicle_doc)
         return created
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DB error: {e}")
 
 
-@router.get("/", response_model=List[Vehicle])
+@router.get("/", response_model=VehiclePage)
 async def list_my_vehicles(
     decoded_token: dict = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database),
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+    cursor: Annotated[str | None, Query(description="`next_cursor` from the previous page.")] = None,
 ):
     owner_uid = decoded_token.get("uid")
-    docs = await list_vehicles_by_owner(db=db, owner_uid=owner_uid)
-    return docs
+    try:
+        docs, next_cursor = await page_vehicles_by_owner(db=db, owner_uid=owner_uid, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"items": docs, "next_cursor": next_cursor}
 
 
 @router.get("/{vehicle_id}", response_model=Vehicle)
 async def get_vehicle(
     vehicle_id: str,
+    response: Response,
     decoded_token: dict = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database),
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
     doc = await get_vehicle_by_id(db=db, vehicle_id=vehicle_id)
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found")
     if doc.get("owner_uid") != decoded_token.get("uid"):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
+    not_modified = conditional_response(response, document_etag(doc), if_none_match)
+    if not_modified is not None:
+        return not_modified
     return doc
 
 
@@ -87,7 +105,11 @@ async def patch_vehicle(
     db: AsyncIOMotorDatabase = Depends(get_database),
 ):
     owner_uid = decoded_token.get("uid")
-    updated = await update_vehicle(db=db, owner_uid=owner_uid, vehicle_id=vehicle_id, update_fields=payload.model_dump(exclude_unset=True))
+    update_fields = payload.model_dump(exclude_unset=True)
+    if "location" in update_fields and "geo" not in update_fields:
+        # Keep coordinates in step with the new location (cleared if it can't be resolved).
+        update_fields["geo"] = geocode_location(update_fields["location"])
+    updated = await update_vehicle(db=db, owner_uid=owner_uid, vehicle_id=vehicle_id, update_fields=update_fields)
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found or not owned by you")
     return updated
@@ -125,15 +147,12 @@ async def upload_vehicle_image(
     if not extension:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported image type. Use JPG, PNG, or WEBP.")
 
-    content = await image.read()
-    if not content:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded file is empty.")
-    if len(content) > MAX_IMAGE_SIZE_BYTES:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Image exceeds 5MB limit.")
-
     filename = f"{vehicle_id}_{uuid4().hex}{extension}"
     destination = VEHICLE_UPLOAD_DIR / filename
-    destination.write_bytes(content)
+    try:
+        await save_upload(image, destination, max_bytes=MAX_IMAGE_SIZE_BYTES)
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     image_url = f"/uploads/vehicles/{filename}"
     existing_urls, _ = normalize_vehicle_image_urls(existing.get("image_urls"), existing.get("image_url"))
     existing_urls.append(image_url)
@@ -148,6 +167,7 @@ async def upload_vehicle_image(
     )
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found or not owned by you")
+    schedule_vehicle_image_variants(db, vehicle_id=vehicle_id, image_url=image_url, path=destination)
     return updated
 
 
@@ -176,12 +196,15 @@ async def delete_vehicle_image(
 
     new_urls = [url for url in current_urls if url != matched]
     new_primary = new_urls[-1] if new_urls else None
+    new_variants = [
+        variants for variants in existing.get("image_variants") or [] if variants.get("source_url") != matched
+    ]
 
     updated = await update_vehicle(
         db=db,
         owner_uid=owner_uid,
         vehicle_id=vehicle_id,
-        update_fields={"image_urls": new_urls, "image_url": new_primary},
+        update_fields={"image_urls": new_urls, "image_url": new_primary, "image_variants": new_variants},
     )
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found or not owned by you")
@@ -192,5 +215,6 @@ async def delete_vehicle_image(
         file_path = VEHICLE_UPLOAD_DIR / filename
         if file_path.exists():
             file_path.unlink()
+        remove_variant_files(file_path)
 
     return updated
@@ -4,6 +4,8 @@ This module re-exports the models defined in ``users_schema.py`` so
 callers can import from ``app.schemas`` directly.
 """
 
+from .geo_schema import GeoPoint
+from .images_schema import ImageVariants
 from .users_schema import (
     UserProfileBase,
     UserProfileUpdate,
@@ -20,12 +22,19 @@ from .vehicles_schema import (
     VehicleCreate,
     VehicleUpdate,
     Vehicle,
+    VehiclePage,
+    NearbyVehicle,
+    NearbyVehicles,
+    FacetCount,
+    PriceBucketCount,
+    VehicleFacets,
 )
 from .rents_schema import (
     RentBase,
     RentCreate,
     RentUpdate,
     Rent,
+    RentPage,
 )
 from .earnings_schema import (
     EarningsPeriodSummary,
@@ -35,6 +44,8 @@ from .earnings_schema import (
 )
 
 __all__ = [
+    "GeoPoint",
+    "ImageVariants",
     "UserProfileBase",
     "UserProfileUpdate",
     "UserProfile",
@@ -48,10 +59,17 @@ __all__ = [
     "VehicleCreate",
     "VehicleUpdate",
     "Vehicle",
+    "VehiclePage",
+    "NearbyVehicle",
+    "NearbyVehicles",
+    "FacetCount",
+    "PriceBucketCount",
+    "VehicleFacets",
     "RentBase",
     "RentCreate",
     "RentUpdate",
     "Rent",
+    "RentPage",
     "EarningsPeriodSummary",
     "EarningsSummary",
     "OwnerEarningsTransaction",
@@ -0,0 +1,17 @@
+from typing import Literal
+
+from pydantic import BaseModel, field_validator
+
+
+class GeoPoint(BaseModel):
+    """A GeoJSON point. Coordinates are `[longitude, latitude]`, in that order."""
+    type: Literal["Point"] = "Point"
+    coordinates: tuple[float, float]
+
+    @field_validator("coordinates")
+    @classmethod
+    def check_ranges(cls, value: tuple[float, float]) -> tuple[float, float]:
+        lng, lat = value
+        if not -180 <= lng <= 180 or not -90 <= lat <= 90:
+            raise ValueError("coordinates must be [longitude, latitude] within valid ranges")
+        return value
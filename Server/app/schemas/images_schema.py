@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class ImageVariants(BaseModel):
+    """Derived files generated in the background for one uploaded image.
+
+    `thumbnail_url` is a fixed 300px-wide WebP for list views and `webp_url`
+    a WebP re-encode of the original for detail views.
+    """
+    source_url: str
+    thumbnail_url: str
+    webp_url: str
+    width: int | None = None
+    height: int | None = None
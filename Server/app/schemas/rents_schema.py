@@ -62,3 +62,13 @@ class Rent(RentBase):
                 "note": "Please keep fuel full.",
             }
         }
+
+
+class RentPage(BaseModel):
+    """One page of a rent listing.
+
+    Pass `next_cursor` back as `cursor` to fetch the following page; it is
+    `None` on the last page.
+    """
+    items: list[Rent]
+    next_cursor: Optional[str] = None
@@ -3,6 +3,8 @@ from typing import Any
 
 from pydantic import AliasChoices, BaseModel, ConfigDict, EmailStr, Field, model_validator
 
+from .images_schema import ImageVariants
+
 class UserRole(str, Enum):
     USER = "user"
     VEHICLE_OWNER = "vehicle_owner"
@@ -114,6 +116,7 @@ class UserProfile(UserProfileBase):
     uid: str = Field(alias="_id") # Maps MongoDB '_id' to 'uid'
     email: EmailStr
     avatar_url: str | None = None
+    avatar_variants: ImageVariants | None = None
 
     model_config = ConfigDict(
         populate_by_name=True,
@@ -1,7 +1,10 @@
 from typing import Any, Optional
 from urllib.parse import urlparse
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, computed_field, model_validator
+
+from .geo_schema import GeoPoint
+from .images_schema import ImageVariants
 
 
 def normalize_vehicle_image_url(image_url: str | None) -> str | None:
@@ -55,6 +58,8 @@ class VehicleBase(BaseModel):
     seats: int = 5
     image_urls: list[str] = Field(default_factory=list)
     image_url: Optional[str] = None
+    # Filled from `location` when not supplied; see app/services/geocoding.py.
+    geo: Optional[GeoPoint] = None
 
     @model_validator(mode="before")
     @classmethod
@@ -94,6 +99,7 @@ class VehicleUpdate(BaseModel):
     seats: Optional[int] = None
     image_urls: Optional[list[str]] = None
     image_url: Optional[str] = None
+    geo: Optional[GeoPoint] = None
 
     @model_validator(mode="before")
     @classmethod
@@ -125,6 +131,16 @@ class VehicleUpdate(BaseModel):
 class Vehicle(VehicleBase):
     vehicleid: str = Field(alias="_id")
     owner_uid: str
+    image_variants: list[ImageVariants] = Field(default_factory=list)
+
+    @computed_field
+    @property
+    def thumbnail_url(self) -> Optional[str]:
+        """300px thumbnail of the primary image, once it has been generated."""
+        for variants in self.image_variants:
+            if variants.source_url == self.image_url:
+                return variants.thumbnail_url
+        return None
 
     class Config:
         populate_by_name = True
@@ -138,6 +154,7 @@ class Vehicle(VehicleBase):
                 "price": 35.5,
                 "availability": True,
                 "location": "Colombo",
+                "geo": {"type": "Point", "coordinates": [79.8612, 6.9271]},
                 "brand": "Toyota",
                 "year": 2020,
                 "model": "Corolla",
@@ -147,5 +164,59 @@ class Vehicle(VehicleBase):
                     "/uploads/vehicles/example2.jpg",
                 ],
                 "image_url": "/uploads/vehicles/example.jpg",
+                "image_variants": [
+                    {
+                        "source_url": "/uploads/vehicles/example.jpg",
+                        "thumbnail_url": "/uploads/vehicles/example_w300.webp",
+                        "webp_url": "/uploads/vehicles/example_full.webp",
+                        "width": 1920,
+                        "height": 1080,
+                    }
+                ],
             }
         }
+
+
+class NearbyVehicle(Vehicle):
+    distance_m: float
+
+
+class NearbyVehicles(BaseModel):
+    """Vehicles closest to a point, nearest first."""
+    items: list[NearbyVehicle]
+
+
+class VehiclePage(BaseModel):
+    """One page of a vehicle listing.
+
+    Pass `next_cursor` back as `cursor` to fetch the following page; it is
+    `None` on the last page.
+    """
+    items: list[Vehicle]
+    next_cursor: Optional[str] = None
+
+
+class FacetCount(BaseModel):
+    value: Any
+    count: int
+
+
+class PriceBucketCount(BaseModel):
+    """Vehicles priced from `min` up to, but not including, `max` (no upper bound when `max` is None)."""
+    min: float
+    max: Optional[float] = None
+    count: int
+
+
+class VehicleFacets(BaseModel):
+    """Counts for the search sidebar.
+
+    `total` matches every filter. Each facet is counted with every filter
+    except its own, so the other options of a selected facet keep their counts.
+    """
+    total: int
+    type: list[FacetCount]
+    fuel: list[FacetCount]
+    transmission: list[FacetCount]
+    seats: list[FacetCount]
+    price: list[PriceBucketCount]
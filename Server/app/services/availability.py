@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import List, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.repositories.ids import IdCodec
+from app.repositories.pagination import encode_cursor
+from app.repositories.rent import RentRepository
+from app.repositories.vehicle import VEHICLE_RELEVANCE_SORT, VEHICLE_SEARCH_SORTS, VehicleRepository
+
+# Candidate batches read per request, each of `limit + 1` vehicles, before returning a short page.
+MAX_AVAILABILITY_BATCHES = 4
+
+
+async def search_available_vehicles(
+    db: AsyncIOMotorDatabase,
+    *,
+    query: dict,
+    start_date: datetime,
+    end_date: datetime,
+    sort: str = "newest",
+    limit: int = 24,
+    cursor: str | None = None,
+    text: str | None = None,
+) -> Tuple[List[dict], str | None]:
+    """One page of vehicles matching `query` that have no pending or accepted booking overlapping the dates.
+
+    Candidates are read a page at a time in the requested order and their
+    bookings checked with one `vehicle_interval` index query per batch. Batches
+    continue until the page is full, but at most `MAX_AVAILABILITY_BATCHES` per
+    request: when most candidates are booked the page comes back short (even
+    empty) with a `next_cursor` at the last vehicle scanned, so one request
+    never walks the whole catalog. With `text` the candidates come from the
+    free-text search, in relevance order, and `sort` is not used.
+    """
+    vehicles = VehicleRepository(db)
+    rents = RentRepository(db)
+    sort_spec = VEHICLE_RELEVANCE_SORT if text else VEHICLE_SEARCH_SORTS[sort]
+
+    page: List[dict] = []
+    batch_cursor = cursor
+    for _ in range(MAX_AVAILABILITY_BATCHES):
+        if text:
+            batch, batch_cursor = await vehicles.text_page(text=text, query=query, limit=limit + 1, cursor=batch_cursor)
+        else:
+            batch, batch_cursor = await vehicles.list_page(query, sort=sort_spec, limit=limit + 1, cursor=batch_cursor)
+        booked = await rents.booked_vehicle_ids(
+            vehicle_ids=[str(doc["_id"]) for doc in batch], start_date=start_date, end_date=end_date
+        )
+        page.extend(doc for doc in batch if str(doc["_id"]) not in booked)
+        if len(page) > limit or batch_cursor is None:
+            break
+
+    # None once the candidates ran out; otherwise the batch cap was hit and the next request resumes there.
+    next_cursor = batch_cursor
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1], sort_spec)
+    return [IdCodec.decode(doc) for doc in page], next_cursor
+
@@ -0,0 +1,113 @@
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.repositories.rent import BLOCKING_RENT_STATUSES, RentRepository
+from app.repositories.vehicle import VehicleRepository
+from app.repositories.vehicle_calendar import VehicleCalendarRepository
+
+
+class BookingError(Exception):
+    """Base class for bookings that could not be made or changed."""
+
+
+class BookingVehicleNotFoundError(BookingError):
+    pass
+
+
+class BookingRentNotFoundError(BookingError):
+    pass
+
+
+class InvalidBookingError(BookingError):
+    pass
+
+
+class BookingConflictError(BookingError):
+    pass
+
+
+def _as_utc(value: datetime | str) -> datetime:
+    # Mongo hands back naive UTC datetimes; older rents may still hold ISO strings.
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _check_dates(start_date: datetime, end_date: datetime) -> None:
+    if _as_utc(start_date) >= _as_utc(end_date):
+        raise InvalidBookingError("end_date must be after start_date")
+
+
+async def create_booking(db: AsyncIOMotorDatabase, *, renter_uid: str, rent_doc: dict) -> dict:
+    """Create a pending rent after checking the vehicle and reserving its dates.
+
+    The reservation is a single conditional write on the vehicle's calendar
+    document, so of any number of concurrent requests for overlapping dates
+    exactly one gets the slot.
+    """
+    _check_dates(rent_doc["start_date"], rent_doc["end_date"])
+    vehicle = await VehicleRepository(db).get_vehicle_by_id(vehicle_id=rent_doc["vehicle_id"])
+    if vehicle is None:
+        raise BookingVehicleNotFoundError("Vehicle not found")
+    if vehicle.get("owner_uid") != rent_doc.get("owner_uid"):
+        raise InvalidBookingError("owner_uid does not match the vehicle's owner")
+
+    rent_id = ObjectId()
+    calendars = VehicleCalendarRepository(db)
+    reserved = await calendars.reserve(
+        vehicle_id=vehicle["_id"],
+        rent_id=str(rent_id),
+        start_date=rent_doc["start_date"],
+        end_date=rent_doc["end_date"],
+    )
+    if not reserved:
+        raise BookingConflictError("Vehicle is already booked for these dates")
+    try:
+        return await RentRepository(db).create_rent(
+            renter_uid=renter_uid, rent_doc={**rent_doc, "vehicle_id": vehicle["_id"]}, rent_id=rent_id
+        )
+    except Exception:
+        await calendars.release(vehicle_id=vehicle["_id"], rent_id=str(rent_id))
+        raise
+
+
+async def reschedule_booking(
+    db: AsyncIOMotorDatabase, *, renter_uid: str, rent_id: str, update_fields: dict
+) -> dict | None:
+    """Apply a renter's edit, moving the calendar slot first when the dates change."""
+    rents = RentRepository(db)
+    if "start_date" not in update_fields and "end_date" not in update_fields:
+        return await rents.update_rent(renter_uid=renter_uid, rent_id=rent_id, update_fields=update_fields)
+
+    rent = await rents.get_rent_by_id(rent_id=rent_id)
+    if rent is None or rent.get("renter_uid") != renter_uid:
+        raise BookingRentNotFoundError("Rent not found or not owned by you")
+    start_date = _as_utc(update_fields.get("start_date", rent["start_date"]))
+    end_date = _as_utc(update_fields.get("end_date", rent["end_date"]))
+    _check_dates(start_date, end_date)
+    unchanged = (start_date, end_date) == (_as_utc(rent["start_date"]), _as_utc(rent["end_date"]))
+    if unchanged or rent.get("booking_status") not in BLOCKING_RENT_STATUSES:
+        return await rents.update_rent(renter_uid=renter_uid, rent_id=rent_id, update_fields=update_fields)
+
+    # Hold the new dates before giving up the old ones, so the rent is never unbooked in between.
+    calendars = VehicleCalendarRepository(db)
+    reserved = await calendars.reserve(
+        vehicle_id=rent["vehicle_id"], rent_id=rent["_id"], start_date=start_date, end_date=end_date
+    )
+    if not reserved:
+        raise BookingConflictError("Vehicle is already booked for these dates")
+    updated = await rents.update_rent(renter_uid=renter_uid, rent_id=rent_id, update_fields=update_fields)
+    await calendars.release_slot(
+        vehicle_id=rent["vehicle_id"],
+        rent_id=rent["_id"],
+        start_date=rent["start_date"] if updated else start_date,
+        end_date=rent["end_date"] if updated else end_date,
+    )
+    return updated
+
+
+async def release_booking(db: AsyncIOMotorDatabase, *, rent: dict, session=None) -> None:
+    """Free the dates held by a rent that was cancelled, completed or deleted."""
+    await VehicleCalendarRepository(db).release(vehicle_id=rent["vehicle_id"], rent_id=str(rent["_id"]), session=session)
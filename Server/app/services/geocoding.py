@@ -0,0 +1,79 @@
+import json
+import re
+from pathlib import Path
+from typing import Dict, Tuple
+
+# Offline lookup table of place names to (longitude, latitude), covering the
+# towns vehicles are listed in. Free-text locations are matched against it by
+# name, so no external geocoding service is called.
+LOCATION_COORDINATES: Dict[str, Tuple[float, float]] = {
+    "colombo": (79.8612, 6.9271),
+    "dehiwala": (79.8650, 6.8511),
+    "mount lavinia": (79.8650, 6.8390),
+    "kotte": (79.9187, 6.8868),
+    "sri jayawardenepura kotte": (79.9187, 6.8868),
+    "moratuwa": (79.8816, 6.7730),
+    "negombo": (79.8358, 7.2083),
+    "katunayake": (79.8853, 7.1725),
+    "gampaha": (80.0144, 7.0873),
+    "kalutara": (79.9607, 6.5854),
+    "kandy": (80.6337, 7.2906),
+    "matale": (80.6234, 7.4675),
+    "nuwara eliya": (80.7891, 6.9497),
+    "ella": (81.0466, 6.8667),
+    "badulla": (81.0550, 6.9934),
+    "galle": (80.2210, 6.0535),
+    "matara": (80.5550, 5.9549),
+    "hambantota": (81.1212, 6.1429),
+    "ratnapura": (80.3992, 6.6828),
+    "kegalle": (80.3464, 7.2513),
+    "kurunegala": (80.3647, 7.4863),
+    "puttalam": (79.8283, 8.0362),
+    "chilaw": (79.7953, 7.5758),
+    "anuradhapura": (80.4037, 8.3114),
+    "polonnaruwa": (81.0188, 7.9403),
+    "trincomalee": (81.2152, 8.5874),
+    "batticaloa": (81.6747, 7.7310),
+    "ampara": (81.6820, 7.2975),
+    "vavuniya": (80.4971, 8.7514),
+    "jaffna": (80.0255, 9.6615),
+}
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def load_location_table(path: str | Path) -> Dict[str, Tuple[float, float]]:
+    """Read a JSON object of `{"place name": [longitude, latitude]}`."""
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {normalize_place(name): (float(lng), float(lat)) for name, (lng, lat) in raw.items()}
+
+
+def normalize_place(value: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", value.lower()).split())
+
+
+def geocode_location(location: str | None, table: Dict[str, Tuple[float, float]] | None = None) -> dict | None:
+    """Return a GeoJSON point for a free-text location, or None if it isn't in the table.
+
+    Tries the whole string, then each comma-separated part, then the longest
+    known place name the text starts with, so "Colombo 07" and
+    "Galle Fort, Galle" both resolve.
+    """
+    if not location:
+        return None
+    table = LOCATION_COORDINATES if table is None else table
+    candidates = [location, *location.split(",")]
+    for candidate in candidates:
+        name = normalize_place(candidate)
+        if name in table:
+            return _point(table[name])
+    for candidate in candidates:
+        name = normalize_place(candidate)
+        prefixes = [known for known in table if name.startswith(known + " ")]
+        if prefixes:
+            return _point(table[max(prefixes, key=len)])
+    return None
+
+
+def _point(coordinates: Tuple[float, float]) -> dict:
+    return {"type": "Point", "coordinates": [coordinates[0], coordinates[1]]}
@@ -0,0 +1,51 @@
+"""CPU-bound image work. Runs inside worker processes, so keep imports light."""
+
+import os
+import tempfile
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+
+def variant_filenames(source_name: str, thumbnail_width: int) -> tuple[str, str]:
+    """Return the (thumbnail, webp) filenames derived from an upload's filename."""
+    stem = Path(source_name).stem
+    return f"{stem}_w{thumbnail_width}.webp", f"{stem}_full.webp"
+
+
+def _save_webp(image: Image.Image, destination: Path, quality: int) -> None:
+    fd, temp_name = tempfile.mkstemp(dir=destination.parent, prefix=".variant-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as target:
+            image.save(target, format="WEBP", quality=quality, method=4)
+        os.replace(temp_name, destination)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+def _resize_to_width(image: Image.Image, width: int) -> Image.Image:
+    if image.width <= width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def render_variants(source_path: str, thumbnail_width: int, max_width: int, quality: int) -> dict:
+    """
+    Writes a fixed-width WebP thumbnail and a WebP re-encode (capped at `max_width`)
+    next to `source_path` and returns their filenames plus the original dimensions.
+    """
+    source = Path(source_path)
+    thumbnail_name, webp_name = variant_filenames(source.name, thumbnail_width)
+
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        width, height = image.size
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        _save_webp(_resize_to_width(image, max_width), source.with_name(webp_name), quality)
+        _save_webp(_resize_to_width(image, thumbnail_width), source.with_name(thumbnail_name), quality)
+
+    return {"thumbnail": thumbnail_name, "webp": webp_name, "width": width, "height": height}
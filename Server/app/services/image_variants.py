@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.repositories.user import set_avatar_variants
+from app.repositories.vehicle import add_vehicle_image_variants
+from app.services.image_processing import render_variants, variant_filenames
+
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTH = 300
+WEBP_MAX_WIDTH = 1600
+WEBP_QUALITY = 80
+
+# Resizing is CPU-bound, so it runs in worker processes rather than threads.
+_pool: ProcessPoolExecutor | None = None
+# Strong references to in-flight jobs; the event loop only keeps weak ones.
+_pending: set[asyncio.Task] = set()
+
+
+def _image_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=int(os.getenv("IMAGE_WORKERS", "2")),
+            # spawn avoids forking a process that holds Motor's background threads
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def build_image_variants(path: Path, source_url: str) -> dict:
+    """
+    Renders the thumbnail and WebP variants for an uploaded file and returns the
+    variant document stored alongside the source URL.
+    """
+    loop = asyncio.get_running_loop()
+    rendered = await loop.run_in_executor(
+        _image_pool(), render_variants, str(path), THUMBNAIL_WIDTH, WEBP_MAX_WIDTH, WEBP_QUALITY
+    )
+    base_url = source_url.rsplit("/", 1)[0]
+    return {
+        "source_url": source_url,
+        "thumbnail_url": f"{base_url}/{rendered['thumbnail']}",
+        "webp_url": f"{base_url}/{rendered['webp']}",
+        "width": rendered["width"],
+        "height": rendered["height"],
+    }
+
+
+def remove_variant_files(path: Path) -> None:
+    """Deletes the derived files for an upload, if they exist."""
+    for name in variant_filenames(path.name, THUMBNAIL_WIDTH):
+        path.with_name(name).unlink(missing_ok=True)
+
+
+def _spawn(job, path: Path, description: str) -> None:
+    async def runner():
+        try:
+            if not await job():
+                # The source was removed or replaced while rendering; drop the orphans.
+                remove_variant_files(path)
+        except Exception:
+            logger.exception("Failed to generate image variants for %s", description)
+            remove_variant_files(path)
+
+    task = asyncio.create_task(runner())
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+def schedule_vehicle_image_variants(db: AsyncIOMotorDatabase, *, vehicle_id: str, image_url: str, path: Path) -> None:
+    async def job() -> bool:
+        variants = await build_image_variants(path, image_url)
+        return await add_vehicle_image_variants(db, vehicle_id=vehicle_id, variants=variants)
+
+    _spawn(job, path, f"vehicle {vehicle_id}")
+
+
+def schedule_avatar_variants(db: AsyncIOMotorDatabase, *, uid: str, avatar_url: str, path: Path) -> None:
+    async def job() -> bool:
+        variants = await build_image_variants(path, avatar_url)
+        return await set_avatar_variants(db, uid=uid, variants=variants)
+
+    _spawn(job, path, f"user {uid}")
+
+
+async def wait_for_pending_variants() -> None:
+    """Waits until every scheduled variant job has finished."""
+    while _pending:
+        await asyncio.gather(*list(_pending), return_exceptions=True)
+
+
+def shutdown_image_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
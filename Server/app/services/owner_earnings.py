@@ -2,12 +2,19 @@ from datetime import datetime, timezone
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from app.repositories.rent import list_rents_by_owner
-from app.repositories.vehicle import list_vehicles_by_owner
+from app.repositories.earnings_rollup import (
+    EARNINGS_ROLLUP_COLLECTION,
+    apply_earnings_delta,
+    get_earnings_buckets,
+)
+from app.repositories.rent import RENT_COLLECTION
+from app.repositories.vehicle import VEHICLE_COLLECTION
 
 
 ACTIVE_EARNING_STATUSES = {"accepted", "completed"}
 REALIZED_EARNING_STATUS = "completed"
+RECENT_TRANSACTIONS_LIMIT = 10
+MS_PER_DAY = 24 * 60 * 60 * 1000
 
 
 def _parse_datetime(value: datetime | str | None) -> datetime | None:
@@ -25,6 +32,10 @@ def _parse_datetime(value: datetime | str | None) -> datetime | None:
 
 
 def _calculate_rent_amount(rent: dict, vehicle_price: float) -> float:
+    # Completed rents carry the amount booked at completion time; later price edits don't rewrite history.
+    if rent.get("earned_amount") is not None:
+        return float(rent["earned_amount"])
+
     start_date = _parse_datetime(rent.get("start_date"))
     end_date = _parse_datetime(rent.get("end_date"))
     if not start_date or not end_date:
@@ -38,97 +49,340 @@ def _calculate_rent_amount(rent: dict, vehicle_price: float) -> float:
     return round(vehicle_price * days, 2)
 
 
-def _is_same_month(value: datetime | None, reference: datetime) -> bool:
-    return bool(value and value.year == reference.year and value.month == reference.month)
-
-
-async def get_owner_earnings_overview(db: AsyncIOMotorDatabase, *, owner_uid: str) -> dict:
-    rents = await list_rents_by_owner(db=db, owner_uid=owner_uid)
-    vehicles = await list_vehicles_by_owner(db=db, owner_uid=owner_uid)
-    vehicle_by_id = {vehicle["_id"]: vehicle for vehicle in vehicles}
-
-    now = datetime.now(timezone.utc)
-    last_month_reference = datetime(
+def _previous_month(now: datetime) -> datetime:
+    return datetime(
         year=now.year - 1 if now.month == 1 else now.year,
         month=12 if now.month == 1 else now.month - 1,
         day=1,
         tzinfo=timezone.utc,
     )
 
-    this_month_amount = 0.0
-    this_month_bookings = 0
-    last_month_amount = 0.0
-    last_month_bookings = 0
-    all_time_amount = 0.0
-    all_time_bookings = 0
-    transactions: list[dict] = []
-
-    for rent in rents:
-        vehicle = vehicle_by_id.get(rent.get("vehicle_id"))
-        if not vehicle:
-            continue
-
-        booking_status = rent.get("booking_status", "pending")
-        if booking_status not in ACTIVE_EARNING_STATUSES:
-            continue
-
-        start_date = _parse_datetime(rent.get("start_date"))
-        end_date = _parse_datetime(rent.get("end_date"))
-        if not start_date or not end_date:
-            continue
-
-        amount = _calculate_rent_amount(rent, float(vehicle.get("price", 0)))
-
-        transactions.append(
-            {
-                "rent_id": rent.get("_id", ""),
-                "vehicle_id": rent.get("vehicle_id", ""),
-                "vehicle_name": f'{vehicle.get("brand", "").strip()} {vehicle.get("model", "").strip()}'.strip()
-                or f'Vehicle #{rent.get("vehicle_id", "")}',
-                "renter_uid": rent.get("renter_uid", ""),
-                "start_date": start_date,
-                "end_date": end_date,
-                "amount": amount,
-                "booking_status": booking_status,
-            }
-        )
-
-        if booking_status != REALIZED_EARNING_STATUS:
-            continue
 
-        all_time_amount += amount
-        all_time_bookings += 1
+def _vehicle_name(vehicle: dict, vehicle_id: str) -> str:
+    name = f'{(vehicle.get("brand") or "").strip()} {(vehicle.get("model") or "").strip()}'.strip()
+    return name or f"Vehicle #{vehicle_id}"
 
-        if _is_same_month(end_date, now):
-            this_month_amount += amount
-            this_month_bookings += 1
-        elif _is_same_month(end_date, last_month_reference):
-            last_month_amount += amount
-            last_month_bookings += 1
 
-    change_percentage = 0.0
+def _change_percentage(this_month_amount: float, last_month_amount: float) -> float:
     if last_month_amount > 0:
-        change_percentage = round(((this_month_amount - last_month_amount) / last_month_amount) * 100, 2)
-    elif this_month_amount > 0:
-        change_percentage = 100.0
+        return round(((this_month_amount - last_month_amount) / last_month_amount) * 100, 2)
+    if this_month_amount > 0:
+        return 100.0
+    return 0.0
 
-    transactions.sort(key=lambda item: item["end_date"], reverse=True)
 
+def _build_overview(
+    *,
+    this_month: tuple[float, int],
+    last_month: tuple[float, int],
+    all_time: tuple[float, int],
+    transactions: list[dict],
+) -> dict:
     return {
         "summary": {
-            "this_month": {
-                "amount": round(this_month_amount, 2),
-                "bookings": this_month_bookings,
-            },
-            "last_month": {
-                "amount": round(last_month_amount, 2),
-                "bookings": last_month_bookings,
-            },
-            "all_time": {
-                "amount": round(all_time_amount, 2),
-                "bookings": all_time_bookings,
-            },
-            "change_percentage": change_percentage,
+            "this_month": {"amount": round(this_month[0], 2), "bookings": this_month[1]},
+            "last_month": {"amount": round(last_month[0], 2), "bookings": last_month[1]},
+            "all_time": {"amount": round(all_time[0], 2), "bookings": all_time[1]},
+            "change_percentage": _change_percentage(this_month[0], last_month[0]),
         },
-        "transactions": transactions[:10],
+        "transactions": transactions,
     }
+
+
+def _in_month_expr(reference: datetime) -> dict:
+    return {
+        "$and": [
+            {"$eq": [{"$year": "$end"}, reference.year]},
+            {"$eq": [{"$month": "$end"}, reference.month]},
+        ]
+    }
+
+
+def _to_date_expr(field: str) -> dict:
+    return {"$convert": {"input": field, "to": "date", "onError": None, "onNull": None}}
+
+
+def _earning_row_stages() -> list[dict]:
+    """Stages turning rent documents into rows with `vehicle`, `start`, `end` and `amount`.
+
+    Only the rent owner's own vehicles are joined, dates may be stored as BSON dates or ISO strings, and a rent is
+    billed per started day (minimum one) unless it already carries its booked
+    `earned_amount`.
+    """
+    return [
+        {
+            "$lookup": {
+                "from": VEHICLE_COLLECTION,
+                "let": {"vehicle_id": "$vehicle_id", "owner_uid": "$owner_uid"},
+                "pipeline": [
+                    {
+                        "$match": {
+                            "$expr": {
+                                "$and": [
+                                    {"$eq": ["$owner_uid", "$$owner_uid"]},
+                                    # vehicle ids are stored either as the raw string or as an ObjectId
+                                    {
+                                        "$or": [
+                                            {"$eq": ["$_id", "$$vehicle_id"]},
+                                            {
+                                                "$eq": [
+                                                    "$_id",
+                                                    {"$convert": {"input": "$$vehicle_id", "to": "objectId", "onError": None, "onNull": None}},
+                                                ]
+                                            },
+                                        ]
+                                    },
+                                ]
+                            }
+                        }
+                    },
+                    {"$project": {"price": 1, "brand": 1, "model": 1}},
+                ],
+                "as": "vehicle",
+            }
+        },
+        {"$unwind": "$vehicle"},
+        {"$addFields": {"start": _to_date_expr("$start_date"), "end": _to_date_expr("$end_date")}},
+        {"$match": {"start": {"$ne": None}, "end": {"$ne": None}}},
+        {"$addFields": {"days": {"$max": [1, {"$ceil": {"$divide": [{"$subtract": ["$end", "$start"]}, MS_PER_DAY]}}]}}},
+        {
+            "$addFields": {
+                "amount": {
+                    "$ifNull": [
+                        "$earned_amount",
+                        {"$round": [{"$multiply": [{"$toDouble": {"$ifNull": ["$vehicle.price", 0]}}, "$days"]}, 2]},
+                    ]
+                }
+            }
+        },
+    ]
+
+
+_TRANSACTION_PROJECTION = {
+    "$project": {
+        "_id": 0,
+        "rent_id": {"$toString": "$_id"},
+        "vehicle_id": 1,
+        "renter_uid": 1,
+        "brand": "$vehicle.brand",
+        "model": "$vehicle.model",
+        "start_date": "$start",
+        "end_date": "$end",
+        "amount": 1,
+        "booking_status": 1,
+    }
+}
+
+
+def _rows_to_transactions(rows: list[dict]) -> list[dict]:
+    return [
+        {
+            "rent_id": row.get("rent_id", ""),
+            "vehicle_id": row.get("vehicle_id", ""),
+            "vehicle_name": _vehicle_name(row, row.get("vehicle_id", "")),
+            "renter_uid": row.get("renter_uid", ""),
+            "start_date": _parse_datetime(row["start_date"]),
+            "end_date": _parse_datetime(row["end_date"]),
+            "amount": row.get("amount", 0.0),
+            "booking_status": row.get("booking_status", "pending"),
+        }
+        for row in rows
+    ]
+
+
+def build_owner_earnings_pipeline(*, owner_uid: str, now: datetime) -> list[dict]:
+    """Aggregation over `rents` producing the summary buckets and recent transactions in one round trip."""
+    this_month = _in_month_expr(now)
+    last_month = _in_month_expr(_previous_month(now))
+
+    return [
+        {"$match": {"owner_uid": owner_uid, "booking_status": {"$in": sorted(ACTIVE_EARNING_STATUSES)}}},
+        *_earning_row_stages(),
+        {
+            "$facet": {
+                "summary": [
+                    {"$match": {"booking_status": REALIZED_EARNING_STATUS}},
+                    {
+                        "$group": {
+                            "_id": None,
+                            "all_time_amount": {"$sum": "$amount"},
+                            "all_time_bookings": {"$sum": 1},
+                            "this_month_amount": {"$sum": {"$cond": [this_month, "$amount", 0]}},
+                            "this_month_bookings": {"$sum": {"$cond": [this_month, 1, 0]}},
+                            "last_month_amount": {"$sum": {"$cond": [last_month, "$amount", 0]}},
+                            "last_month_bookings": {"$sum": {"$cond": [last_month, 1, 0]}},
+                        }
+                    },
+                ],
+                "transactions": [
+                    {"$sort": {"end": -1, "_id": -1}},
+                    {"$limit": RECENT_TRANSACTIONS_LIMIT},
+                    _TRANSACTION_PROJECTION,
+                ],
+            }
+        },
+    ]
+
+
+async def aggregate_owner_earnings_overview(db: AsyncIOMotorDatabase, *, owner_uid: str) -> dict:
+    """`OwnerEarningsOverview` for an owner's whole rent history, computed by MongoDB in a single aggregation."""
+    now = datetime.now(timezone.utc)
+    pipeline = build_owner_earnings_pipeline(owner_uid=owner_uid, now=now)
+    results = await db[RENT_COLLECTION].aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+    facets = results[0] if results else {"summary": [], "transactions": []}
+    summary = facets["summary"][0] if facets["summary"] else {}
+
+    return _build_overview(
+        this_month=(summary.get("this_month_amount", 0.0), summary.get("this_month_bookings", 0)),
+        last_month=(summary.get("last_month_amount", 0.0), summary.get("last_month_bookings", 0)),
+        all_time=(summary.get("all_time_amount", 0.0), summary.get("all_time_bookings", 0)),
+        transactions=_rows_to_transactions(facets["transactions"]),
+    )
+
+
+# ==========================================
+# Monthly rollup (owner_earnings_monthly)
+# ==========================================
+
+def build_monthly_earnings_pipeline(*, owner_uid: str | None = None) -> list[dict]:
+    """Realized earnings grouped by (owner_uid, year, month) of the rent end date.
+
+    Used to (re)build the rollup and by the consistency checker. Without
+    `owner_uid` it covers every owner.
+    """
+    match: dict = {"booking_status": REALIZED_EARNING_STATUS}
+    if owner_uid is not None:
+        match["owner_uid"] = owner_uid
+    return [
+        {"$match": match},
+        *_earning_row_stages(),
+        {
+            "$group": {
+                "_id": {"owner_uid": "$owner_uid", "year": {"$year": "$end"}, "month": {"$month": "$end"}},
+                "amount": {"$sum": "$amount"},
+                "bookings": {"$sum": 1},
+            }
+        },
+    ]
+
+
+def build_recent_transactions_pipeline(*, owner_uid: str) -> list[dict]:
+    # Sorting on the stored end_date lets the `owner_recent` index serve the sort and limit, so only
+    # the surviving rows are joined. Rents with ISO-string dates sort after every BSON date until
+    # `scripts/migrate_rent_dates.py` converts them.
+    return [
+        {"$match": {"owner_uid": owner_uid, "booking_status": {"$in": sorted(ACTIVE_EARNING_STATUSES)}}},
+        {"$sort": {"end_date": -1, "_id": -1}},
+        {"$limit": RECENT_TRANSACTIONS_LIMIT},
+        *_earning_row_stages(),
+        _TRANSACTION_PROJECTION,
+    ]
+
+
+def rent_earning(rent: dict, vehicle_price: float) -> tuple[float, int, int] | None:
+    """Return `(amount, year, month)` a completed rent contributes to the rollup, or None if its dates are unusable."""
+    end_date = _parse_datetime(rent.get("end_date"))
+    if not end_date or not _parse_datetime(rent.get("start_date")):
+        return None
+    return _calculate_rent_amount(rent, vehicle_price), end_date.year, end_date.month
+
+
+async def record_rent_status_change(
+    db: AsyncIOMotorDatabase, *, before: dict, after: dict, vehicle: dict | None, session=None
+) -> None:
+    """Apply the rollup delta for a rent moving into or out of the realized status, in `session` if given."""
+    was_realized = before.get("booking_status") == REALIZED_EARNING_STATUS
+    is_realized = after.get("booking_status") == REALIZED_EARNING_STATUS
+    if was_realized == is_realized:
+        return
+
+    source, sign = (after, 1) if is_realized else (before, -1)
+    earning = rent_earning(source, float((vehicle or {}).get("price", 0)))
+    if earning is None:
+        return
+    amount, year, month = earning
+    await apply_earnings_delta(
+        db,
+        owner_uid=after.get("owner_uid") or before.get("owner_uid"),
+        year=year,
+        month=month,
+        amount=sign * amount,
+        bookings=sign,
+        session=session,
+    )
+
+
+async def rollup_owner_earnings_overview(db: AsyncIOMotorDatabase, *, owner_uid: str) -> dict:
+    """Earnings overview read from the monthly rollup plus the ten most recent transactions.
+
+    The rollup is backfilled by `scripts/rebuild_earnings_rollup.py`, never on
+    this read path; an owner's first delta creates their buckets already
+    marked. Legacy owners with neither get `aggregate_owner_earnings_overview`
+    instead, which writes nothing.
+    """
+    now = datetime.now(timezone.utc)
+    last_month = _previous_month(now)
+    this_key, last_key = (now.year, now.month), (last_month.year, last_month.month)
+
+    buckets = await get_earnings_buckets(db, owner_uid=owner_uid, months=[this_key, last_key])
+    if not buckets.get("total", {}).get("rebuilt_at"):
+        return await aggregate_owner_earnings_overview(db, owner_uid=owner_uid)
+
+    def bucket(key) -> tuple[float, int]:
+        doc = buckets.get(key) or {}
+        return doc.get("amount", 0.0), doc.get("bookings", 0)
+
+    pipeline = build_recent_transactions_pipeline(owner_uid=owner_uid)
+    rows = await db[RENT_COLLECTION].aggregate(pipeline).to_list(length=RECENT_TRANSACTIONS_LIMIT)
+
+    return _build_overview(
+        this_month=bucket(this_key),
+        last_month=bucket(last_key),
+        all_time=bucket("total"),
+        transactions=_rows_to_transactions(rows),
+    )
+
+
+async def compute_expected_rollups(db: AsyncIOMotorDatabase, *, owner_uid: str | None = None) -> dict:
+    """Return `{owner_uid: {(year, month): (amount, bookings)}}` recomputed from the rents collection."""
+    expected: dict = {}
+    cursor = db[RENT_COLLECTION].aggregate(build_monthly_earnings_pipeline(owner_uid=owner_uid), allowDiskUse=True)
+    async for row in cursor:
+        key = row["_id"]
+        expected.setdefault(key["owner_uid"], {})[(key["year"], key["month"])] = (row["amount"], row["bookings"])
+    return expected
+
+
+async def find_earnings_rollup_discrepancies(
+    db: AsyncIOMotorDatabase, *, owner_uid: str | None = None, tolerance: float = 0.01
+) -> list[dict]:
+    """Compare the stored rollup with a fresh recomputation and list every bucket that disagrees."""
+    expected = await compute_expected_rollups(db, owner_uid=owner_uid)
+    stored: dict = {}
+    query = {"owner_uid": owner_uid} if owner_uid is not None else {}
+    async for doc in db[EARNINGS_ROLLUP_COLLECTION].find(query):
+        key = "total" if doc.get("year") is None else (doc["year"], doc["month"])
+        stored.setdefault(doc["owner_uid"], {})[key] = (doc.get("amount", 0.0), doc.get("bookings", 0))
+
+    discrepancies = []
+    for owner in sorted(set(expected) | set(stored)):
+        months = dict(expected.get(owner, {}))
+        if months:
+            months["total"] = (
+                sum(amount for amount, _ in months.values()),
+                sum(bookings for _, bookings in months.values()),
+            )
+        owner_stored = stored.get(owner, {})
+        for key in sorted(set(months) | set(owner_stored), key=str):
+            want = months.get(key, (0.0, 0))
+            have = owner_stored.get(key, (0.0, 0))
+            if abs(want[0] - have[0]) > tolerance or want[1] != have[1]:
+                discrepancies.append(
+                    {
+                        "owner_uid": owner,
+                        "bucket": key if key == "total" else f"{key[0]:04d}-{key[1]:02d}",
+                        "expected": {"amount": round(want[0], 2), "bookings": want[1]},
+                        "stored": {"amount": round(have[0], 2), "bookings": have[1]},
+                    }
+                )
+    return discrepancies
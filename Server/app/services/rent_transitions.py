@@ -0,0 +1,184 @@
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.catalog_cache import catalog_cache
+from app.repositories.rent import BLOCKING_RENT_STATUSES, RentRepository
+from app.repositories.vehicle import VehicleRepository
+from app.services.bookings import release_booking
+from app.services.owner_earnings import record_rent_status_change, rent_earning
+from app.services.vehicle_facets import facet_cache
+
+# Topologies that support multi-document transactions.
+TRANSACTION_TOPOLOGIES = {"ReplicaSetWithPrimary", "Sharded"}
+
+
+@dataclass(frozen=True)
+class RentTransition:
+    from_statuses: Tuple[str, ...]
+    to_status: str
+    # Vehicle availability once the transition has happened.
+    vehicle_available: bool
+
+
+# The owner-side booking state machine.
+RENT_TRANSITIONS: Dict[str, RentTransition] = {
+    "accept": RentTransition(("pending",), "accepted", vehicle_available=False),
+    "cancel": RentTransition(("pending", "accepted"), "cancelled", vehicle_available=True),
+    "complete": RentTransition(("accepted",), "completed", vehicle_available=True),
+}
+
+
+class RentTransitionError(Exception):
+    """Base class for transitions that could not be applied."""
+
+
+class RentNotFoundError(RentTransitionError):
+    pass
+
+
+class RentNotOwnedError(RentTransitionError):
+    pass
+
+
+class RentVehicleNotFoundError(RentTransitionError):
+    pass
+
+
+class InvalidRentTransitionError(RentTransitionError):
+    def __init__(self, action: str, current_status: str | None):
+        super().__init__(f"Cannot {action} a rent that is {current_status or 'in an unknown state'}")
+        self.action = action
+        self.current_status = current_status
+
+
+def supports_transactions(db: AsyncIOMotorDatabase) -> bool:
+    client = getattr(db, "client", None)
+    if client is None:
+        return False
+    return client.topology_description.topology_type_name in TRANSACTION_TOPOLOGIES
+
+
+async def _in_transaction(db: AsyncIOMotorDatabase, work: Callable[[Any], Awaitable[Any]]) -> Any:
+    """Run `work(session)` inside a transaction, or `work(None)` on a standalone server."""
+    if not supports_transactions(db):
+        return await work(None)
+    async with await db.client.start_session() as session:
+        async with session.start_transaction():
+            return await work(session)
+
+
+def _transition_error(rent: dict | None, *, owner_uid: str, action: str) -> RentTransitionError:
+    if rent is None:
+        return RentNotFoundError("Rent not found")
+    if rent.get("owner_uid") != owner_uid:
+        return RentNotOwnedError("Not allowed")
+    return InvalidRentTransitionError(action, rent.get("booking_status"))
+
+
+async def _failed_transition(rents: RentRepository, *, owner_uid: str, rent_id: str, action: str) -> RentTransitionError:
+    # Only reached when the guarded update matched nothing; one read tells the caller why.
+    rent = await rents.get_rent_by_id(rent_id=rent_id)
+    return _transition_error(rent, owner_uid=owner_uid, action=action)
+
+
+async def transition_rent(db: AsyncIOMotorDatabase, *, owner_uid: str, rent_id: str, action: str) -> dict:
+    """Apply an owner action ("accept", "cancel" or "complete") to a rent.
+
+    The rent update is conditional on its current status, so of two concurrent
+    requests for the same rent only one succeeds. When the server supports
+    transactions, the vehicle's availability, the booking release and the
+    earnings rollup `$inc` all commit together with it.
+
+    On a standalone server each of those is its own write. Accept and cancel
+    put the rent back if the vehicle update fails. The rollup `$inc` comes
+    last, so a failure there leaves a completed rent that the rollup misses.
+    `scripts/check_earnings_rollup.py` reports that drift and
+    `scripts/rebuild_earnings_rollup.py` repairs it.
+
+    The catalog and facet caches are cleared only after the transaction has
+    committed, so a load running meanwhile cannot cache the old availability.
+    """
+    transition = RENT_TRANSITIONS[action]
+    rents = RentRepository(db)
+    vehicles = VehicleRepository(db)
+    availability_written = False
+
+    async def set_availability(vehicle_id: Any, session: Any) -> dict | None:
+        nonlocal availability_written
+        vehicle = await vehicles.set_availability(
+            owner_uid=owner_uid, vehicle_id=vehicle_id, available=transition.vehicle_available, session=session
+        )
+        availability_written = availability_written or vehicle is not None
+        return vehicle
+
+    async def change_status(session: Any) -> Tuple[dict, dict, dict]:
+        before = await rents.transition_status(
+            owner_uid=owner_uid,
+            rent_id=rent_id,
+            from_statuses=transition.from_statuses,
+            to_status=transition.to_status,
+            session=session,
+        )
+        if before is None:
+            raise await _failed_transition(rents, owner_uid=owner_uid, rent_id=rent_id, action=action)
+
+        vehicle = await set_availability(before["vehicle_id"], session)
+        if vehicle is None:
+            if session is None:
+                await rents.transition_status(
+                    owner_uid=owner_uid,
+                    rent_id=rent_id,
+                    from_statuses=(transition.to_status,),
+                    to_status=before["booking_status"],
+                )
+            raise RentVehicleNotFoundError("Vehicle not found or not owned by you")
+        return before, {**before, "booking_status": transition.to_status}, vehicle
+
+    async def complete(session: Any) -> Tuple[dict, dict, dict]:
+        # The booked amount needs the rent's dates and the vehicle's current price, so the vehicle is
+        # updated first and the rent then gets its status and earned_amount in one guarded $set.
+        current = await rents.get_rent_by_id(rent_id=rent_id, session=session)
+        allowed = current is not None and current.get("owner_uid") == owner_uid
+        if not allowed or current.get("booking_status") not in transition.from_statuses:
+            raise _transition_error(current, owner_uid=owner_uid, action=action)
+
+        vehicle = await set_availability(current["vehicle_id"], session)
+        if vehicle is None:
+            raise RentVehicleNotFoundError("Vehicle not found or not owned by you")
+
+        # Book the amount at the current price so later price edits don't rewrite past earnings.
+        earning = rent_earning(current, float(vehicle.get("price", 0)))
+        earned_amount = earning[0] if earning else None
+        before = await rents.transition_status(
+            owner_uid=owner_uid,
+            rent_id=rent_id,
+            from_statuses=transition.from_statuses,
+            to_status=transition.to_status,
+            earned_amount=earned_amount,
+            session=session,
+        )
+        if before is None:
+            # Lost a race with another accepted -> cancelled/completed change. Without a transaction the
+            # vehicle stays available, which is also what the winning change leaves it as.
+            raise await _failed_transition(rents, owner_uid=owner_uid, rent_id=rent_id, action=action)
+        after = {**before, "booking_status": transition.to_status}
+        if earned_amount is not None:
+            after["earned_amount"] = earned_amount
+        return before, after, vehicle
+
+    async def work(session: Any) -> dict:
+        before, after, vehicle = await (complete if transition.to_status == "completed" else change_status)(session)
+        if transition.to_status not in BLOCKING_RENT_STATUSES:
+            await release_booking(db, rent=before, session=session)
+        await record_rent_status_change(db, before=before, after=after, vehicle=vehicle, session=session)
+        return after
+
+    try:
+        return await _in_transaction(db, work)
+    finally:
+        # Also on failure: without a transaction the availability write may already be durable.
+        if availability_written:
+            catalog_cache.invalidate()
+            facet_cache.invalidate()
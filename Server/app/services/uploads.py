@@ -0,0 +1,61 @@
+import os
+import tempfile
+from pathlib import Path
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class UploadRejectedError(ValueError):
+    """Raised when an uploaded file is empty or larger than the allowed size."""
+
+
+def _size_limit_message(max_bytes: int) -> str:
+    if max_bytes % (1024 * 1024) == 0:
+        return f"Image exceeds {max_bytes // (1024 * 1024)}MB limit."
+    return f"Image exceeds {max_bytes} byte limit."
+
+
+def _copy_bounded(source, destination: Path, max_bytes: int, chunk_size: int) -> int:
+    # The temp file lives next to the destination so the final os.replace is an atomic rename.
+    fd, temp_name = tempfile.mkstemp(dir=destination.parent, prefix=".upload-", suffix=".part")
+    written = 0
+    try:
+        with os.fdopen(fd, "wb") as target:
+            while chunk := source.read(chunk_size):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadRejectedError(_size_limit_message(max_bytes))
+                target.write(chunk)
+        if written == 0:
+            raise UploadRejectedError("Uploaded file is empty.")
+        os.replace(temp_name, destination)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    return written
+
+
+async def save_upload(
+    upload: UploadFile,
+    destination: Path,
+    *,
+    max_bytes: int,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> int:
+    """
+    Streams an uploaded file to `destination` and returns the number of bytes written.
+
+    The body is copied in fixed-size chunks on a worker thread, so at most one chunk
+    is held in memory and the event loop never waits on disk I/O. The copy stops as
+    soon as `max_bytes` is exceeded, and the file only appears at `destination` once
+    it is complete.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadRejectedError(_size_limit_message(max_bytes))
+
+    await upload.seek(0)
+    return await run_in_threadpool(_copy_bounded, upload.file, destination, max_bytes, chunk_size)
@@ -0,0 +1,26 @@
+import os
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.catalog_cache import query_cache_key
+from app.core.ttl_cache import TTLCache
+from app.repositories.vehicle import count_vehicle_facets
+
+# Process-wide cache of sidebar counts. Counts may lag writes by up to the TTL,
+# which is fine for a filter sidebar and spares the aggregation on every keystroke.
+facet_cache = TTLCache(
+    ttl=float(os.getenv("VEHICLE_FACET_CACHE_TTL", "30")),
+    max_entries=int(os.getenv("VEHICLE_FACET_CACHE_SIZE", "1000")),
+)
+
+
+def facet_cache_key(query: dict, text: str | None = None) -> str:
+    return query_cache_key("facets", query, text=text)
+
+
+async def get_vehicle_facets(
+    db: AsyncIOMotorDatabase, *, query: dict, text: str | None = None, cache: TTLCache | None = None
+) -> dict:
+    cache = facet_cache if cache is None else cache
+    key = facet_cache_key(query, text)
+    return await cache.get_or_load(key, lambda: count_vehicle_facets(db, query=query, text=text))
@@ -0,0 +1,66 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run from the ``Server/`` directory as modules, e.g.
+``python -m benchmarks.bench_vehicle_search``. They connect to the MongoDB
+instance configured in ``.env`` but write only to a scratch database
+(``BENCH_DB_NAME``, default ``AutoShareBench``) so real data is never touched.
+"""
+
+import os
+import statistics
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+
+def bench_db_name() -> str:
+    return os.getenv("BENCH_DB_NAME", "AutoShareBench")
+
+
+@asynccontextmanager
+async def bench_database():
+    env_path = Path(__file__).resolve().parents[1] / ".env"
+    load_dotenv(env_path)
+
+    mongo_url = (os.getenv("MONGODB_URL") or "").strip().strip('"').strip("'")
+    if not mongo_url:
+        raise RuntimeError("MONGODB_URL is not set.")
+
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    try:
+        await client.admin.command("ping")
+        yield client[bench_db_name()]
+    finally:
+        client.close()
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize_ms(samples: list[float]) -> dict:
+    """Summarize latency samples (seconds) as milliseconds."""
+    return {
+        "runs": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        return False
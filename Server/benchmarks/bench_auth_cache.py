@@ -0,0 +1,107 @@
+"""Measure per-request authentication overhead with and without the token cache.
+
+Mints RS256 tokens with a throwaway key and verifies them with the same
+google-auth primitives the Firebase Admin SDK uses, so the uncached path pays
+a real RSA signature check (but no network fetch of Google's certificates).
+No database is needed.
+
+    python -m benchmarks.bench_auth_cache --requests 5000 --users 50 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.security import HTTPAuthorizationCredentials
+from google.auth import crypt, jwt
+
+from app.core import auth_deps
+from app.core.token_cache import TokenCache
+from benchmarks._common import summarize_ms
+
+AUDIENCE = "autoshare-bench"
+
+
+def make_keypair() -> tuple[crypt.RSASigner, bytes]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return crypt.RSASigner.from_string(private_pem, key_id="bench"), public_pem
+
+
+def mint_tokens(signer: crypt.RSASigner, users: int) -> list[str]:
+    now = int(time.time())
+    return [
+        jwt.encode(
+            signer,
+            {"uid": f"bench_user_{index}", "sub": f"bench_user_{index}", "aud": AUDIENCE, "iat": now, "exp": now + 3600},
+        ).decode("ascii")
+        for index in range(users)
+    ]
+
+
+class DisabledCache(TokenCache):
+    """Stand-in that forces every request down the verification path."""
+
+    def get(self, id_token: str) -> dict | None:
+        return None
+
+    def put(self, id_token: str, claims: dict) -> None:
+        return None
+
+
+async def run(tokens: list[str], total: int, concurrency: int, cached: bool) -> dict:
+    auth_deps.token_cache = TokenCache(max_entries=len(tokens)) if cached else DisabledCache()
+
+    samples: list[float] = []
+    queue = list(range(total))
+
+    async def worker():
+        while queue:
+            index = queue.pop()
+            creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=tokens[index % len(tokens)])
+            start = time.perf_counter()
+            await auth_deps.get_current_user(creds)
+            samples.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+
+    report = summarize_ms(samples)
+    report["requests_per_sec"] = round(total / wall, 1)
+    if cached:
+        report["cache"] = auth_deps.token_cache.stats()
+    return report
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=50, help="Distinct tokens in rotation.")
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    signer, public_pem = make_keypair()
+    tokens = mint_tokens(signer, args.users)
+    auth_deps.auth.verify_id_token = lambda id_token: jwt.decode(id_token, certs=public_pem, audience=AUDIENCE)
+
+    report = {
+        "requests": args.requests,
+        "users": args.users,
+        "concurrency": args.concurrency,
+        "uncached": await run(tokens, args.requests, args.concurrency, cached=False),
+        "cached": await run(tokens, args.requests, args.concurrency, cached=True),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
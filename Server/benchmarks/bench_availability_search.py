@@ -0,0 +1,131 @@
+"""Compare date-range availability search with loading every booking.
+
+Seeds 10k vehicles and 100k rents into the scratch benchmark database, then
+asks for one page of vehicles free over a random window, both through
+``/vehicles/search?available_from=..&available_to=..`` and the way it had to
+be done before: load all pending/accepted rents, work out the booked vehicles
+in Python, and exclude them from the vehicle query.
+
+    python -m benchmarks.bench_availability_search --vehicles 10000 --rents 100000 --runs 30
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from app.core.db import get_database
+from app.main import app
+from app.repositories.rent import BLOCKING_RENT_STATUSES, RENT_COLLECTION, ensure_rent_indexes
+from app.repositories.vehicle import VEHICLE_COLLECTION, VEHICLE_SEARCH_SORTS, ensure_vehicle_indexes
+from benchmarks._common import Timer, bench_database, summarize_ms
+from benchmarks.bench_vehicle_search import synthetic_vehicle
+
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+HORIZON_DAYS = 365
+STATUSES = ["pending", "accepted", "accepted", "completed", "completed", "cancelled"]
+
+
+def synthetic_rent(rng: random.Random, index: int, vehicles: int) -> dict:
+    start = EPOCH + timedelta(days=rng.randrange(HORIZON_DAYS), hours=rng.randrange(24))
+    return {
+        "_id": f"bench_rent_{index}",
+        "vehicle_id": f"bench_vehicle_{rng.randrange(vehicles)}",
+        "renter_uid": f"bench_renter_{rng.randrange(20000)}",
+        "owner_uid": f"bench_owner_{rng.randrange(2000)}",
+        "start_date": start,
+        "end_date": start + timedelta(days=rng.randint(1, 10)),
+        "booking_status": rng.choice(STATUSES),
+    }
+
+
+async def _insert(collection, docs_iter) -> None:
+    batch = []
+    for doc in docs_iter:
+        batch.append(doc)
+        if len(batch) == 1000:
+            await collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+
+
+async def seed(db, vehicles: int, rents: int, seed_value: int) -> None:
+    rng = random.Random(seed_value)
+    if await db[VEHICLE_COLLECTION].count_documents({}) != vehicles:
+        await db[VEHICLE_COLLECTION].delete_many({})
+        await _insert(db[VEHICLE_COLLECTION], (synthetic_vehicle(rng, i) for i in range(vehicles)))
+    if await db[RENT_COLLECTION].count_documents({}) != rents:
+        await db[RENT_COLLECTION].delete_many({})
+        await _insert(db[RENT_COLLECTION], (synthetic_rent(rng, i, vehicles) for i in range(rents)))
+    await ensure_vehicle_indexes(db)
+    await ensure_rent_indexes(db)
+
+
+def random_window(rng: random.Random) -> tuple[datetime, datetime]:
+    start = EPOCH + timedelta(days=rng.randrange(HORIZON_DAYS - 14))
+    return start, start + timedelta(days=rng.randint(2, 7))
+
+
+async def load_all_rents(db, start: datetime, end: datetime, limit: int) -> list:
+    rents = await db[RENT_COLLECTION].find({"booking_status": {"$in": list(BLOCKING_RENT_STATUSES)}}).to_list(length=None)
+    booked = {r["vehicle_id"] for r in rents if r["start_date"] < end and r["end_date"] > start}
+    cursor = db[VEHICLE_COLLECTION].find({"_id": {"$nin": list(booked)}}).sort(VEHICLE_SEARCH_SORTS["price_asc"])
+    return await cursor.limit(limit).to_list(length=limit)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, default=10000)
+    parser.add_argument("--rents", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--limit", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    windows = [random_window(rng) for _ in range(args.runs)]
+
+    async with bench_database() as db:
+        await seed(db, args.vehicles, args.rents, args.seed)
+
+        baseline = []
+        for start, end in windows:
+            with Timer() as timer:
+                await load_all_rents(db, start, end, args.limit)
+            baseline.append(timer.elapsed)
+
+        app.dependency_overrides[get_database] = lambda: db
+        transport = httpx.ASGITransport(app=app)
+        indexed = []
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for start, end in windows:
+                params = {
+                    "available_from": start.isoformat(),
+                    "available_to": end.isoformat(),
+                    "sort": "price_asc",
+                    "limit": str(args.limit),
+                }
+                with Timer() as timer:
+                    response = await client.get("/vehicles/search", params=params)
+                    response.raise_for_status()
+                indexed.append(timer.elapsed)
+        app.dependency_overrides.clear()
+
+    results = {
+        "vehicles": args.vehicles,
+        "rents": args.rents,
+        "load_all_rents": summarize_ms(baseline),
+        "availability_search": summarize_ms(indexed),
+    }
+    results["p50_speedup"] = round(
+        results["load_all_rents"]["p50_ms"] / max(results["availability_search"]["p50_ms"], 1e-6), 1
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
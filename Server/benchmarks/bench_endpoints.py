@@ -0,0 +1,287 @@
+"""Load-test the main endpoints in-process against an in-memory MongoDB stand-in.
+
+Seeds a synthetic catalog, rents and owners into ``LatencyDB``
+(``benchmarks/mongo_standin.py``), which adds a configurable delay to every
+database round trip, then drives each endpoint through the ASGI app with many
+concurrent clients, one endpoint at a time. Reports requests per second,
+latency percentiles and database round trips per request for each endpoint.
+Authentication is replaced by a dependency that takes the bearer token as the
+uid, and image variant rendering is switched off so uploads measure the
+request path only. No MongoDB or Firebase is needed, and the data, the
+requests and the injected latency all come from ``--seed``, so reports from
+two commits compare directly:
+
+    python -m benchmarks.bench_endpoints --output before.json
+    python -m benchmarks.bench_endpoints --baseline before.json
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import random
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+import httpx
+from fastapi import Depends
+from fastapi.security import HTTPAuthorizationCredentials
+from PIL import Image
+
+from app.core.auth_deps import get_current_user, http_bearer
+from app.core.catalog_cache import catalog_cache
+from app.core.db import get_database
+from app.main import app
+from app.repositories.registry import ensure_all_indexes
+from app.repositories.rent import RENT_COLLECTION
+from app.repositories.vehicle import VEHICLE_COLLECTION
+from app.routers import vehicles as vehicles_router
+from app.services.vehicle_facets import facet_cache
+from benchmarks._common import summarize_ms
+from benchmarks.bench_vehicle_search import FUELS, LOCATIONS, TYPES, synthetic_vehicle
+from benchmarks.mongo_standin import LatencyDB
+
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+HISTORY_STATUSES = ["accepted", "completed", "completed", "cancelled", "pending"]
+
+
+@dataclass
+class Dataset:
+    owners: list[str]
+    vehicles: list[dict]
+    pending_rent_ids: list[tuple[str, str]]
+    image: bytes
+
+
+# A scenario turns (dataset, rng, request index) into the arguments of `client.request`.
+RequestFactory = Callable[[Dataset, random.Random, int], dict]
+
+
+def _auth(uid: str) -> dict:
+    return {"Authorization": f"Bearer {uid}"}
+
+
+def _catalog_page(data: Dataset, rng: random.Random, index: int) -> dict:
+    return {"method": "GET", "url": "/vehicles", "params": {"limit": 24}}
+
+
+def _catalog_search(data: Dataset, rng: random.Random, index: int) -> dict:
+    params = {"type": rng.choice(TYPES), "max_price": rng.choice([60, 120, 200]), "sort": "price_asc", "limit": 24}
+    if rng.random() < 0.5:
+        params["location"] = rng.choice(LOCATIONS)
+    return {"method": "GET", "url": "/vehicles/search", "params": params}
+
+
+def _catalog_facets(data: Dataset, rng: random.Random, index: int) -> dict:
+    return {"method": "GET", "url": "/vehicles/facets", "params": {"fuel": rng.choice(FUELS)}}
+
+
+def _owner_rents(data: Dataset, rng: random.Random, index: int) -> dict:
+    return {"method": "GET", "url": "/rents/owner", "params": {"limit": 50}, "headers": _auth(rng.choice(data.owners))}
+
+
+def _owner_earnings(data: Dataset, rng: random.Random, index: int) -> dict:
+    return {"method": "GET", "url": "/rents/owner/earnings", "headers": _auth(rng.choice(data.owners))}
+
+
+def _accept_rent(data: Dataset, rng: random.Random, index: int) -> dict:
+    # Each request accepts a different pending rent, so every transition succeeds.
+    rent_id, owner_uid = data.pending_rent_ids[index]
+    return {"method": "POST", "url": f"/rents/{rent_id}/accept", "headers": _auth(owner_uid)}
+
+
+def _upload_image(data: Dataset, rng: random.Random, index: int) -> dict:
+    vehicle = rng.choice(data.vehicles)
+    return {
+        "method": "POST",
+        "url": f"/vehicles/{vehicle['_id']}/image",
+        "headers": _auth(vehicle["owner_uid"]),
+        "files": {"image": ("bench.png", data.image, "image/png")},
+    }
+
+
+SCENARIOS: dict[str, RequestFactory] = {
+    "GET /vehicles": _catalog_page,
+    "GET /vehicles/search": _catalog_search,
+    "GET /vehicles/facets": _catalog_facets,
+    "GET /rents/owner": _owner_rents,
+    "GET /rents/owner/earnings": _owner_earnings,
+    "POST /rents/{id}/accept": _accept_rent,
+    "POST /vehicles/{id}/image": _upload_image,
+}
+
+
+def synthetic_rent(rng: random.Random, rent_id: str, vehicle: dict, status: str) -> dict:
+    start = EPOCH + timedelta(days=rng.randrange(300), hours=rng.randrange(24))
+    return {
+        "_id": rent_id,
+        "vehicle_id": vehicle["_id"],
+        "renter_uid": f"bench_renter_{rng.randrange(5000)}",
+        "owner_uid": vehicle["owner_uid"],
+        "start_date": start,
+        "end_date": start + timedelta(days=rng.randint(1, 10)),
+        "booking_status": status,
+    }
+
+
+def png_bytes(size: int = 64) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), (200, 80, 40)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def seed(db: LatencyDB, *, vehicles: int, owners: int, rents: int, pending: int, seed_value: int) -> Dataset:
+    rng = random.Random(seed_value)
+    owner_uids = [f"bench_owner_{n}" for n in range(owners)]
+    catalog = []
+    for index in range(vehicles):
+        vehicle = synthetic_vehicle(rng, index)
+        vehicle["owner_uid"] = owner_uids[index % owners]
+        catalog.append(vehicle)
+
+    history = [synthetic_rent(rng, f"bench_rent_{n}", rng.choice(catalog), rng.choice(HISTORY_STATUSES)) for n in range(rents)]
+    pending_rents = [synthetic_rent(rng, f"bench_pending_{n}", rng.choice(catalog), "pending") for n in range(pending)]
+
+    await ensure_all_indexes(db)
+    await db[VEHICLE_COLLECTION].insert_many(catalog)
+    await db[RENT_COLLECTION].insert_many(history + pending_rents)
+    return Dataset(
+        owners=owner_uids,
+        vehicles=catalog,
+        pending_rent_ids=[(rent["_id"], rent["owner_uid"]) for rent in pending_rents],
+        image=png_bytes(),
+    )
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, db: LatencyDB, data: Dataset, name: str, *, requests: int, clients: int, seed_value: int
+) -> dict:
+    factory = SCENARIOS[name]
+    rng = random.Random(f"{seed_value}:{name}")
+    planned = [factory(data, rng, index) for index in range(requests)]
+    samples: list[float] = []
+    statuses: dict[str, int] = {}
+    next_index = iter(range(requests))
+
+    # Every endpoint starts with cold in-process caches.
+    catalog_cache.clear()
+    facet_cache.clear()
+
+    async def worker():
+        for index in next_index:
+            start = time.perf_counter()
+            response = await client.request(**planned[index])
+            samples.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    with db.label(name):
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        wall = time.perf_counter() - wall_start
+
+    return {
+        "req_per_sec": round(requests / wall, 1),
+        **summarize_ms(samples),
+        "db_round_trips_per_request": round(db.round_trips_by_label.get(name, 0) / requests, 2),
+        "errors": sum(count for status, count in statuses.items() if not status.startswith("2")),
+        "statuses": statuses,
+    }
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    """Relative change of each endpoint's throughput and tail latency against an earlier report."""
+
+    def pct(new: float, old: float) -> float | None:
+        return round((new - old) / old * 100, 1) if old else None
+
+    changes = {}
+    for name, result in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        changes[name] = {
+            "req_per_sec_pct": pct(result["req_per_sec"], before["req_per_sec"]),
+            "p95_ms_pct": pct(result["p95_ms"], before["p95_ms"]),
+            "p99_ms_pct": pct(result["p99_ms"], before["p99_ms"]),
+            "db_round_trips_delta": round(result["db_round_trips_per_request"] - before["db_round_trips_per_request"], 2),
+        }
+    return {"commit": baseline.get("commit"), "endpoints": changes}
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def bench_user(creds: HTTPAuthorizationCredentials = Depends(http_bearer)) -> dict:
+    return {"uid": creds.credentials}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint.")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent clients.")
+    parser.add_argument("--vehicles", type=int, default=2000)
+    parser.add_argument("--owners", type=int, default=100)
+    parser.add_argument("--rents", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Delay added to every database round trip.")
+    parser.add_argument("--jitter-ms", type=float, default=0.5, help="Extra random delay of up to this much per round trip.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", action="append", choices=list(SCENARIOS), help="Run only these endpoints (repeatable).")
+    parser.add_argument("--output", type=Path, help="Also write the report to this file.")
+    parser.add_argument("--baseline", type=Path, help="Earlier report to compare against.")
+    args = parser.parse_args()
+
+    db = LatencyDB(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, seed=args.seed)
+    data = await seed(
+        db, vehicles=args.vehicles, owners=args.owners, rents=args.rents, pending=args.requests, seed_value=args.seed
+    )
+
+    report = {
+        "commit": current_commit(),
+        "config": {
+            key: getattr(args, key)
+            for key in ("requests", "clients", "vehicles", "owners", "rents", "latency_ms", "jitter_ms", "seed")
+        },
+        "endpoints": {},
+    }
+
+    upload_dir = vehicles_router.VEHICLE_UPLOAD_DIR
+    schedule_variants = vehicles_router.schedule_vehicle_image_variants
+    app.dependency_overrides[get_database] = lambda: db
+    app.dependency_overrides[get_current_user] = bench_user
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            vehicles_router.VEHICLE_UPLOAD_DIR = Path(scratch)
+            vehicles_router.schedule_vehicle_image_variants = lambda *args, **kwargs: None
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+                for name in args.only or SCENARIOS:
+                    report["endpoints"][name] = await run_scenario(
+                        client, db, data, name, requests=args.requests, clients=args.clients, seed_value=args.seed
+                    )
+    finally:
+        vehicles_router.VEHICLE_UPLOAD_DIR = upload_dir
+        vehicles_router.schedule_vehicle_image_variants = schedule_variants
+        app.dependency_overrides.pop(get_database, None)
+        app.dependency_overrides.pop(get_current_user, None)
+
+    if args.baseline:
+        report["vs_baseline"] = compare(report, json.loads(args.baseline.read_text()))
+
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(rendered + "\n")
+    print(rendered)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
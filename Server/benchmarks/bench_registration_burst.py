@@ -0,0 +1,162 @@
+"""Measure how a registration burst affects unrelated endpoints.
+
+Starts a stub Identity Toolkit server on a background thread (with an
+artificial per-call latency), points the Firebase Admin SDK at it through
+FIREBASE_AUTH_EMULATOR_HOST, then fires a burst of ``/auth/register/email``
+requests while probing ``GET /vehicles`` and reports the probe latency.
+
+``--mode inline`` replays the old behaviour (Admin SDK calls made directly on
+the event loop) for comparison with the bounded executor.
+
+    python -m benchmarks.bench_registration_burst --registrations 200 --idp-latency-ms 80
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import firebase_admin
+import httpx
+
+from app.core.db import get_database
+from app.main import app
+from app.repositories.user import USER_COLLECTION
+from app.routers import auth as auth_router
+from benchmarks._common import bench_database, summarize_ms
+
+EMAIL_PREFIX = "bench_register_"
+
+
+def start_stub_identity_server(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            return None
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            time.sleep(latency)
+
+            path = self.path.split("?", 1)[0]
+            if path.endswith("/accounts"):
+                reply = {"localId": body.get("localId") or uuid.uuid4().hex}
+            elif path.endswith("/accounts:lookup"):
+                uid = (body.get("localId") or ["unknown"])[0]
+                reply = {"users": [{"localId": uid, "email": f"{EMAIL_PREFIX}{uid}@example.com"}]}
+            elif path.endswith("/accounts:signInWithPassword"):
+                reply = {"localId": uuid.uuid4().hex, "idToken": "stub-token"}
+            else:
+                reply = {}
+
+            payload = json.dumps(reply).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def inline_admin_call(func, *args, **kwargs):
+    """The pre-executor behaviour: block the event loop for the whole SDK call."""
+    return func(*args, **kwargs)
+
+
+async def run_burst(client: httpx.AsyncClient, registrations: int, concurrency: int, probes: int) -> dict:
+    probe_samples: list[float] = []
+    register_samples: list[float] = []
+    burst_done = asyncio.Event()
+    pending = list(range(registrations))
+
+    async def register_worker():
+        while pending:
+            index = pending.pop()
+            start = time.perf_counter()
+            response = await client.post(
+                "/auth/register/email",
+                json={
+                    "email": f"{EMAIL_PREFIX}{uuid.uuid4().hex[:12]}_{index}@example.com",
+                    "password": "bench-password",
+                    "full_name": "Bench User",
+                    "address": "Colombo",
+                    "nic": "000000000V",
+                    "phone": "0770000000",
+                },
+            )
+            response.raise_for_status()
+            register_samples.append(time.perf_counter() - start)
+
+    async def probe_worker():
+        while not burst_done.is_set():
+            start = time.perf_counter()
+            response = await client.get("/vehicles", params={"limit": 20})
+            response.raise_for_status()
+            probe_samples.append(time.perf_counter() - start)
+            await asyncio.sleep(0.005)
+
+    probe_tasks = [asyncio.create_task(probe_worker()) for _ in range(probes)]
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(register_worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+    burst_done.set()
+    await asyncio.gather(*probe_tasks)
+
+    return {
+        "registrations_per_sec": round(registrations / wall, 1),
+        "register": summarize_ms(register_samples),
+        "unrelated_get_vehicles": summarize_ms(probe_samples),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--registrations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent registration requests.")
+    parser.add_argument("--probes", type=int, default=4, help="Concurrent GET /vehicles probe loops.")
+    parser.add_argument("--idp-latency-ms", type=float, default=80.0, help="Stub identity server latency per call.")
+    parser.add_argument("--mode", choices=["executor", "inline", "both"], default="both")
+    args = parser.parse_args()
+
+    server = start_stub_identity_server(args.idp_latency_ms / 1000)
+    os.environ["FIREBASE_AUTH_EMULATOR_HOST"] = f"127.0.0.1:{server.server_address[1]}"
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(options={"projectId": "autoshare-bench"})
+
+    report = {
+        "registrations": args.registrations,
+        "concurrency": args.concurrency,
+        "idp_latency_ms": args.idp_latency_ms,
+    }
+    modes = ["inline", "executor"] if args.mode == "both" else [args.mode]
+    executor_call = auth_router.run_admin_call
+
+    async with bench_database() as db:
+        app.dependency_overrides[get_database] = lambda: db
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for mode in modes:
+                    auth_router.run_admin_call = inline_admin_call if mode == "inline" else executor_call
+                    report[mode] = await run_burst(client, args.registrations, args.concurrency, args.probes)
+        finally:
+            auth_router.run_admin_call = executor_call
+            app.dependency_overrides.pop(get_database, None)
+            await db[USER_COLLECTION].delete_many({"email": {"$regex": f"^{EMAIL_PREFIX}"}})
+            server.shutdown()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""Simulate repeated gallery loads against the old and new /uploads handlers.
+
+Builds a synthetic gallery (uuid-named JPEGs plus their ``_full.webp``
+variants) in a temp directory and replays page loads through a small browser
+cache model: responses marked ``immutable``/``max-age`` are reused without a
+request, everything else is revalidated with ``If-None-Match``. Reports
+requests, bytes on the wire and wall time per strategy. No database is needed.
+
+    python -m benchmarks.bench_static_uploads --images 24 --loads 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+from app.core.uploads_static import UploadsStaticFiles
+
+BROWSER_HEADERS = {"accept": "image/avif,image/webp,image/apng,image/*,*/*;q=0.8", "accept-encoding": "gzip, br"}
+
+
+def build_gallery(directory: Path, images: int, jpeg_kb: int, webp_kb: int) -> list[str]:
+    urls = []
+    for index in range(images):
+        stem = f"veh_{index}_{uuid.uuid4().hex}"
+        (directory / f"{stem}.jpg").write_bytes(os.urandom(jpeg_kb * 1024))
+        (directory / f"{stem}_full.webp").write_bytes(os.urandom(webp_kb * 1024))
+        urls.append(f"/uploads/{stem}.jpg")
+    return urls
+
+
+class BrowserCache:
+    def __init__(self):
+        self.entries: dict[str, dict] = {}
+
+    def fresh(self, url: str) -> bool:
+        cache_control = (self.entries.get(url) or {}).get("cache-control", "")
+        return "immutable" in cache_control or ("max-age=" in cache_control and "no-cache" not in cache_control)
+
+    def conditional_headers(self, url: str) -> dict:
+        etag = (self.entries.get(url) or {}).get("etag")
+        return {"if-none-match": etag} if etag else {}
+
+    def store(self, url: str, response: httpx.Response) -> None:
+        if response.status_code == 200:
+            self.entries[url] = {
+                "etag": response.headers.get("etag"),
+                "cache-control": response.headers.get("cache-control", ""),
+            }
+
+
+async def replay(static_app, urls: list[str], loads: int) -> dict:
+    app = Starlette(routes=[Mount("/uploads", static_app)])
+    cache = BrowserCache()
+    requests = not_modified = wire_bytes = 0
+    load_times = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(loads):
+            start = time.perf_counter()
+            pending = [url for url in urls if not cache.fresh(url)]
+            responses = await asyncio.gather(
+                *(client.get(url, headers={**BROWSER_HEADERS, **cache.conditional_headers(url)}) for url in pending)
+            )
+            for url, response in zip(pending, responses):
+                requests += 1
+                not_modified += response.status_code == 304
+                wire_bytes += len(response.content)
+                cache.store(url, response)
+            load_times.append(time.perf_counter() - start)
+
+    return {
+        "requests": requests,
+        "not_modified": not_modified,
+        "bytes_transferred": wire_bytes,
+        "first_load_ms": round(load_times[0] * 1000, 2),
+        "repeat_load_mean_ms": round(sum(load_times[1:]) / max(1, len(load_times) - 1) * 1000, 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=24, help="Images in the gallery.")
+    parser.add_argument("--loads", type=int, default=20, help="Times the gallery page is loaded.")
+    parser.add_argument("--jpeg-kb", type=int, default=400)
+    parser.add_argument("--webp-kb", type=int, default=120)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        urls = build_gallery(Path(directory), args.images, args.jpeg_kb, args.webp_kb)
+        report = {
+            "images": args.images,
+            "loads": args.loads,
+            "static_files": await replay(StaticFiles(directory=directory), urls, args.loads),
+            "uploads_static_files": await replay(UploadsStaticFiles(directory=directory), urls, args.loads),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
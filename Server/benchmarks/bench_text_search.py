@@ -0,0 +1,108 @@
+"""Time relevance-ranked text search against client-side substring matching.
+
+Seeds a synthetic 100k-vehicle catalog into the scratch benchmark database,
+then runs multi-token queries such as "toyota colombo automatic" through
+``/vehicles/search?q=..`` and the way the search page matched them before:
+download the catalog page by page from ``/vehicles`` and keep the vehicles
+whose brand, model, location, type, transmission or fuel contain a token.
+
+    python -m benchmarks.bench_text_search --vehicles 100000 --runs 30 --baseline-runs 3
+"""
+
+import argparse
+import asyncio
+import json
+
+import httpx
+
+from app.core.db import get_database
+from app.main import app
+from app.repositories.vehicle import VEHICLE_TEXT_WEIGHTS
+from benchmarks._common import Timer, bench_database, summarize_ms
+from benchmarks.bench_vehicle_search import seed
+
+QUERIES = [
+    "toyota colombo automatic",
+    "honda civic kandy",
+    "suzuki swift petrol galle",
+    "nissan leaf electric",
+    "mitsubishi montero diesel jaffna",
+    "hybrid hatchback negombo",
+]
+
+
+def substring_matches(vehicle: dict, tokens: list[str]) -> int:
+    haystack = " ".join(str(vehicle.get(field) or "") for field in VEHICLE_TEXT_WEIGHTS).lower()
+    return sum(token in haystack for token in tokens)
+
+
+async def client_side_search(client: httpx.AsyncClient, text: str, limit: int) -> list:
+    catalog, cursor = [], None
+    while True:
+        params = {"limit": "200", **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/vehicles", params=params)
+        response.raise_for_status()
+        body = response.json()
+        catalog.extend(body["items"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    tokens = text.lower().split()
+    scored = [(substring_matches(v, tokens), v) for v in catalog]
+    scored = [item for item in scored if item[0]]
+    scored.sort(key=lambda item: -item[0])
+    return [v for _, v in scored[:limit]]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=30, help="Text search requests per query.")
+    parser.add_argument("--baseline-runs", type=int, default=3, help="Full-catalog downloads per query.")
+    parser.add_argument("--limit", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    async with bench_database() as db:
+        await seed(db, args.vehicles, args.seed)
+        app.dependency_overrides[get_database] = lambda: db
+        transport = httpx.ASGITransport(app=app)
+        per_query = {}
+        all_text, all_baseline = [], []
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for text in QUERIES:
+                text_samples = []
+                for _ in range(args.runs):
+                    with Timer() as timer:
+                        response = await client.get("/vehicles/search", params={"q": text, "limit": str(args.limit)})
+                        response.raise_for_status()
+                    text_samples.append(timer.elapsed)
+
+                baseline_samples = []
+                for _ in range(args.baseline_runs):
+                    with Timer() as timer:
+                        await client_side_search(client, text, args.limit)
+                    baseline_samples.append(timer.elapsed)
+
+                per_query[text] = {
+                    "text_search": summarize_ms(text_samples),
+                    "client_side_substring": summarize_ms(baseline_samples),
+                }
+                all_text += text_samples
+                all_baseline += baseline_samples
+        app.dependency_overrides.clear()
+
+    results = {
+        "vehicles": args.vehicles,
+        "queries": per_query,
+        "text_search": summarize_ms(all_text),
+        "client_side_substring": summarize_ms(all_baseline),
+    }
+    results["p50_speedup"] = round(
+        results["client_side_substring"]["p50_ms"] / max(results["text_search"]["p50_ms"], 1e-6), 1
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""Compare peak memory and event-loop lag for buffered vs streamed uploads.
+
+Each simulated request hands the handler a multipart part spooled to disk the
+same way Starlette does, then either reads it fully and writes it with
+``Path.write_bytes`` on the loop (the previous behaviour) or goes through
+``app.services.uploads.save_upload``. A probe task measures loop lag and a
+sampler thread tracks resident memory. No database is needed.
+
+    python -m benchmarks.bench_uploads --uploads 10 --size-mb 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from fastapi import UploadFile
+
+from app.services.uploads import UploadRejectedError, save_upload
+from benchmarks._common import percentile
+
+SPOOL_MAX_SIZE = 1024 * 1024  # Starlette's multipart spool threshold
+
+
+def current_rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class RssSampler:
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss_bytes())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.peak = current_rss_bytes()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+async def legacy_save(upload: UploadFile, destination: Path, *, max_bytes: int) -> int:
+    content = await upload.read()
+    if not content:
+        raise UploadRejectedError("Uploaded file is empty.")
+    if len(content) > max_bytes:
+        raise UploadRejectedError("Image exceeds limit.")
+    destination.write_bytes(content)
+    return len(content)
+
+
+def spooled_upload(size: int) -> UploadFile:
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    block = os.urandom(256 * 1024)
+    remaining = size
+    while remaining > 0:
+        spool.write(block[: min(len(block), remaining)])
+        remaining -= len(block)
+    spool.seek(0)
+    return UploadFile(file=spool, filename="bench.jpg")
+
+
+async def run_phase(save, uploads: int, size: int, destination_dir: Path) -> dict:
+    pending = [spooled_upload(size) for _ in range(uploads)]
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def probe():
+        interval = 0.005
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - start - interval))
+
+    async def handle(index: int, upload: UploadFile):
+        await save(upload, destination_dir / f"upload_{index}.jpg", max_bytes=size)
+        await upload.close()
+
+    baseline = current_rss_bytes()
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0.02)
+    with RssSampler() as sampler:
+        start = time.perf_counter()
+        await asyncio.gather(*(handle(index, upload) for index, upload in enumerate(pending)))
+        elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+
+    for path in destination_dir.iterdir():
+        path.unlink()
+
+    return {
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "peak_rss_delta_mb": round((sampler.peak - baseline) / (1024 * 1024), 1),
+        "loop_lag_max_ms": round(max(lags, default=0.0) * 1000, 2),
+        "loop_lag_p99_ms": round(percentile(lags, 99) * 1000, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=10, help="Concurrent uploads per phase.")
+    parser.add_argument("--size-mb", type=float, default=5.0)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1024 * 1024)
+    report = {"uploads": args.uploads, "size_mb": args.size_mb, "buffered": [], "streamed": []}
+    with tempfile.TemporaryDirectory() as directory:
+        destination_dir = Path(directory)
+        for _ in range(args.rounds):
+            report["streamed"].append(await run_phase(save_upload, args.uploads, size, destination_dir))
+            report["buffered"].append(await run_phase(legacy_save, args.uploads, size, destination_dir))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
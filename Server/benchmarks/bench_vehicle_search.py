@@ -0,0 +1,115 @@
+"""Compare the full-catalog fetch with the server-side search endpoint.
+
+Seeds a synthetic catalog into the scratch benchmark database, then issues the
+same requests the search page makes through the ASGI app and reports response
+size and latency for both strategies.
+
+    python -m benchmarks.bench_vehicle_search --vehicles 20000 --runs 50
+"""
+
+import argparse
+import asyncio
+import json
+import random
+
+import httpx
+
+from app.core.db import get_database
+from app.main import app
+from app.repositories.vehicle import VEHICLE_COLLECTION, ensure_vehicle_indexes, location_key
+from benchmarks._common import Timer, bench_database, summarize_ms
+
+TYPES = ["Sedan", "SUV", "Coupe", "Hatchback", "Convertible", "Truck"]
+FUELS = ["Petrol", "Diesel", "Electric", "Hybrid"]
+TRANSMISSIONS = ["automatic", "manual"]
+LOCATIONS = ["Colombo", "Kandy", "Galle", "Negombo", "Jaffna", "Matara", "Kurunegala"]
+BRANDS = [("Toyota", "Corolla"), ("Honda", "Civic"), ("Suzuki", "Swift"), ("Nissan", "Leaf"), ("Mitsubishi", "Montero")]
+
+
+def synthetic_vehicle(rng: random.Random, index: int) -> dict:
+    brand, model = rng.choice(BRANDS)
+    location = rng.choice(LOCATIONS)
+    return {
+        "_id": f"bench_vehicle_{index}",
+        "owner_uid": f"bench_owner_{rng.randrange(2000)}",
+        "type": rng.choice(TYPES),
+        "fuel": rng.choice(FUELS),
+        "transmission": rng.choice(TRANSMISSIONS),
+        "price": round(rng.uniform(15, 250), 2),
+        "availability": rng.random() < 0.8,
+        "location": location,
+        "location_lc": location_key(location),
+        "brand": brand,
+        "model": model,
+        "year": rng.randint(2005, 2025),
+        "seats": rng.choice([2, 4, 5, 5, 5, 7, 8]),
+        "image_urls": [f"/uploads/vehicles/bench_vehicle_{index}_{n}.jpg" for n in range(rng.randint(1, 6))],
+        "image_url": f"/uploads/vehicles/bench_vehicle_{index}_0.jpg",
+    }
+
+
+async def seed(db, count: int, seed_value: int) -> None:
+    collection = db[VEHICLE_COLLECTION]
+    if await collection.count_documents({}) == count:
+        return
+    await collection.delete_many({})
+    rng = random.Random(seed_value)
+    batch = []
+    for index in range(count):
+        batch.append(synthetic_vehicle(rng, index))
+        if len(batch) == 1000:
+            await collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+    await ensure_vehicle_indexes(db)
+
+
+async def measure(client: httpx.AsyncClient, path: str, params, runs: int, follow_cursor: bool = False) -> dict:
+    """Time `runs` fetches; with `follow_cursor` a fetch walks every page like the old full-catalog load."""
+    samples = []
+    size = 0
+    for _ in range(runs):
+        size = 0
+        cursor = None
+        with Timer() as timer:
+            while True:
+                page_params = list(params) + ([("cursor", cursor)] if cursor else [])
+                response = await client.get(path, params=page_params)
+                response.raise_for_status()
+                size += len(response.content)
+                cursor = response.json().get("next_cursor") if follow_cursor else None
+                if not cursor:
+                    break
+        samples.append(timer.elapsed)
+    return {"path": path, "params": params, "bytes": size, **summarize_ms(samples)}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    async with bench_database() as db:
+        await seed(db, args.vehicles, args.seed)
+        app.dependency_overrides[get_database] = lambda: db
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            search_params = [("type", "SUV"), ("fuel", "Diesel"), ("max_price", "120"), ("sort", "price_asc"), ("limit", "24")]
+            results = {
+                "vehicles": args.vehicles,
+                "full_catalog": await measure(client, "/vehicles", [("limit", "200")], args.runs, follow_cursor=True),
+                "search_page": await measure(client, "/vehicles/search", search_params, args.runs),
+            }
+        app.dependency_overrides.clear()
+
+    full, page = results["full_catalog"], results["search_page"]
+    results["bytes_ratio"] = round(full["bytes"] / max(page["bytes"], 1), 1)
+    results["p50_speedup"] = round(full["p50_ms"] / max(page["p50_ms"], 1e-6), 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
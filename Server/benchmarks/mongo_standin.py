@@ -0,0 +1,110 @@
+"""In-memory MongoDB stand-in with injectable latency, for load benchmarks.
+
+Builds on the test suite's ``FakeDB`` (``tests/conftest.py``), so queries and
+aggregation pipelines are evaluated exactly as in the tests, and adds what a
+throughput measurement needs:
+
+- every round trip, including reading a ``find``/``aggregate`` cursor, waits
+  ``latency`` seconds plus up to ``jitter`` seconds of seeded random delay,
+  standing in for the network and server time a real deployment pays;
+- ``insert_many`` and ``count_documents`` for seeding;
+- round trips are counted in total and per ``label()`` block, so a harness
+  can attribute them to the endpoint it is driving.
+
+Only the operations the app issues are supported, as in the tests.
+"""
+
+import asyncio
+import random
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+TESTS_DIR = Path(__file__).resolve().parents[1] / "tests"
+if str(TESTS_DIR) not in sys.path:
+    sys.path.insert(0, str(TESTS_DIR))
+
+from conftest import FakeCollection, FakeDB  # noqa: E402
+from fake_mongo import matches  # noqa: E402
+
+_label: ContextVar[str | None] = ContextVar("standin_label", default=None)
+
+
+class LatencyCursor(FakeCollection.FakeCursor):
+    def __init__(self, docs, on_fetch, delay):
+        super().__init__(docs, on_fetch=on_fetch)
+        self._delay = delay
+
+    async def _iterate(self):
+        await self._delay()
+        for doc in self._resolve():
+            yield doc
+
+    async def to_list(self, length: int):
+        await self._delay()
+        return await super().to_list(length)
+
+
+class LatencyCollection(FakeCollection):
+    async def _wait(self) -> None:
+        await self._db.delay()
+
+    def _round_trip(self) -> None:
+        self._db.count_round_trip()
+
+    def find(self, filter_q: dict = None, projection: dict = None, session=None):
+        docs = [d for d in self._store.values() if matches(d, filter_q)]
+        return LatencyCursor(docs, self._round_trip, self._db.delay)
+
+    def aggregate(self, pipeline: list, **kwargs):
+        cursor = super().aggregate(pipeline, **kwargs)
+        return LatencyCursor(cursor._docs, self._round_trip, self._db.delay)
+
+    async def insert_many(self, docs: list, ordered: bool = True, session=None):
+        # One batch is one round trip, as with the driver.
+        self._round_trip()
+        await self._wait()
+        for doc in docs:
+            doc.setdefault("_id", f"auto_{len(self._store) + 1}")
+            self._store[doc["_id"]] = dict(doc)
+        return None
+
+    async def count_documents(self, filter_q: dict, session=None) -> int:
+        self._round_trip()
+        await self._wait()
+        return sum(1 for d in self._store.values() if matches(d, filter_q))
+
+
+class LatencyDB(FakeDB):
+    def __init__(self, *, latency: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        super().__init__()
+        self.latency = latency
+        self.jitter = jitter
+        self.round_trips_by_label: dict[str, int] = {}
+        self._rng = random.Random(seed)
+
+    def __getitem__(self, name: str):
+        if name not in self._collections:
+            self._collections[name] = LatencyCollection(self)
+        return self._collections[name]
+
+    async def delay(self) -> None:
+        seconds = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        # Always yield, so concurrent requests interleave even with no latency configured.
+        await asyncio.sleep(seconds)
+
+    def count_round_trip(self) -> None:
+        self.round_trips += 1
+        label = _label.get()
+        if label is not None:
+            self.round_trips_by_label[label] = self.round_trips_by_label.get(label, 0) + 1
+
+    @contextmanager
+    def label(self, name: str):
+        """Attribute the round trips made in this block (and tasks started from it) to `name`."""
+        token = _label.set(name)
+        try:
+            yield
+        finally:
+            _label.reset(token)
@@ -1,12 +1,165 @@
+import argparse
 import asyncio
+import csv
+import json
 import os
+import sys
+import time
 from pathlib import Path
 
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.repositories.user import USER_COLLECTION  # noqa: E402
+from app.schemas.vehicles_schema import normalize_vehicle_image_url  # noqa: E402
+
+CHECKS = ("roles", "legacy_roles", "avatars", "emails")
+FIELDS = ["check", "key", "count", "detail"]
+UPLOADS_DIR = Path(__file__).resolve().parents[1] / "uploads"
+UPLOADS_PREFIX = "/uploads/"
+
+
+def build_profile_stats_pipeline() -> list:
+    """Role, legacy `role` and avatar counts for the whole collection in one server-side pass."""
+    # missing, null and "" all compare as not greater than ""; any non-empty string is greater
+    has_avatar = {"$gt": [{"$ifNull": ["$avatar_url", ""]}, ""]}
+    return [
+        {"$project": {"roles": 1, "role": 1, "avatar_url": 1}},
+        {
+            "$facet": {
+                "total": [{"$count": "count"}],
+                # a user counts once per role they hold; users without `roles` are grouped under null
+                "roles": [
+                    {"$unwind": {"path": "$roles", "preserveNullAndEmptyArrays": True}},
+                    {"$group": {"_id": "$roles", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                ],
+                "legacy_roles": [
+                    {"$match": {"role": {"$exists": True}}},
+                    {"$group": {"_id": "$role", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                ],
+                "avatars": [
+                    {"$group": {"_id": {"$cond": [has_avatar, "with_avatar_url", "missing"]}, "count": {"$sum": 1}}},
+                ],
+            }
+        },
+    ]
+
+
+def build_duplicate_email_pipeline() -> list:
+    """Emails held by more than one user, compared case-insensitively."""
+    return [
+        {"$match": {"email": {"$type": "string"}}},
+        {"$group": {"_id": {"$toLower": {"$trim": {"input": "$email"}}}, "count": {"$sum": 1}, "uids": {"$push": "$_id"}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]
+
+
+class RowWriter:
+    def __init__(self, stream, output_format: str):
+        self.stream = stream
+        self.output_format = output_format
+        if output_format == "csv":
+            self._csv = csv.DictWriter(stream, fieldnames=FIELDS)
+            self._csv.writeheader()
+
+    def write(self, check: str, key, count: int, detail: str = "") -> None:
+        row = {"check": check, "key": "" if key is None else str(key), "count": count, "detail": detail}
+        if self.output_format == "csv":
+            self._csv.writerow(row)
+        else:
+            self.stream.write(json.dumps(row) + "\n")
+
+
+class UploadIndex:
+    """Answers "does this upload exist?" from one directory listing per folder instead of a stat per user."""
+
+    def __init__(self, root: Path):
+        self.root = root.resolve()
+        self._listings: dict[Path, set[str]] = {}
+
+    def exists(self, relative: str) -> bool:
+        path = (self.root / relative).resolve()
+        if not path.is_relative_to(self.root):
+            return False
+        folder = path.parent
+        if folder not in self._listings:
+            try:
+                self._listings[folder] = {entry.name for entry in os.scandir(folder) if entry.is_file()}
+            except FileNotFoundError:
+                self._listings[folder] = set()
+        return path.name in self._listings[folder]
+
+
+def classify_avatar(url: str, uploads: UploadIndex) -> str:
+    normalized = normalize_vehicle_image_url(url) or ""
+    if not normalized.startswith(UPLOADS_PREFIX):
+        return "external"
+    return "ok" if uploads.exists(normalized[len(UPLOADS_PREFIX):]) else "dangling"
+
+
+def log(message: str) -> None:
+    # Rows go to stdout (or --output); progress stays on stderr so the report can be piped.
+    print(message, file=sys.stderr)
+
+
+async def audit_stats(users, writer: RowWriter, checks: set[str]) -> None:
+    result = await users.aggregate(build_profile_stats_pipeline(), allowDiskUse=True).to_list(length=1)
+    facets = result[0] if result else {}
+    total = (facets.get("total") or [{"count": 0}])[0]["count"]
+    writer.write("total", "users", total)
+    for check in ("roles", "legacy_roles", "avatars"):
+        if check in checks:
+            for row in facets.get(check, []):
+                writer.write(check, row["_id"], row["count"])
+
+
+async def audit_avatar_files(users, writer: RowWriter, uploads: UploadIndex, batch_size: int) -> None:
+    counts = {"ok": 0, "dangling": 0, "external": 0}
+    started = time.monotonic()
+    cursor = users.find({"avatar_url": {"$type": "string", "$ne": ""}}, {"avatar_url": 1}).sort("_id", 1)
+    async for doc in cursor.batch_size(batch_size):
+        status = classify_avatar(doc["avatar_url"], uploads)
+        counts[status] += 1
+        if status == "dangling":
+            writer.write("dangling_avatar", doc["_id"], 1, doc["avatar_url"])
+        scanned = sum(counts.values())
+        if scanned % 50_000 == 0:
+            log(f"... checked {scanned:,} avatars ({scanned / (time.monotonic() - started):,.0f} docs/s)")
+    for status, count in counts.items():
+        writer.write("avatar_files", status, count)
+    scanned = sum(counts.values())
+    elapsed = time.monotonic() - started
+    log(f"Checked {scanned:,} avatar files in {elapsed:.1f}s ({scanned / elapsed if elapsed else 0:,.0f} docs/s).")
+
+
+async def audit_duplicate_emails(users, writer: RowWriter) -> None:
+    duplicates = 0
+    async for row in users.aggregate(build_duplicate_email_pipeline(), allowDiskUse=True):
+        duplicates += 1
+        writer.write("duplicate_email", row["_id"], row["count"], " ".join(str(uid) for uid in row["uids"]))
+    writer.write("duplicate_emails", "addresses", duplicates)
+
 
 async def main() -> None:
+    parser = argparse.ArgumentParser(description="Audit every user profile: roles, legacy role fields, avatars and duplicate emails.")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson", help="Row format (default ndjson).")
+    parser.add_argument("--output", type=Path, help="Write rows to this file instead of stdout.")
+    parser.add_argument(
+        "--check",
+        action="append",
+        choices=CHECKS,
+        help="Run only this check (repeatable). Default runs all of them.",
+    )
+    parser.add_argument("--uploads-dir", type=Path, default=UPLOADS_DIR, help="Folder served at /uploads (default Server/uploads).")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per cursor batch for the avatar file check.")
+    args = parser.parse_args()
+    checks = set(args.check or CHECKS)
+
     env_path = Path(__file__).resolve().parents[1] / ".env"
     load_dotenv(env_path)
 
@@ -16,17 +169,22 @@ async def main() -> None:
         raise RuntimeError("MONGODB_URL is not set.")
 
     client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    stream = args.output.open("w", newline="") if args.output else sys.stdout
     try:
         await client.admin.command("ping")
-        db = client[db_name]
-        docs = await db["users"].find({}, {"email": 1, "avatar_url": 1, "roles": 1, "role": 1}).to_list(length=100)
-        print(f"Found {len(docs)} user documents.")
-        for doc in docs:
-            print(
-                f"- _id={doc.get('_id')} email={doc.get('email')} "
-                f"avatar_url={doc.get('avatar_url')!r} roles={doc.get('roles')!r} role={doc.get('role')!r}"
-            )
+        users = client[db_name][USER_COLLECTION]
+        writer = RowWriter(stream, args.format)
+
+        started = time.monotonic()
+        await audit_stats(users, writer, checks)
+        if "avatars" in checks:
+            await audit_avatar_files(users, writer, UploadIndex(args.uploads_dir), args.batch_size)
+        if "emails" in checks:
+            await audit_duplicate_emails(users, writer)
+        log(f"Audit finished in {time.monotonic() - started:.1f}s.")
     finally:
+        if args.output:
+            stream.close()
         client.close()
 
 
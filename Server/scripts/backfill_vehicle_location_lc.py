@@ -0,0 +1,67 @@
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.repositories.vehicle import VEHICLE_COLLECTION, ensure_vehicle_indexes, location_key  # noqa: E402
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Fill vehicles' `location_lc` search key from their `location` text.")
+    parser.add_argument("--apply", action="store_true", help="Write changes to MongoDB. Default is dry run.")
+    parser.add_argument("--overwrite", action="store_true", help="Also recompute vehicles that already have `location_lc`.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Updates sent per bulk write.")
+    args = parser.parse_args()
+
+    env_path = Path(__file__).resolve().parents[1] / ".env"
+    load_dotenv(env_path)
+
+    mongo_url = (os.getenv("MONGODB_URL") or "").strip().strip('"').strip("'")
+    db_name = os.getenv("MONGODB_DB_NAME", "AutoShare")
+    if not mongo_url:
+        raise RuntimeError("MONGODB_URL is not set.")
+
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    try:
+        await client.admin.command("ping")
+        db = client[db_name]
+        vehicles = db[VEHICLE_COLLECTION]
+
+        # Computed here with `location_key` rather than `$toLower`, so stored keys match what search queries use.
+        query = {} if args.overwrite else {"location_lc": {"$exists": False}}
+        scanned = 0
+        changed = 0
+        batch = []
+        async for doc in vehicles.find(query, {"location": 1, "location_lc": 1}):
+            scanned += 1
+            key = location_key(doc.get("location"))
+            if "location_lc" in doc and doc["location_lc"] == key:
+                continue
+            changed += 1
+            batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"location_lc": key}, "$inc": {"version": 1}}))
+            if args.apply and len(batch) >= args.batch_size:
+                await vehicles.bulk_write(batch, ordered=False)
+                batch = []
+        if args.apply and batch:
+            await vehicles.bulk_write(batch, ordered=False)
+        if args.apply:
+            await ensure_vehicle_indexes(db)
+
+        print(f"Scanned {scanned} vehicles.")
+        print(f"Updated {changed} vehicles." if args.apply else f"Would update {changed} vehicles.")
+
+        if not args.apply:
+            print("Dry run only. Re-run with --apply to update MongoDB.")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
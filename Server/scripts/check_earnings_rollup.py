@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.owner_earnings import find_earnings_rollup_discrepancies  # noqa: E402
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Check owner_earnings_monthly against a recomputation from rents.")
+    parser.add_argument("--owner", help="Only check this owner_uid.")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Allowed absolute difference in amounts.")
+    args = parser.parse_args()
+
+    env_path = Path(__file__).resolve().parents[1] / ".env"
+    load_dotenv(env_path)
+
+    mongo_url = (os.getenv("MONGODB_URL") or "").strip().strip('"').strip("'")
+    db_name = os.getenv("MONGODB_DB_NAME", "AutoShare")
+    if not mongo_url:
+        raise RuntimeError("MONGODB_URL is not set.")
+
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    try:
+        await client.admin.command("ping")
+        db = client[db_name]
+        discrepancies = await find_earnings_rollup_discrepancies(db, owner_uid=args.owner, tolerance=args.tolerance)
+
+        for item in discrepancies[:50]:
+            print(
+                f"- {item['owner_uid']} {item['bucket']}: expected {item['expected']} stored {item['stored']}"
+            )
+        if len(discrepancies) > 50:
+            print(f"... and {len(discrepancies) - 50} more.")
+
+        if discrepancies:
+            print(f"Found {len(discrepancies)} inconsistent buckets. Run rebuild_earnings_rollup.py --apply to repair.")
+            return 1
+        print("Rollup is consistent with the rents collection.")
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
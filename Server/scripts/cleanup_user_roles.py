@@ -1,11 +1,15 @@
 import argparse
 import asyncio
 import os
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from bson import json_util
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
 
 
 DEFAULT_ROLE = "user"
@@ -53,10 +57,74 @@ def canonicalize_user_doc(doc: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+CANDIDATE_QUERY = {
+    "$or": [
+        {"role": {"$exists": True}},
+        {"roles": {"$exists": True}},
+    ]
+}
+DEFAULT_CHECKPOINT = Path(__file__).resolve().parent / ".cleanup_user_roles.checkpoint.json"
+
+
+def load_checkpoint(path: Path) -> dict | None:
+    if not path.exists():
+        return None
+    # json_util keeps the `_id` type (string uid or ObjectId) across runs
+    return json_util.loads(path.read_text())
+
+
+def save_checkpoint(path: Path, state: dict) -> None:
+    # write-then-rename, so an interrupted save never leaves a truncated checkpoint
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json_util.dumps({**state, "updated_at": datetime.now(timezone.utc).isoformat()}))
+    tmp.replace(path)
+
+
+class Progress:
+    def __init__(self, total: int, every: float):
+        self.total = total
+        self.every = every
+        self.started = time.monotonic()
+        self.last_report = self.started
+
+    def rate(self, scanned: int) -> float:
+        elapsed = time.monotonic() - self.started
+        return scanned / elapsed if elapsed else 0.0
+
+    def maybe_report(self, scanned: int, changed: int, *, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self.last_report < self.every:
+            return
+        self.last_report = now
+        rate = self.rate(scanned)
+        remaining = max(0, self.total - scanned)
+        eta = f"{remaining / rate:,.0f}s" if rate else "unknown"
+        print(f"... scanned {scanned:,}/{self.total:,} ({rate:,.0f} docs/s, ETA {eta}), {changed:,} to change")
+
+
+async def throttle(started: float, scanned: int, max_rate: float | None) -> None:
+    """Sleep until `scanned` documents in this run are within `max_rate` docs/sec."""
+    if not max_rate:
+        return
+    ahead = scanned / max_rate - (time.monotonic() - started)
+    if ahead > 0:
+        await asyncio.sleep(ahead)
+
+
 async def main() -> None:
     parser = argparse.ArgumentParser(description="Normalize legacy user role fields in MongoDB.")
     parser.add_argument("--apply", action="store_true", help="Write changes to MongoDB. Default is dry run.")
-    parser.add_argument("--limit", type=int, default=50, help="Maximum number of candidate documents to inspect.")
+    parser.add_argument("--limit", type=int, help="Stop after scanning this many documents. Default is the whole collection.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Updates sent per bulk write.")
+    parser.add_argument("--max-rate", type=float, help="Scan at most this many documents per second.")
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=DEFAULT_CHECKPOINT,
+        help="File recording the last migrated _id; an --apply run resumes after it.",
+    )
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start from the first _id.")
+    parser.add_argument("--progress-every", type=float, default=5.0, help="Seconds between progress lines.")
     args = parser.parse_args()
 
     env_path = Path(__file__).resolve().parents[1] / ".env"
@@ -73,50 +141,101 @@ async def main() -> None:
         db = client[db_name]
         users = db["users"]
 
-        query = {
-            "$or": [
-                {"role": {"$exists": True}},
-                {"roles": {"$exists": True}},
-            ]
-        }
-        docs = await users.find(query).limit(args.limit).to_list(length=args.limit)
-
-        changed = []
+        # Only --apply runs record progress, so only they resume; a dry run always scans from the start.
+        checkpoint = None if args.restart or not args.apply else load_checkpoint(args.checkpoint)
+        totals = {"scanned": 0, "changed": 0}
+        query = CANDIDATE_QUERY
+        if checkpoint:
+            totals = {"scanned": checkpoint["scanned"], "changed": checkpoint["changed"]}
+            query = {"$and": [CANDIDATE_QUERY, {"_id": {"$gt": checkpoint["last_id"]}}]}
+            print(f"Resuming after _id={checkpoint['last_id']!r} ({totals['scanned']:,} documents already scanned).")
+
+        remaining = await users.count_documents(query)
+        if args.limit:
+            remaining = min(remaining, args.limit)
+        progress = Progress(remaining, args.progress_every)
+
+        scanned = 0
+        changed = 0
         unchanged = 0
-        for doc in docs:
+        samples = []
+        batch: list[UpdateOne] = []
+        last_id = None
+
+        async def flush() -> None:
+            # The checkpoint only moves past documents whose updates were acknowledged.
+            nonlocal batch
+            if args.apply and batch:
+                await users.bulk_write(batch, ordered=False)
+            batch = []
+            if args.apply and last_id is not None:
+                save_checkpoint(
+                    args.checkpoint,
+                    {
+                        "last_id": last_id,
+                        "scanned": totals["scanned"] + scanned,
+                        "changed": totals["changed"] + changed,
+                    },
+                )
+
+        # Walking `_id` in order is what makes the checkpoint a resume point.
+        cursor = users.find(query, {"role": 1, "roles": 1}).sort("_id", 1).batch_size(args.batch_size)
+        if args.limit:
+            cursor = cursor.limit(args.limit)
+        async for doc in cursor:
+            scanned += 1
+            last_id = doc["_id"]
             desired = canonicalize_user_doc(doc)
             current_roles = doc.get("roles")
             if current_roles != desired["roles"] or "role" in doc:
-                changed.append(
-                    {
-                        "_id": doc.get("_id"),
-                        "before_role": doc.get("role"),
-                        "before_roles": doc.get("roles"),
-                        "after_roles": desired["roles"],
-                    }
-                )
-                if args.apply:
-                    await users.update_one(
+                changed += 1
+                if len(samples) < 20:
+                    samples.append(
+                        {
+                            "_id": doc.get("_id"),
+                            "before_role": doc.get("role"),
+                            "before_roles": doc.get("roles"),
+                            "after_roles": desired["roles"],
+                        }
+                    )
+                batch.append(
+                    UpdateOne(
                         {"_id": doc["_id"]},
                         {
                             "$set": desired,
                             "$unset": {"role": ""},
+                            "$inc": {"version": 1},
                         },
                     )
+                )
             else:
                 unchanged += 1
 
-        print(f"Scanned {len(docs)} user documents (limit={args.limit}).")
-        print(f"Would change {len(changed)} documents." if not args.apply else f"Changed {len(changed)} documents.")
-        print(f"Unchanged {unchanged} documents.")
-
-        for item in changed[:20]:
+            if scanned % args.batch_size == 0:
+                await flush()
+                progress.maybe_report(scanned, changed)
+                await throttle(progress.started, scanned, args.max_rate)
+
+        await flush()
+        progress.maybe_report(scanned, changed, force=True)
+        if args.apply and args.checkpoint.exists() and not args.limit:
+            # A complete pass leaves nothing to resume.
+            args.checkpoint.unlink()
+
+        elapsed = time.monotonic() - progress.started
+        print(f"Scanned {scanned:,} user documents in {elapsed:.1f}s ({progress.rate(scanned):,.0f} docs/s).")
+        print(f"Would change {changed:,} documents." if not args.apply else f"Changed {changed:,} documents.")
+        print(f"Unchanged {unchanged:,} documents.")
+        if checkpoint:
+            print(f"Including earlier runs: scanned {totals['scanned'] + scanned:,}, changed {totals['changed'] + changed:,}.")
+
+        for item in samples:
             print(
                 f"- {item['_id']}: role={item['before_role']!r}, roles={item['before_roles']!r} -> roles={item['after_roles']!r}"
             )
 
-        if len(changed) > 20:
-            print(f"... and {len(changed) - 20} more.")
+        if changed > len(samples):
+            print(f"... and {changed - len(samples):,} more.")
 
         if not args.apply:
             print("Dry run only. Re-run with --apply to update MongoDB.")
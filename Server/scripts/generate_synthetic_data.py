@@ -0,0 +1,334 @@
+import argparse
+import asyncio
+import bisect
+import itertools
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.repositories.earnings_rollup import EARNINGS_ROLLUP_COLLECTION  # noqa: E402
+from app.repositories.registry import ensure_all_indexes  # noqa: E402
+from app.repositories.rent import BLOCKING_RENT_STATUSES, RENT_COLLECTION  # noqa: E402
+from app.repositories.user import USER_COLLECTION  # noqa: E402
+from app.repositories.vehicle import VEHICLE_COLLECTION, location_key  # noqa: E402
+from app.repositories.vehicle_calendar import VEHICLE_CALENDAR_COLLECTION  # noqa: E402
+from app.schemas import RentBase, UserProfileBase, VehicleBase  # noqa: E402
+from app.schemas.users_schema import UserRole  # noqa: E402
+from app.services.geocoding import LOCATION_COORDINATES  # noqa: E402
+from app.services.owner_earnings import rent_earning  # noqa: E402
+
+USER_PREFIX = "synth_user_"
+FIRST_NAMES = ["Nimal", "Kamal", "Sunil", "Amaya", "Dilini", "Kasun", "Tharindu", "Ishara", "Ruwan", "Sachini"]
+LAST_NAMES = ["Perera", "Silva", "Fernando", "Jayasinghe", "Bandara", "Wijesinghe", "Dissanayake", "Gunawardena"]
+VEHICLE_MODELS = {
+    "Sedan": [("Toyota", "Corolla"), ("Honda", "Civic"), ("Toyota", "Premio"), ("Nissan", "Sylphy")],
+    "SUV": [("Toyota", "Land Cruiser"), ("Mitsubishi", "Montero"), ("Honda", "Vezel"), ("Kia", "Sportage")],
+    "Hatchback": [("Suzuki", "Swift"), ("Toyota", "Aqua"), ("Nissan", "Leaf"), ("Honda", "Fit")],
+    "Van": [("Toyota", "HiAce"), ("Nissan", "Caravan"), ("Suzuki", "Every")],
+    "Coupe": [("BMW", "M4"), ("Toyota", "GR86")],
+    "Truck": [("Isuzu", "D-Max"), ("Toyota", "Hilux")],
+}
+# Relative frequency of each type in the catalog, and its (seats, base daily price).
+VEHICLE_TYPES = {"Sedan": (30, 5, 45), "SUV": (20, 7, 90), "Hatchback": (30, 5, 30), "Van": (10, 8, 70), "Coupe": (4, 4, 150), "Truck": (6, 5, 80)}
+FUELS = {"Sedan": ["Petrol", "Hybrid"], "SUV": ["Diesel", "Petrol", "Hybrid"], "Hatchback": ["Petrol", "Hybrid", "Electric"]}
+LOCATIONS = sorted(name.title() for name in LOCATION_COORDINATES)
+
+# Middle five bytes of the generated ObjectIds; the leading four are the creation time.
+VEHICLE_ID_TAG = b"synvh"
+RENT_ID_TAG = b"synrt"
+
+
+def synthetic_object_id(created: datetime, tag: bytes, index: int) -> ObjectId:
+    """Time-ordered like a driver-generated id, but reproducible for a given seed."""
+    return ObjectId(int(created.timestamp()).to_bytes(4, "big") + tag + (index % (1 << 24)).to_bytes(3, "big"))
+
+
+def zipf_cumulative_weights(count: int, skew: float) -> list[float]:
+    """Cumulative weights where the item of rank r gets 1 / (r + 1) ** skew; skew 0 is uniform."""
+    return list(itertools.accumulate(1 / (rank + 1) ** skew for rank in range(count)))
+
+
+def skewed_pick(rng: random.Random, cumulative: list[float]) -> int:
+    return bisect.bisect_left(cumulative, rng.random() * cumulative[-1])
+
+
+def synthetic_user(rng: random.Random, index: int, *, owner: bool, legacy_role_share: float, avatar_share: float) -> dict:
+    uid = f"{USER_PREFIX}{index}"
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    doc = {
+        "_id": uid,
+        "email": f"{first.lower()}.{last.lower()}.{index}@example.com",
+        "full_name": f"{first} {last}",
+        "address": f"{rng.randint(1, 400)} Galle Road, {rng.choice(LOCATIONS)}",
+        "nic": f"{rng.randint(195000000, 200599999)}V",
+        "phone": f"+9477{rng.randint(0, 9999999):07d}",
+        "version": 1,
+    }
+    roles = [UserRole.VEHICLE_OWNER.value] if owner else [UserRole.RENTER.value]
+    if owner and rng.random() < 0.3:
+        roles.append(UserRole.RENTER.value)
+    if rng.random() < legacy_role_share:
+        # documents written before `roles` existed kept a single `role`; scripts/cleanup_user_roles.py migrates them
+        doc["role"] = roles[0]
+    else:
+        doc["roles"] = roles
+    if rng.random() < avatar_share:
+        doc["avatar_url"] = f"/uploads/{uid}_{rng.getrandbits(64):016x}.jpg"
+    return doc
+
+
+def synthetic_vehicle(rng: random.Random, index: int, *, owner_uid: str, created: datetime, now: datetime) -> dict:
+    vehicle_type = rng.choices(list(VEHICLE_TYPES), weights=[spec[0] for spec in VEHICLE_TYPES.values()])[0]
+    _, seats, base_price = VEHICLE_TYPES[vehicle_type]
+    brand, model = rng.choice(VEHICLE_MODELS[vehicle_type])
+    location = rng.choice(LOCATIONS)
+    _id = synthetic_object_id(created, VEHICLE_ID_TAG, index)
+    # galleries are mostly small, with a long tail of fully photographed listings
+    gallery = [f"/uploads/vehicles/{_id}_{n}.jpg" for n in range(min(12, 1 + int(rng.expovariate(1 / 3))))]
+    return {
+        "_id": _id,
+        "owner_uid": owner_uid,
+        "type": vehicle_type,
+        "fuel": rng.choice(FUELS.get(vehicle_type, ["Petrol", "Diesel"])),
+        "transmission": "automatic" if rng.random() < 0.7 else "manual",
+        "price": round(base_price * rng.lognormvariate(0, 0.35), 2),
+        "availability": True,
+        "location": location,
+        "location_lc": location_key(location),
+        "geo": {"type": "Point", "coordinates": list(LOCATION_COORDINATES[location.lower()])},
+        "brand": brand,
+        "model": model,
+        "year": now.year - min(20, int(rng.expovariate(1 / 6))),
+        "seats": seats,
+        "image_urls": gallery,
+        "image_url": gallery[0],
+        "version": 1,
+    }
+
+
+def rent_status(rng: random.Random, start: datetime, end: datetime, now: datetime) -> str:
+    if end <= now:
+        return "completed" if rng.random() < 0.85 else "cancelled"
+    if start <= now:
+        return "accepted"
+    return rng.choices(["pending", "accepted", "cancelled"], weights=[40, 50, 10])[0]
+
+
+class RentGenerator:
+    """Streams rents with skewed vehicle popularity and no overlapping bookings on a vehicle."""
+
+    def __init__(self, rng, vehicles, renters, *, vehicle_skew, now, days_back, days_ahead):
+        self.rng = rng
+        self.vehicles = vehicles
+        self.renters = renters
+        self.popularity = zipf_cumulative_weights(len(vehicles), vehicle_skew)
+        # popularity is by rank, so shuffle which vehicles are the popular ones
+        self.rank_to_vehicle = list(range(len(vehicles)))
+        rng.shuffle(self.rank_to_vehicle)
+        self.now = now
+        self.days_back = days_back
+        self.days_ahead = days_ahead
+        # vehicle index -> [(start, end, rent_id)] of pending/accepted rents, for the calendars
+        self.slots: dict[int, list] = {}
+
+    def _overlaps(self, vehicle_index: int, start: datetime, end: datetime) -> bool:
+        return any(s < end and e > start for s, e, _ in self.slots.get(vehicle_index, ()))
+
+    def rents(self, count: int):
+        rng = self.rng
+        span = self.days_back + self.days_ahead
+        for index in range(count):
+            vehicle_index = self.rank_to_vehicle[skewed_pick(rng, self.popularity)]
+            vehicle = self.vehicles[vehicle_index]
+            # bookings grow over time, so recent dates are more common than old ones
+            start = self.now - timedelta(days=self.days_back) + timedelta(hours=int(rng.betavariate(2, 1) * span * 24))
+            end = start + timedelta(days=min(30, 1 + int(rng.expovariate(1 / 3))))
+            created = start - timedelta(days=min(60, int(rng.expovariate(1 / 7))))
+            status = rent_status(rng, start, end, self.now)
+            if status in BLOCKING_RENT_STATUSES and self._overlaps(vehicle_index, start, end):
+                status = "cancelled"
+            _id = synthetic_object_id(created, RENT_ID_TAG, index)
+            doc = {
+                "_id": _id,
+                "vehicle_id": str(vehicle["_id"]),
+                "renter_uid": rng.choice(self.renters),
+                "owner_uid": vehicle["owner_uid"],
+                "start_date": start,
+                "end_date": end,
+                "booking_status": status,
+                "pickup_option": "delivery" if rng.random() < 0.2 else "self_pickup",
+                "delivery_address": None,
+                "insurance_plan": rng.choices(["basic", "standard", "premium"], weights=[60, 30, 10])[0],
+                "child_seat_count": 1 if rng.random() < 0.1 else 0,
+                "note": None,
+                "version": 1,
+            }
+            if doc["pickup_option"] == "delivery":
+                doc["delivery_address"] = f"{rng.randint(1, 400)} Main Street, {vehicle['location']}"
+            if status in BLOCKING_RENT_STATUSES:
+                self.slots.setdefault(vehicle_index, []).append((start, end, str(_id)))
+            elif status == "completed":
+                earning = rent_earning(doc, vehicle["price"])
+                if earning:
+                    doc["earned_amount"] = earning[0]
+            yield doc
+
+    def calendars(self):
+        for vehicle_index, slots in self.slots.items():
+            yield {
+                "_id": str(self.vehicles[vehicle_index]["_id"]),
+                "slots": [{"rent_id": rent_id, "start_date": s, "end_date": e} for s, e, rent_id in slots],
+            }
+
+
+def batched(docs, size: int):
+    iterator = iter(docs)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+async def insert_stream(collection, docs, *, batch_size: int, apply: bool, model=None) -> dict:
+    """Insert `docs` in batches, building the next batch while the previous insert is in flight.
+
+    The first document is checked against `model`, so a generator that drifts
+    from the API schemas fails before anything is written.
+    """
+    started = time.perf_counter()
+    written = 0
+    pending = None
+    for batch in batched(docs, batch_size):
+        if model is not None and not written:
+            model.model_validate(batch[0])
+        if apply:
+            if pending is not None:
+                await pending
+            pending = asyncio.ensure_future(collection.insert_many(list(batch), ordered=False))
+        written += len(batch)
+    if pending is not None:
+        await pending
+    elapsed = time.perf_counter() - started
+    return {"docs": written, "seconds": elapsed, "docs_per_sec": written / elapsed if elapsed else 0.0}
+
+
+def report(name: str, stats: dict, apply: bool) -> None:
+    verb = "Inserted" if apply else "Generated"
+    print(f"{verb} {stats['docs']} {name} in {stats['seconds']:.1f}s ({stats['docs_per_sec']:,.0f} docs/s).")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Stream reproducible synthetic users, vehicles and rents into a scratch database."
+    )
+    parser.add_argument("--apply", action="store_true", help="Insert into MongoDB. Default only generates and times the documents.")
+    parser.add_argument("--db-name", default=os.getenv("BENCH_DB_NAME", "AutoShareBench"), help="Target database (default BENCH_DB_NAME or AutoShareBench).")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--vehicles", type=int, default=50_000)
+    parser.add_argument("--rents", type=int, default=2_000_000)
+    parser.add_argument("--owner-share", type=float, default=0.1, help="Fraction of users who list vehicles.")
+    parser.add_argument("--owner-skew", type=float, default=1.0, help="Zipf exponent of vehicles per owner; 0 spreads them evenly.")
+    parser.add_argument("--vehicle-skew", type=float, default=0.5, help="Zipf exponent of rents per vehicle; 0 spreads them evenly.")
+    parser.add_argument("--legacy-role-share", type=float, default=0.02, help="Fraction of users stored with the legacy `role` field.")
+    parser.add_argument("--avatar-share", type=float, default=0.4, help="Fraction of users with an `avatar_url`.")
+    parser.add_argument("--days-back", type=int, default=730, help="How far into the past rents start.")
+    parser.add_argument("--days-ahead", type=int, default=90, help="How far into the future rents are booked.")
+    parser.add_argument("--now", type=datetime.fromisoformat, help="Reference date for rent statuses (default: today, midnight UTC).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per insert_many.")
+    parser.add_argument("--reset", action="store_true", help="Drop the generated collections in the target database first.")
+    args = parser.parse_args()
+
+    now = args.now or datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    now = now if now.tzinfo else now.replace(tzinfo=timezone.utc)
+
+    env_path = Path(__file__).resolve().parents[1] / ".env"
+    load_dotenv(env_path)
+
+    if args.db_name == os.getenv("MONGODB_DB_NAME", "AutoShare"):
+        raise SystemExit(f"Refusing to generate into the application database {args.db_name!r}; pass another --db-name.")
+
+    client = None
+    db = None
+    if args.apply:
+        mongo_url = (os.getenv("MONGODB_URL") or "").strip().strip('"').strip("'")
+        if not mongo_url:
+            raise RuntimeError("MONGODB_URL is not set.")
+        client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+        await client.admin.command("ping")
+        db = client[args.db_name]
+
+    try:
+        collections = [USER_COLLECTION, VEHICLE_COLLECTION, RENT_COLLECTION, VEHICLE_CALENDAR_COLLECTION, EARNINGS_ROLLUP_COLLECTION]
+        if db is not None:
+            existing = set(await db.list_collection_names())
+            if args.reset:
+                for name in collections:
+                    await db.drop_collection(name)
+            elif existing & set(collections):
+                raise SystemExit(f"{args.db_name!r} already holds {sorted(existing & set(collections))}; pass --reset to replace them.")
+
+        rng = random.Random(args.seed)
+        owner_count = max(1, int(args.users * args.owner_share))
+        owner_uids = [f"{USER_PREFIX}{index}" for index in range(owner_count)]
+        renter_uids = [f"{USER_PREFIX}{index}" for index in range(owner_count, args.users)] or owner_uids
+
+        def users():
+            for index in range(args.users):
+                yield synthetic_user(
+                    rng, index, owner=index < owner_count, legacy_role_share=args.legacy_role_share, avatar_share=args.avatar_share
+                )
+
+        # Vehicles are kept in memory (one small dict each) so rents can reference their owner, price and location.
+        ownership = zipf_cumulative_weights(owner_count, args.owner_skew)
+        catalog = [
+            synthetic_vehicle(
+                rng,
+                index,
+                owner_uid=owner_uids[skewed_pick(rng, ownership)],
+                now=now,
+                created=now - timedelta(days=args.days_back + 30) + timedelta(minutes=rng.randrange((args.days_back + 30) * 1440)),
+            )
+            for index in range(args.vehicles)
+        ]
+        rents = RentGenerator(
+            rng, catalog, renter_uids, vehicle_skew=args.vehicle_skew, now=now, days_back=args.days_back, days_ahead=args.days_ahead
+        )
+
+        target = (lambda name: db[name]) if db is not None else (lambda name: None)
+        totals = {"docs": 0, "seconds": 0.0}
+        for name, docs, model in (
+            (USER_COLLECTION, users(), UserProfileBase),
+            (VEHICLE_COLLECTION, iter(catalog), VehicleBase),
+            (RENT_COLLECTION, rents.rents(args.rents), RentBase),
+            (VEHICLE_CALENDAR_COLLECTION, rents.calendars(), None),
+        ):
+            stats = await insert_stream(target(name), docs, batch_size=args.batch_size, apply=args.apply, model=model)
+            report(name, stats, args.apply)
+            totals["docs"] += stats["docs"]
+            totals["seconds"] += stats["seconds"]
+
+        totals["docs_per_sec"] = totals["docs"] / totals["seconds"] if totals["seconds"] else 0.0
+        report("documents in total", totals, args.apply)
+
+        if db is not None:
+            started = time.perf_counter()
+            await ensure_all_indexes(db)
+            print(f"Built indexes in {time.perf_counter() - started:.1f}s.")
+            print("Run scripts/rebuild_earnings_rollup.py --apply to backfill the owner earnings rollup.")
+        else:
+            print("Dry run only. Re-run with --apply to insert into MongoDB.")
+    finally:
+        if client is not None:
+            client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.repositories.vehicle import VEHICLE_COLLECTION, ensure_vehicle_indexes  # noqa: E402
+from app.services.geocoding import LOCATION_COORDINATES, geocode_location, load_location_table  # noqa: E402
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Fill vehicles' GeoJSON `geo` point from their `location` text.")
+    parser.add_argument("--apply", action="store_true", help="Write changes to MongoDB. Default is dry run.")
+    parser.add_argument(
+        "--table",
+        help='JSON file of {"place name": [longitude, latitude]} to use instead of the built-in table.',
+    )
+    parser.add_argument("--overwrite", action="store_true", help="Also re-geocode vehicles that already have `geo`.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Updates sent per bulk write.")
+    args = parser.parse_args()
+
+    table = load_location_table(args.table) if args.table else LOCATION_COORDINATES
+
+    env_path = Path(__file__).resolve().parents[1] / ".env"
+    load_dotenv(env_path)
+
+    mongo_url = (os.getenv("MONGODB_URL") or "").strip().strip('"').strip("'")
+    db_name = os.getenv("MONGODB_DB_NAME", "AutoShare")
+    if not mongo_url:
+        raise RuntimeError("MONGODB_URL is not set.")
+
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    try:
+        await client.admin.command("ping")
+        db = client[db_name]
+        vehicles = db[VEHICLE_COLLECTION]
+
+        # `geo: None` matches both a missing field and an explicit null.
+        query = {} if args.overwrite else {"geo": None}
+        scanned = 0
+        geocoded = 0
+        unmatched: Counter = Counter()
+        batch = []
+        async for doc in vehicles.find(query, {"location": 1}):
+            scanned += 1
+            point = geocode_location(doc.get("location"), table)
+            if point is None:
+                unmatched[doc.get("location") or "<empty>"] += 1
+                continue
+            geocoded += 1
+            batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"geo": point}, "$inc": {"version": 1}}))
+            if args.apply and len(batch) >= args.batch_size:
+                await vehicles.bulk_write(batch, ordered=False)
+                batch = []
+        if args.apply and batch:
+            await vehicles.bulk_write(batch, ordered=False)
+        if args.apply:
+            await ensure_vehicle_indexes(db)
+
+        print(f"Scanned {scanned} vehicles.")
+        print(f"Geocoded {geocoded} vehicles." if args.apply else f"Would geocode {geocoded} vehicles.")
+        print(f"No match for {sum(unmatched.values())} vehicles.")
+        for location, count in unmatched.most_common(20):
+            print(f"- {location!r}: {count}")
+
+        if not args.apply:
+            print("Dry run only. Re-run with --apply to update MongoDB.")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
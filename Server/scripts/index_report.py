@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.repositories.base import QueryShape  # noqa: E402
+from app.repositories.registry import ensure_all_indexes, index_report  # noqa: E402
+from app.repositories.rent import RENT_COLLECTION  # noqa: E402
+from app.services.owner_earnings import (  # noqa: E402
+    build_monthly_earnings_pipeline,
+    build_owner_earnings_pipeline,
+    build_recent_transactions_pipeline,
+)
+
+
+def service_query_shapes() -> dict:
+    """Aggregations issued by services rather than repositories."""
+    now = datetime.now(timezone.utc)
+    return {
+        RENT_COLLECTION: [
+            QueryShape("earnings_overview_pipeline", pipeline=build_owner_earnings_pipeline(owner_uid="owner_1", now=now)),
+            QueryShape("recent_transactions_pipeline", pipeline=build_recent_transactions_pipeline(owner_uid="owner_1")),
+            QueryShape("monthly_earnings_pipeline", pipeline=build_monthly_earnings_pipeline(owner_uid="owner_1")),
+        ]
+    }
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Explain every repository query shape and flag collection scans.")
+    parser.add_argument("--ensure", action="store_true", help="Create the declared indexes before explaining.")
+    parser.add_argument(
+        "--execution-stats",
+        action="store_true",
+        help="Run the queries (explain executionStats) to report keys/docs examined.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    env_path = Path(__file__).resolve().parents[1] / ".env"
+    load_dotenv(env_path)
+
+    mongo_url = (os.getenv("MONGODB_URL") or "").strip().strip('"').strip("'")
+    db_name = os.getenv("MONGODB_DB_NAME", "AutoShare")
+    if not mongo_url:
+        raise RuntimeError("MONGODB_URL is not set.")
+
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    try:
+        await client.admin.command("ping")
+        db = client[db_name]
+        if args.ensure:
+            created = await ensure_all_indexes(db)
+            for collection_name, names in created.items():
+                print(f"Ensured {collection_name}: {', '.join(names) or '(none declared)'}")
+
+        rows = await index_report(
+            db,
+            extra_shapes=service_query_shapes(),
+            verbosity="executionStats" if args.execution_stats else "queryPlanner",
+        )
+    finally:
+        client.close()
+
+    unindexed = [row for row in rows if row["collection_scan"]]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        for row in rows:
+            status = "COLLSCAN" if row["collection_scan"] else ("SORT" if row["in_memory_sort"] else "ok")
+            line = f"{status:<9} {row['collection']}.{row['shape']}  indexes={','.join(row['indexes']) or '-'}"
+            if row["docs_examined"] is not None:
+                line += f"  keys={row['keys_examined']} docs={row['docs_examined']} returned={row['returned']}"
+            print(line)
+        print(f"{len(rows)} query shapes, {len(unindexed)} not index-backed.")
+    return 1 if unindexed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.repositories.ids import MIXED_POLICY, migrate_string_object_ids  # noqa: E402
+from app.repositories.rent import RENT_COLLECTION  # noqa: E402
+from app.repositories.vehicle import VEHICLE_COLLECTION  # noqa: E402
+
+# Collections whose repositories use the ObjectId id policy.
+OBJECT_ID_COLLECTIONS = [VEHICLE_COLLECTION, RENT_COLLECTION]
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Convert string `_id`s holding ObjectId hex into real ObjectIds, so lookups need one query."
+    )
+    parser.add_argument("--apply", action="store_true", help="Write changes to MongoDB. Default is dry run.")
+    parser.add_argument(
+        "--collection",
+        action="append",
+        choices=OBJECT_ID_COLLECTIONS,
+        help="Collection to migrate (repeatable). Defaults to every ObjectId-keyed collection.",
+    )
+    parser.add_argument("--batch-size", type=int, default=500, help="Documents re-keyed per bulk write.")
+    args = parser.parse_args()
+
+    env_path = Path(__file__).resolve().parents[1] / ".env"
+    load_dotenv(env_path)
+
+    mongo_url = (os.getenv("MONGODB_URL") or "").strip().strip('"').strip("'")
+    db_name = os.getenv("MONGODB_DB_NAME", "AutoShare")
+    if not mongo_url:
+        raise RuntimeError("MONGODB_URL is not set.")
+
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    try:
+        await client.admin.command("ping")
+        db = client[db_name]
+
+        conflicts = 0
+        for name in args.collection or OBJECT_ID_COLLECTIONS:
+            summary = await migrate_string_object_ids(
+                db, collection_name=name, apply=args.apply, batch_size=args.batch_size
+            )
+            verb = "Migrated" if args.apply else "Would migrate"
+            print(f"{name}: {verb} {summary['migrated']} of {summary['scanned']} string ObjectId ids.")
+            for _id in summary["conflicts"][:20]:
+                print(f"- {_id}: an ObjectId-keyed document with the same value already exists; left as is.")
+            conflicts += len(summary["conflicts"])
+
+        if not args.apply:
+            print("Dry run only. Re-run with --apply to update MongoDB.")
+        elif conflicts:
+            print(
+                f"{conflicts} conflicting ids need manual review; keep their collections on the "
+                f"{MIXED_POLICY!r} id policy (MONGO_ID_POLICY_OVERRIDES) until resolved."
+            )
+        return 1 if conflicts else 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
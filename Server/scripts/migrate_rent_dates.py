@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.repositories.rent import RENT_COLLECTION  # noqa: E402
+
+DATE_FIELDS = ("start_date", "end_date")
+
+
+def parse_date(value: str) -> datetime | None:
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert rents' ISO-string `start_date`/`end_date` into BSON dates.")
+    parser.add_argument("--apply", action="store_true", help="Write changes to MongoDB. Default is dry run.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Updates sent per bulk write.")
+    args = parser.parse_args()
+
+    env_path = Path(__file__).resolve().parents[1] / ".env"
+    load_dotenv(env_path)
+
+    mongo_url = (os.getenv("MONGODB_URL") or "").strip().strip('"').strip("'")
+    db_name = os.getenv("MONGODB_DB_NAME", "AutoShare")
+    if not mongo_url:
+        raise RuntimeError("MONGODB_URL is not set.")
+
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    try:
+        await client.admin.command("ping")
+        rents = client[db_name][RENT_COLLECTION]
+
+        # Range queries and the owner_recent/vehicle_interval index order compare BSON dates only;
+        # a string date sorts before every date and never matches a date range.
+        query = {"$or": [{field: {"$type": "string"}} for field in DATE_FIELDS]}
+        scanned = 0
+        changed = 0
+        unparseable = []
+        batch = []
+        async for doc in rents.find(query, {field: 1 for field in DATE_FIELDS}):
+            scanned += 1
+            updates = {}
+            for field in DATE_FIELDS:
+                value = doc.get(field)
+                if not isinstance(value, str):
+                    continue
+                parsed = parse_date(value)
+                if parsed is None:
+                    unparseable.append((doc["_id"], field, value))
+                else:
+                    updates[field] = parsed
+            if not updates:
+                continue
+            changed += 1
+            # only if the strings are still the ones read, so a concurrent reschedule is not overwritten
+            guard = {"_id": doc["_id"], **{field: doc[field] for field in updates}}
+            batch.append(UpdateOne(guard, {"$set": updates, "$inc": {"version": 1}}))
+            if args.apply and len(batch) >= args.batch_size:
+                await rents.bulk_write(batch, ordered=False)
+                batch = []
+        if args.apply and batch:
+            await rents.bulk_write(batch, ordered=False)
+
+        print(f"Scanned {scanned} rents with string dates.")
+        print(f"Converted {changed} rents." if args.apply else f"Would convert {changed} rents.")
+        for _id, field, value in unparseable[:20]:
+            print(f"- {_id}: {field} {value!r} is not an ISO date; left as is.")
+        if len(unparseable) > 20:
+            print(f"... and {len(unparseable) - 20} more unparseable dates.")
+
+        if not args.apply:
+            print("Dry run only. Re-run with --apply to update MongoDB.")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.repositories.earnings_rollup import (  # noqa: E402
+    EARNINGS_ROLLUP_COLLECTION,
+    ensure_earnings_rollup_indexes,
+    replace_owner_earnings,
+)
+from app.services.owner_earnings import compute_expected_rollups  # noqa: E402
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the owner_earnings_monthly rollup from the rents collection.")
+    parser.add_argument("--apply", action="store_true", help="Write the rebuilt rollup to MongoDB. Default is dry run.")
+    parser.add_argument("--owner", help="Only rebuild this owner_uid.")
+    args = parser.parse_args()
+
+    env_path = Path(__file__).resolve().parents[1] / ".env"
+    load_dotenv(env_path)
+
+    mongo_url = (os.getenv("MONGODB_URL") or "").strip().strip('"').strip("'")
+    db_name = os.getenv("MONGODB_DB_NAME", "AutoShare")
+    if not mongo_url:
+        raise RuntimeError("MONGODB_URL is not set.")
+
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    try:
+        await client.admin.command("ping")
+        db = client[db_name]
+
+        expected = await compute_expected_rollups(db, owner_uid=args.owner)
+        # Owners that still have rollup documents but no completed rents must be reset to zero.
+        query = {"owner_uid": args.owner} if args.owner else {}
+        stale_owners = set(await db[EARNINGS_ROLLUP_COLLECTION].distinct("owner_uid", query)) - set(expected)
+        if args.owner and args.owner not in expected:
+            stale_owners.add(args.owner)
+
+        months = sum(len(buckets) for buckets in expected.values())
+        print(f"Computed {months} monthly buckets for {len(expected)} owners; {len(stale_owners)} owners to reset.")
+
+        if not args.apply:
+            print("Dry run only. Re-run with --apply to update MongoDB.")
+            return
+
+        await ensure_earnings_rollup_indexes(db)
+        for index, owner_uid in enumerate(sorted(expected) + sorted(stale_owners), start=1):
+            await replace_owner_earnings(db, owner_uid=owner_uid, months=expected.get(owner_uid, {}))
+            if index % 500 == 0:
+                print(f"... rebuilt {index} owners")
+        print(f"Rebuilt rollup for {len(expected) + len(stale_owners)} owners.")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
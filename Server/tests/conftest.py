@@ -1,12 +1,19 @@
+import asyncio
+import copy
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
 import os
 import sys
 import pytest
+from pymongo.errors import DuplicateKeyError
 
 # Ensure the `Server` package directory is on sys.path so tests can import `app`
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
+from fake_mongo import matches, run_pipeline, sort_docs
+
 
 class FakeInsertOneResult:
     def __init__(self, inserted_id):
@@ -14,8 +21,10 @@ class FakeInsertOneResult:
 
 
 class FakeUpdateResult:
-    def __init__(self, matched_count: int):
+    def __init__(self, matched_count: int, upserted_id=None):
         self.matched_count = matched_count
+        self.modified_count = matched_count
+        self.upserted_id = upserted_id
 
 
 class FakeDeleteResult:
@@ -23,73 +32,311 @@ class FakeDeleteResult:
         self.deleted_count = deleted_count
 
 
-class FakeCollection:
+class FakeBulkWriteResult:
     def __init__(self):
+        self.inserted_count = 0
+        self.matched_count = 0
+        self.modified_count = 0
+        self.deleted_count = 0
+        self.upserted_count = 0
+
+
+class FakeCollection:
+    def __init__(self, db=None):
+        self._db = db
         self._store = {}
+        self.indexes = []
+        # field -> weight of the collection's text index, once one is created
+        self.text_weights = None
+
+    def _round_trip(self) -> None:
+        if self._db is not None:
+            self._db.round_trips += 1
+
+    async def _wait(self) -> None:
+        # let other tasks run, as they would while a real request is on the wire
+        if self._db is not None and self._db.interleave:
+            await asyncio.sleep(0)
 
     class FakeCursor:
-        def __init__(self, docs):
+        def __init__(self, docs, on_fetch=None):
             self._docs = docs
+            self._on_fetch = on_fetch
+            self._sort = []
+            self._skip = 0
+            self._limit = 0
+
+        def sort(self, key_or_list, direction=None):
+            if isinstance(key_or_list, str):
+                key_or_list = [(key_or_list, direction or 1)]
+            self._sort = list(key_or_list)
+            return self
+
+        def skip(self, count: int):
+            self._skip = count
+            return self
+
+        def limit(self, count: int):
+            self._limit = count
+            return self
+
+        def _resolve(self) -> list:
+            # a cursor costs one round trip when it is actually read
+            if self._on_fetch is not None:
+                self._on_fetch()
+            # hand out copies, as a real driver would, so callers can't mutate the store
+            docs = sort_docs(copy.deepcopy(self._docs), self._sort)
+            docs = docs[self._skip:]
+            if self._limit:
+                docs = docs[:self._limit]
+            return docs
+
+        def __aiter__(self):
+            return self._iterate()
+
+        async def _iterate(self):
+            for doc in self._resolve():
+                yield doc
 
         async def to_list(self, length: int):
             # honor length similar to motor's cursor.to_list
+            docs = self._resolve()
             if length is None:
-                return list(self._docs)
-            return list(self._docs)[:length]
+                return docs
+            return docs[:length]
+
+    async def create_indexes(self, indexes: list):
+        self._round_trip()
+        await self._wait()
+        names = [index.document["name"] for index in indexes]
+        for index in indexes:
+            keys = index.document["key"]
+            if "text" in keys.values():
+                weights = index.document.get("weights", {})
+                self.text_weights = {field: weights.get(field, 1) for field, kind in keys.items() if kind == "text"}
+        for name in names:
+            if name not in self.indexes:
+                self.indexes.append(name)
+        return names
 
-    async def insert_one(self, doc: dict):
+    async def insert_one(self, doc: dict, session=None):
+        self._round_trip()
+        await self._wait()
         _id = doc.get("_id")
         # emulate Mongo behavior: auto-generate _id when missing
         if _id is None:
             _id = f"auto_{len(self._store) + 1}"
             doc["_id"] = _id
-        # store and return inserted id
-        self._store[_id] = doc
+        if _id in self._store:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: _id {_id!r}")
+        # store a copy, as the server would, and return inserted id
+        self._store[_id] = copy.deepcopy(doc)
         return FakeInsertOneResult(inserted_id=_id)
 
-    async def find_one(self, query: dict):
-        _id = query.get("_id")
-        return self._store.get(_id)
-
-    def find(self, filter_q: dict):
-        # return an async-like cursor with `to_list` method
-        # support filter by owner_uid or empty filter
-        if not filter_q:
-            docs = list(self._store.values())
-        else:
-            # simple exact-match filtering for keys present in filter_q
-            docs = [d for d in self._store.values() if all(d.get(k) == v for k, v in filter_q.items())]
-        return FakeCollection.FakeCursor(docs)
-
-    async def update_one(self, filter_q: dict, update_q: dict):
-        _id = filter_q.get("_id")
-        if _id not in self._store:
-            return FakeUpdateResult(matched_count=0)
-        # apply $set updates
-        set_ops = update_q.get("$set", {})
-        self._store[_id].update(set_ops)
-        return FakeUpdateResult(matched_count=1)
-
-    async def delete_one(self, filter_q: dict):
-        _id = filter_q.get("_id")
-        if _id in self._store:
-            del self._store[_id]
-            return FakeDeleteResult(deleted_count=1)
-        return FakeDeleteResult(deleted_count=0)
+    def _matching(self, filter_q: dict | None) -> list:
+        _id = (filter_q or {}).get("_id")
+        if _id is not None and not isinstance(_id, dict):
+            # fast path for the common primary-key lookup
+            doc = self._store.get(_id)
+            return [doc] if doc is not None and matches(doc, filter_q) else []
+        return [d for d in self._store.values() if matches(d, filter_q)]
+
+    async def find_one(self, query: dict, session=None):
+        self._round_trip()
+        await self._wait()
+        found = self._matching(query)
+        return copy.deepcopy(found[0]) if found else None
+
+    def find(self, filter_q: dict = None, projection: dict = None, session=None):
+        # return an async-like cursor supporting sort/skip/limit/to_list
+        docs = [d for d in self._store.values() if matches(d, filter_q)]
+        return FakeCollection.FakeCursor(docs, on_fetch=self._round_trip)
+
+    def aggregate(self, pipeline: list, **kwargs):
+        docs = run_pipeline(list(self._store.values()), pipeline, self._db, self.text_weights)
+        return FakeCollection.FakeCursor(docs, on_fetch=self._round_trip)
+
+    @staticmethod
+    def _pulls(item, condition) -> bool:
+        if isinstance(condition, dict):
+            return isinstance(item, dict) and matches(item, condition)
+        return item == condition
+
+    @staticmethod
+    def _apply_update(doc: dict, update_q: dict, inserting: bool = False) -> None:
+        for key, value in update_q.get("$set", {}).items():
+            doc[key] = value
+        for key, value in update_q.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + value
+        for key in update_q.get("$unset", {}):
+            doc.pop(key, None)
+        for key, value in update_q.get("$push", {}).items():
+            doc.setdefault(key, []).append(value)
+        for key, condition in update_q.get("$pull", {}).items():
+            if isinstance(doc.get(key), list):
+                doc[key] = [item for item in doc[key] if not FakeCollection._pulls(item, condition)]
+        if inserting:
+            doc.update(update_q.get("$setOnInsert", {}))
+
+    def _update(self, filter_q: dict, update_q: dict, upsert: bool = False, many: bool = False) -> FakeUpdateResult:
+        found = self._matching(filter_q)
+        if not many:
+            found = found[:1]
+        for doc in found:
+            self._apply_update(doc, update_q)
+        if found or not upsert:
+            return FakeUpdateResult(matched_count=len(found))
+        # upsert: seed the new document from the equality fields of the filter
+        doc = {k: v for k, v in filter_q.items() if not k.startswith("$") and not isinstance(v, dict)}
+        self._apply_update(doc, update_q, inserting=True)
+        doc.setdefault("_id", f"auto_{len(self._store) + 1}")
+        self._store[doc["_id"]] = doc
+        return FakeUpdateResult(matched_count=0, upserted_id=doc["_id"])
+
+    async def update_one(self, filter_q: dict, update_q: dict, upsert: bool = False, session=None):
+        self._round_trip()
+        await self._wait()
+        return self._update(filter_q, update_q, upsert=upsert)
+
+    async def update_many(self, filter_q: dict, update_q: dict, upsert: bool = False):
+        self._round_trip()
+        await self._wait()
+        return self._update(filter_q, update_q, upsert=upsert, many=True)
+
+    async def find_one_and_update(
+        self, filter_q: dict, update_q: dict, return_document=False, upsert: bool = False, session=None
+    ):
+        # pymongo's ReturnDocument.AFTER is True, BEFORE is False
+        self._round_trip()
+        await self._wait()
+        found = self._matching(filter_q)[:1]
+        before = copy.deepcopy(found[0]) if found else None
+        result = self._update(filter_q, update_q, upsert=upsert)
+        if not return_document:
+            return before
+        _id = found[0]["_id"] if found else result.upserted_id
+        return copy.deepcopy(self._store[_id]) if _id is not None else None
+
+    async def find_one_and_delete(self, filter_q: dict, session=None):
+        self._round_trip()
+        await self._wait()
+        found = self._matching(filter_q)[:1]
+        if not found:
+            return None
+        return self._store.pop(found[0]["_id"])
+
+    def _delete(self, filter_q: dict, many: bool = False) -> FakeDeleteResult:
+        found = self._matching(filter_q)
+        if not many:
+            found = found[:1]
+        for doc in found:
+            del self._store[doc["_id"]]
+        return FakeDeleteResult(deleted_count=len(found))
+
+    async def delete_one(self, filter_q: dict, session=None):
+        self._round_trip()
+        await self._wait()
+        return self._delete(filter_q)
+
+    async def delete_many(self, filter_q: dict):
+        self._round_trip()
+        await self._wait()
+        return self._delete(filter_q, many=True)
+
+    async def bulk_write(self, requests: list, ordered: bool = True, session=None):
+        # reads pymongo's request objects directly; they keep their arguments in private slots
+        self._round_trip()
+        await self._wait()
+        result = FakeBulkWriteResult()
+        for request in requests:
+            kind = type(request).__name__
+            if kind == "InsertOne":
+                doc = request._doc
+                doc.setdefault("_id", f"auto_{len(self._store) + 1}")
+                self._store[doc["_id"]] = copy.deepcopy(doc)
+                result.inserted_count += 1
+            elif kind in ("UpdateOne", "UpdateMany"):
+                outcome = self._update(request._filter, request._doc, upsert=bool(request._upsert), many=kind == "UpdateMany")
+                result.matched_count += outcome.matched_count
+                result.modified_count += outcome.modified_count
+                result.upserted_count += outcome.upserted_id is not None
+            elif kind == "ReplaceOne":
+                found = self._matching(request._filter)[:1]
+                if found:
+                    replacement = {**request._doc, "_id": found[0]["_id"]}
+                    self._store[replacement["_id"]] = replacement
+                    result.matched_count += 1
+                    result.modified_count += 1
+                elif request._upsert:
+                    doc = {**request._filter, **request._doc}
+                    doc.setdefault("_id", f"auto_{len(self._store) + 1}")
+                    self._store[doc["_id"]] = doc
+                    result.upserted_count += 1
+            elif kind in ("DeleteOne", "DeleteMany"):
+                result.deleted_count += self._delete(request._filter, many=kind == "DeleteMany").deleted_count
+            else:
+                raise NotImplementedError(f"FakeCollection.bulk_write does not support {kind}")
+        return result
+
+
+class FakeSession:
+    """Transaction stand-in: snapshots every collection and restores it if the block raises."""
+
+    def __init__(self, db):
+        self._db = db
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @asynccontextmanager
+    async def start_transaction(self):
+        snapshot = {name: copy.deepcopy(coll._store) for name, coll in self._db._collections.items()}
+        try:
+            yield self
+        except BaseException:
+            for name, coll in self._db._collections.items():
+                coll._store = snapshot.get(name, {})
+            raise
+
+
+class FakeClient:
+    """Just enough of AsyncIOMotorClient for code that opens transactions."""
+
+    def __init__(self, db, topology_type_name: str = "ReplicaSetWithPrimary"):
+        self._db = db
+        self.topology_description = SimpleNamespace(topology_type_name=topology_type_name)
+
+    async def start_session(self):
+        return FakeSession(self._db)
 
 
 class FakeDB:
     def __init__(self):
         # lazy-created collections
         self._collections = {}
+        # number of operations that would each cost a server round trip
+        self.round_trips = 0
+        # standalone server by default; tests set a FakeClient to exercise transactions
+        self.client = None
+        # yield to the event loop before every operation so concurrent tasks interleave
+        self.interleave = False
 
     def __getitem__(self, name: str):
         if name not in self._collections:
-            self._collections[name] = FakeCollection()
+            self._collections[name] = FakeCollection(self)
         return self._collections[name]
 
 
 @pytest.fixture
 def fake_db():
     """Provides a simple fake AsyncIOMotorDatabase compatible object."""
+    from app.core.catalog_cache import catalog_cache
+    from app.services.vehicle_facets import facet_cache
+
+    # the caches are process-wide; a fresh database must not see another test's pages
+    catalog_cache.clear()
+    facet_cache.clear()
     return FakeDB()
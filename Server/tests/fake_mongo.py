@@ -0,0 +1,512 @@
+"""In-memory evaluation of the MongoDB query and aggregation subset used by the app.
+
+`FakeCollection` in ``conftest.py`` delegates filtering, sorting and
+``aggregate`` pipelines here. Only the operators the repositories and
+services actually issue are implemented; anything else raises
+``NotImplementedError`` so a test never silently passes on an unsupported
+query.
+"""
+
+import copy
+import math
+import re
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import OperationFailure
+
+MISSING = object()
+
+# Where a `$text` match keeps the document's score for `{"$meta": "textScore"}`.
+_TEXT_SCORE = "__text_score__"
+_WORD = re.compile(r"[a-z0-9]+")
+
+_BSON_TYPE_RANKS = {"null": 0, "number": 1, "string": 2, "object": 3, "array": 4, "objectId": 7, "bool": 8, "date": 9}
+
+
+def get_field(doc: dict, path: str):
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, list):
+            # a path through an array of documents yields the values found in its elements
+            value = [item[part] for item in value if isinstance(item, dict) and part in item]
+            continue
+        if not isinstance(value, dict) or part not in value:
+            return MISSING
+        value = value[part]
+    return value
+
+
+def bson_type(value) -> str:
+    if value is MISSING or value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, ObjectId):
+        return "objectId"
+    if isinstance(value, datetime):
+        return "date"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+def sort_key(value):
+    # Mongo compares by BSON type rank first, then by value within the type
+    rank = _BSON_TYPE_RANKS[bson_type(value)]
+    if rank == 0:
+        return (0, 0)
+    if rank in (3, 4):
+        return (rank, str(value))
+    return (rank, value)
+
+
+def sort_docs(docs: list, spec) -> list:
+    docs = list(docs)
+    # stable multi-key sort: apply the least significant key first
+    for field, direction in reversed(list(spec)):
+        docs.sort(key=lambda d: sort_key(get_field(d, field)), reverse=direction < 0)
+    return docs
+
+
+def _compare(value, op: str, operand) -> bool:
+    if value is MISSING or value is None:
+        return False
+    if sort_key(value)[0] != sort_key(operand)[0]:
+        return False
+    if op == "$gt":
+        return value > operand
+    if op == "$gte":
+        return value >= operand
+    if op == "$lt":
+        return value < operand
+    return value <= operand
+
+
+def _element_matches(item, condition: dict) -> bool:
+    # {"$elemMatch": {"field": ...}} queries documents; {"$elemMatch": {"$gt": ...}} tests values
+    if any(str(k).startswith("$") for k in condition):
+        return _match_condition(item, condition)
+    return isinstance(item, dict) and matches(item, condition)
+
+
+def _match_condition(value, condition) -> bool:
+    if not isinstance(condition, dict) or not any(str(k).startswith("$") for k in condition):
+        if isinstance(value, list) and not isinstance(condition, list):
+            return condition in value
+        return (None if value is MISSING else value) == condition
+
+    for op, operand in condition.items():
+        if op == "$options":
+            continue
+        if op == "$eq":
+            if not _match_condition(value, operand):
+                return False
+        elif op == "$ne":
+            if _match_condition(value, operand):
+                return False
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            if not _compare(value, op, operand):
+                return False
+        elif op == "$in":
+            if not any(_match_condition(value, item) for item in operand):
+                return False
+        elif op == "$nin":
+            if any(_match_condition(value, item) for item in operand):
+                return False
+        elif op == "$not":
+            if _match_condition(value, operand):
+                return False
+        elif op == "$elemMatch":
+            if not isinstance(value, list) or not any(_element_matches(item, operand) for item in value):
+                return False
+        elif op == "$type":
+            types = operand if isinstance(operand, list) else [operand]
+            if value is MISSING or bson_type(value) not in types:
+                return False
+        elif op == "$exists":
+            if (value is not MISSING) != bool(operand):
+                return False
+        elif op == "$regex":
+            flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+            if not isinstance(value, str) or not re.search(operand, value, flags):
+                return False
+        else:
+            raise NotImplementedError(f"FakeCollection does not support {op}")
+    return True
+
+
+def matches(doc: dict, filter_q: dict | None, variables: dict | None = None) -> bool:
+    """Evaluate the subset of the MongoDB query language used by the repositories."""
+    for key, condition in (filter_q or {}).items():
+        if key == "$and":
+            if not all(matches(doc, sub, variables) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, sub, variables) for sub in condition):
+                return False
+        elif key == "$expr":
+            if not _truthy(evaluate(condition, doc, variables or {})):
+                return False
+        elif not _match_condition(get_field(doc, key), condition):
+            return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Aggregation expressions
+# ---------------------------------------------------------------------------
+
+def _truthy(value) -> bool:
+    return value not in (None, False, 0, MISSING)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return _as_utc(value)
+    if isinstance(value, str):
+        return _as_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+    raise ValueError(f"cannot convert {value!r} to date")
+
+
+def _convert(value, to: str):
+    if to == "date":
+        return _to_date(value)
+    if to == "objectId":
+        if isinstance(value, ObjectId):
+            return value
+        try:
+            return ObjectId(value)
+        except (InvalidId, TypeError):
+            raise ValueError(f"cannot convert {value!r} to objectId")
+    if to == "string":
+        return value.isoformat() if isinstance(value, datetime) else str(value)
+    if to == "double":
+        return float(value)
+    raise NotImplementedError(f"$convert to {to}")
+
+
+def _equal(left, right) -> bool:
+    left = None if left is MISSING else left
+    right = None if right is MISSING else right
+    return sort_key(left) == sort_key(right)
+
+
+def evaluate(expr, doc: dict, variables: dict):
+    """Evaluate an aggregation expression against `doc`."""
+    if isinstance(expr, str):
+        if expr.startswith("$$"):
+            name, _, path = expr[2:].partition(".")
+            if name == "ROOT":
+                base = doc
+            elif name == "NOW":
+                base = datetime.now(timezone.utc)
+            else:
+                base = variables[name]
+            return get_field(base, path) if path else base
+        if expr.startswith("$"):
+            return get_field(doc, expr[1:])
+        return expr
+    if isinstance(expr, list):
+        return [evaluate(item, doc, variables) for item in expr]
+    if not isinstance(expr, dict):
+        return expr
+    if not expr or not next(iter(expr)).startswith("$"):
+        return {key: evaluate(value, doc, variables) for key, value in expr.items()}
+
+    (op, args), = expr.items()
+    if op == "$literal":
+        return args
+    if op == "$meta":
+        if args != "textScore":
+            raise NotImplementedError(f"fake aggregation does not support $meta {args}")
+        return doc.get(_TEXT_SCORE, MISSING)
+
+    def arg_list():
+        return [evaluate(a, doc, variables) for a in (args if isinstance(args, list) else [args])]
+
+    if op == "$cond":
+        if isinstance(args, dict):
+            condition, then, otherwise = args["if"], args["then"], args["else"]
+        else:
+            condition, then, otherwise = args
+        return evaluate(then if _truthy(evaluate(condition, doc, variables)) else otherwise, doc, variables)
+    if op == "$ifNull":
+        values = arg_list()
+        for value in values[:-1]:
+            if value is not MISSING and value is not None:
+                return value
+        return values[-1]
+    if op == "$convert":
+        value = evaluate(args["input"], doc, variables)
+        if value is MISSING or value is None:
+            return evaluate(args.get("onNull"), doc, variables)
+        try:
+            return _convert(value, args["to"])
+        except ValueError:
+            if "onError" not in args:
+                raise
+            return evaluate(args["onError"], doc, variables)
+    if op == "$and":
+        return all(_truthy(v) for v in arg_list())
+    if op == "$or":
+        return any(_truthy(v) for v in arg_list())
+    if op == "$not":
+        return not _truthy(arg_list()[0])
+
+    values = arg_list()
+    if op == "$eq":
+        return _equal(values[0], values[1])
+    if op == "$ne":
+        return not _equal(values[0], values[1])
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        left, right = sort_key(values[0]), sort_key(values[1])
+        return {"$gt": left > right, "$gte": left >= right, "$lt": left < right, "$lte": left <= right}[op]
+    if op == "$in":
+        return any(_equal(values[0], item) for item in values[1])
+    if any(v is None or v is MISSING for v in values) and op not in ("$concat", "$max", "$min"):
+        return None
+    if op == "$add":
+        return sum(values)
+    if op == "$subtract":
+        left, right = values
+        if isinstance(left, datetime) and isinstance(right, datetime):
+            return int((_as_utc(left) - _as_utc(right)).total_seconds() * 1000)
+        return left - right
+    if op == "$multiply":
+        return math.prod(values)
+    if op == "$divide":
+        return values[0] / values[1]
+    if op == "$ceil":
+        return math.ceil(values[0])
+    if op == "$floor":
+        return math.floor(values[0])
+    if op == "$round":
+        return round(values[0], values[1] if len(values) > 1 else 0)
+    if op == "$max":
+        present = [v for v in values if v is not None and v is not MISSING]
+        return max(present, key=sort_key) if present else None
+    if op == "$min":
+        present = [v for v in values if v is not None and v is not MISSING]
+        return min(present, key=sort_key) if present else None
+    if op == "$toString":
+        return _convert(values[0], "string")
+    if op == "$toDouble":
+        return _convert(values[0], "double")
+    if op == "$toDate":
+        return _convert(values[0], "date")
+    if op == "$year":
+        return _to_date(values[0]).year
+    if op == "$month":
+        return _to_date(values[0]).month
+    if op == "$concat":
+        if any(v is None or v is MISSING for v in values):
+            return None
+        return "".join(values)
+    raise NotImplementedError(f"fake aggregation does not support {op}")
+
+
+# ---------------------------------------------------------------------------
+# Aggregation stages
+# ---------------------------------------------------------------------------
+
+def _accumulate(op: str, expr, group_docs: list):
+    values = [evaluate(expr, d, {}) for d in group_docs]
+    if op == "$sum":
+        return sum(v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool))
+    if op == "$first":
+        return values[0] if values else None
+    if op == "$push":
+        return values
+    if op == "$max":
+        present = [v for v in values if v is not None and v is not MISSING]
+        return max(present, key=sort_key) if present else None
+    if op == "$min":
+        present = [v for v in values if v is not None and v is not MISSING]
+        return min(present, key=sort_key) if present else None
+    raise NotImplementedError(f"fake aggregation does not support accumulator {op}")
+
+
+def _project(doc: dict, spec: dict) -> dict:
+    include_id = spec.get("_id", 1)
+    excluding = all(v in (0, False) for k, v in spec.items() if k != "_id")
+    if excluding:
+        result = {k: v for k, v in doc.items() if spec.get(k, 1) not in (0, False)}
+        return result
+    result = {}
+    if include_id not in (0, False) and "_id" in doc:
+        result["_id"] = doc["_id"] if include_id in (1, True) else evaluate(include_id, doc, {})
+    for key, value in spec.items():
+        if key == "_id":
+            continue
+        if value in (1, True):
+            field = get_field(doc, key)
+            if field is not MISSING:
+                result[key] = field
+        else:
+            field = evaluate(value, doc, {})
+            if field is not MISSING:
+                result[key] = field
+    return result
+
+
+# The sphere radius MongoDB uses for spherical $geoNear distances.
+_EARTH_RADIUS_M = 6378100.0
+
+
+def _sphere_distance_m(a, b) -> float:
+    (lng1, lat1), (lng2, lat2) = [(math.radians(x), math.radians(y)) for x, y in (a, b)]
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * _EARTH_RADIUS_M * math.asin(math.sqrt(h))
+
+
+def _geo_near(docs: list, spec: dict) -> list:
+    origin = spec["near"]["coordinates"]
+    found = []
+    for d in docs:
+        point = get_field(d, spec["key"])
+        if not isinstance(point, dict) or point.get("type") != "Point" or not matches(d, spec.get("query")):
+            continue
+        distance = _sphere_distance_m(origin, point["coordinates"])
+        if distance <= spec.get("maxDistance", math.inf):
+            d[spec["distanceField"]] = distance
+            found.append(d)
+    return sorted(found, key=lambda d: d[spec["distanceField"]])
+
+
+def _text_match(docs: list, spec: dict, text_weights: dict | None) -> list:
+    # Any query term matching a word of an indexed field is a hit; the score
+    # adds up the field weights of the hits, which keeps Mongo's ordering for
+    # the small fixtures the tests use.
+    if text_weights is None:
+        raise OperationFailure("text index required for $text query", code=27)
+    terms = set(_WORD.findall(spec["$search"].lower()))
+    found = []
+    for d in docs:
+        score = 0.0
+        for field, weight in text_weights.items():
+            value = get_field(d, field)
+            if isinstance(value, str):
+                score += weight * len(terms & set(_WORD.findall(value.lower())))
+        if score:
+            d[_TEXT_SCORE] = score
+            found.append(d)
+    return found
+
+
+def run_pipeline(docs: list, pipeline: list, db, text_weights: dict | None = None) -> list:
+    docs = [copy.deepcopy(d) for d in docs]
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$match" and "$text" in spec:
+            rest = {k: v for k, v in spec.items() if k != "$text"}
+            docs = [d for d in _text_match(docs, spec["$text"], text_weights) if matches(d, rest)]
+        elif name == "$geoNear":
+            docs = _geo_near(docs, spec)
+        elif name == "$match":
+            docs = [d for d in docs if matches(d, spec)]
+        elif name in ("$addFields", "$set"):
+            for d in docs:
+                for key, value in spec.items():
+                    d[key] = evaluate(value, d, {})
+        elif name == "$project":
+            docs = [_project(d, spec) for d in docs]
+        elif name == "$unset":
+            fields = spec if isinstance(spec, list) else [spec]
+            for d in docs:
+                for field in fields:
+                    d.pop(field, None)
+        elif name == "$sort":
+            docs = sort_docs(docs, spec.items())
+        elif name == "$limit":
+            docs = docs[:spec]
+        elif name == "$skip":
+            docs = docs[spec:]
+        elif name == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        elif name == "$unwind":
+            options = spec if isinstance(spec, dict) else {"path": spec}
+            path = options["path"][1:]
+            unwound = []
+            for d in docs:
+                value = get_field(d, path)
+                if isinstance(value, list) and value:
+                    for item in value:
+                        unwound.append({**d, path: item})
+                elif value not in (MISSING, None) and not isinstance(value, list):
+                    unwound.append(d)
+                elif options.get("preserveNullAndEmptyArrays"):
+                    unwound.append({k: v for k, v in d.items() if k != path})
+            docs = unwound
+        elif name == "$lookup":
+            foreign = list(db[spec["from"]]._store.values())
+            for d in docs:
+                if "pipeline" in spec:
+                    variables = {k: evaluate(v, d, {}) for k, v in spec.get("let", {}).items()}
+                    joined = _run_lookup_pipeline(foreign, spec["pipeline"], variables, db)
+                else:
+                    local = get_field(d, spec["localField"])
+                    joined = [f for f in foreign if _equal(get_field(f, spec["foreignField"]), local)]
+                d[spec["as"]] = [copy.deepcopy(f) for f in joined]
+        elif name == "$group":
+            groups: dict = {}
+            for d in docs:
+                key = evaluate(spec["_id"], d, {})
+                groups.setdefault(repr(key), (key, []))[1].append(d)
+            docs = []
+            for key, members in groups.values():
+                out = {"_id": key}
+                for field, accumulator in spec.items():
+                    if field == "_id":
+                        continue
+                    (op, expr), = accumulator.items()
+                    out[field] = _accumulate(op, expr, members)
+                docs.append(out)
+        elif name == "$bucket":
+            boundaries = spec["boundaries"]
+            output = spec.get("output", {"count": {"$sum": 1}})
+            buckets: dict = {}
+            for d in docs:
+                value = evaluate(spec["groupBy"], d, {})
+                key = spec.get("default", MISSING)
+                if bson_type(value) == bson_type(boundaries[0]):
+                    for lower, upper in zip(boundaries, boundaries[1:]):
+                        if lower <= value < upper:
+                            key = lower
+                            break
+                if key is MISSING:
+                    raise OperationFailure("$bucket could not find a matching branch and no default", code=40066)
+                buckets.setdefault(key, []).append(d)
+            docs = []
+            for key in sorted(buckets, key=sort_key):
+                out = {"_id": key}
+                for field, accumulator in output.items():
+                    (op, expr), = accumulator.items()
+                    out[field] = _accumulate(op, expr, buckets[key])
+                docs.append(out)
+        elif name == "$facet":
+            docs = [{field: run_pipeline(docs, sub, db) for field, sub in spec.items()}]
+        else:
+            raise NotImplementedError(f"fake aggregation does not support stage {name}")
+    for d in docs:
+        d.pop(_TEXT_SCORE, None)
+    return docs
+
+
+def _run_lookup_pipeline(foreign: list, pipeline: list, variables: dict, db) -> list:
+    # `let` variables are only visible to $expr inside the first $match stages
+    docs = foreign
+    rest = list(pipeline)
+    while rest and "$match" in rest[0]:
+        docs = [f for f in docs if matches(f, rest[0]["$match"], variables)]
+        rest.pop(0)
+    return run_pipeline(docs, rest, db)
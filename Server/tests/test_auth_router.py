@@ -0,0 +1,66 @@
+import threading
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.core import identity
+from app.routers import auth as auth_router
+from app.schemas import LoginRequest, RegisterEmailRequest
+
+
+@pytest.mark.asyncio
+async def test_register_runs_admin_calls_off_the_event_loop(fake_db, monkeypatch):
+    loop_thread = threading.current_thread().name
+    admin_threads = []
+
+    def fake_create_user(email, password):
+        admin_threads.append(threading.current_thread().name)
+        return SimpleNamespace(uid="uid_1", email=email)
+
+    monkeypatch.setattr(auth_router.auth, "create_user", fake_create_user)
+    payload = RegisterEmailRequest(
+        email="new@example.com", password="secret123", full_name="New User", address="Colombo", nic="123", phone="0771234567"
+    )
+
+    created = await auth_router.register_email_user(payload, db=fake_db)
+
+    assert created.uid == "uid_1"
+    assert (await fake_db["users"].find_one({"_id": "uid_1"}))["email"] == "new@example.com"
+    assert admin_threads and admin_threads[0] != loop_thread
+    assert admin_threads[0].startswith("firebase-admin")
+
+
+@pytest.mark.asyncio
+async def test_login_uses_pooled_client(monkeypatch):
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if b"wrong" in request.content:
+            return httpx.Response(400, json={"error": {"message": "INVALID_PASSWORD"}})
+        return httpx.Response(200, json={"localId": "uid_1", "idToken": "token_1"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(auth_router, "get_http_client", lambda: client)
+    monkeypatch.setenv("FIREBASE_API_KEY", "test-key")
+    monkeypatch.setenv("FIREBASE_AUTH_EMULATOR_HOST", "127.0.0.1:9099")
+
+    response = await auth_router.login_user(LoginRequest(email="a@example.com", password="right"))
+    assert (response.uid, response.idToken) == ("uid_1", "token_1")
+    assert str(seen[0].url) == (
+        "http://127.0.0.1:9099/identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key=test-key"
+    )
+
+    with pytest.raises(HTTPException) as exc:
+        await auth_router.login_user(LoginRequest(email="a@example.com", password="wrong"))
+    assert exc.value.status_code == 401
+    await client.aclose()
+
+
+def test_identity_toolkit_url_defaults_to_google(monkeypatch):
+    monkeypatch.delenv("FIREBASE_AUTH_EMULATOR_HOST", raising=False)
+    assert identity.identity_toolkit_url("accounts:signInWithPassword") == (
+        "https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword"
+    )
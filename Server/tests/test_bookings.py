@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers import rents as rents_router
+from app.schemas import RentCreate, RentUpdate
+
+
+def _payload(start_day: int, end_day: int, **overrides) -> RentCreate:
+    fields = {
+        "vehicle_id": "veh_1",
+        "owner_uid": "owner_1",
+        "start_date": datetime(2026, 6, start_day, 9, tzinfo=timezone.utc),
+        "end_date": datetime(2026, 6, end_day, 9, tzinfo=timezone.utc),
+        **overrides,
+    }
+    return RentCreate(**fields)
+
+
+async def _book(fake_db, payload: RentCreate, renter: str = "renter_1") -> dict:
+    return await rents_router.create_rent_endpoint(payload, decoded_token={"uid": renter}, db=fake_db)
+
+
+async def _seed_vehicle(fake_db) -> None:
+    await fake_db["vehicles"].insert_one({"_id": "veh_1", "owner_uid": "owner_1", "price": 50.0, "availability": True})
+
+
+@pytest.mark.asyncio
+async def test_simultaneous_bookings_for_one_slot_admit_exactly_one(fake_db):
+    await _seed_vehicle(fake_db)
+    fake_db.interleave = True
+    attempts = [_book(fake_db, _payload(3, 7), renter=f"renter_{n}") for n in range(300)]
+
+    results = await asyncio.gather(*attempts, return_exceptions=True)
+
+    created = [r for r in results if isinstance(r, dict)]
+    assert len(created) == 1
+    assert {e.status_code for e in results if not isinstance(e, dict)} == {409}
+    assert len(await fake_db["rents"].find({}).to_list(length=None)) == 1
+    calendar = await fake_db["vehicle_calendars"].find_one({"_id": "veh_1"})
+    assert [slot["rent_id"] for slot in calendar["slots"]] == [created[0]["_id"]]
+
+
+@pytest.mark.asyncio
+async def test_adjacent_bookings_fit_and_cancellation_frees_the_slot(fake_db):
+    await _seed_vehicle(fake_db)
+    first = await _book(fake_db, _payload(3, 7))
+    await _book(fake_db, _payload(7, 9))  # starts when the first ends
+
+    with pytest.raises(HTTPException) as exc_info:
+        await _book(fake_db, _payload(5, 8))
+    assert exc_info.value.status_code == 409
+
+    await rents_router.cancel_rent_request(first["_id"], decoded_token={"uid": "owner_1"}, db=fake_db)
+    assert (await _book(fake_db, _payload(4, 6)))["booking_status"] == "pending"
+
+
+@pytest.mark.asyncio
+async def test_existing_rents_are_respected_when_calendar_is_first_built(fake_db):
+    await _seed_vehicle(fake_db)
+    await fake_db["rents"].insert_one(
+        {
+            "_id": "legacy_1",
+            "vehicle_id": "veh_1",
+            "owner_uid": "owner_1",
+            "renter_uid": "renter_9",
+            "start_date": datetime(2026, 6, 2, tzinfo=timezone.utc),
+            "end_date": datetime(2026, 6, 5, tzinfo=timezone.utc),
+            "booking_status": "accepted",
+        }
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await _book(fake_db, _payload(3, 7))
+    assert exc_info.value.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_booking_is_validated_against_the_vehicle(fake_db):
+    await _seed_vehicle(fake_db)
+    cases = [
+        (_payload(3, 7, vehicle_id="missing"), 404),
+        (_payload(3, 7, owner_uid="someone_else"), 400),
+        (_payload(7, 3), 400),
+    ]
+    for payload, status_code in cases:
+        with pytest.raises(HTTPException) as exc_info:
+            await _book(fake_db, payload)
+        assert exc_info.value.status_code == status_code
+
+
+@pytest.mark.asyncio
+async def test_rescheduling_moves_the_slot(fake_db):
+    await _seed_vehicle(fake_db)
+    mine = await _book(fake_db, _payload(3, 7))
+    await _book(fake_db, _payload(10, 12), renter="renter_2")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await rents_router.patch_rent(
+            mine["_id"], RentUpdate(end_date=datetime(2026, 6, 11, tzinfo=timezone.utc)),
+            decoded_token={"uid": "renter_1"}, db=fake_db,
+        )
+    assert exc_info.value.status_code == 409
+
+    moved = await rents_router.patch_rent(
+        mine["_id"], RentUpdate(start_date=datetime(2026, 6, 5, 9, tzinfo=timezone.utc), end_date=datetime(2026, 6, 9, 9, tzinfo=timezone.utc)),
+        decoded_token={"uid": "renter_1"}, db=fake_db,
+    )
+    assert moved["end_date"] == datetime(2026, 6, 9, 9, tzinfo=timezone.utc)
+    # the old dates are free again
+    assert (await _book(fake_db, _payload(3, 5), renter="renter_3"))["booking_status"] == "pending"
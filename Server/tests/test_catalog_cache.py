@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+from fastapi import Response
+
+from app.core.catalog_cache import catalog_cache
+from app.core.ttl_cache import TTLCache
+from app.repositories import vehicle as vehicle_repo
+from app.routers import general as general_router
+
+
+async def _seed(fake_db, count=3):
+    for index in range(count):
+        await fake_db["vehicles"].insert_one(
+            {"_id": f"veh_{index}", "owner_uid": "owner_1", "price": 10.0 * (index + 1), "availability": True}
+        )
+
+
+@pytest.mark.asyncio
+async def test_public_listing_is_served_from_cache_until_a_write(fake_db):
+    await _seed(fake_db)
+
+    first = await general_router.public_list_vehicles(response=Response(), db=fake_db, limit=50, cursor=None)
+    fake_db.round_trips = 0
+    again = await general_router.public_list_vehicles(response=Response(), db=fake_db, limit=50, cursor=None)
+    assert again == first
+    assert fake_db.round_trips == 0
+
+    await vehicle_repo.VehicleRepository(fake_db).set_availability(owner_uid="owner_1", vehicle_id="veh_1", available=False)
+    fresh = await general_router.public_list_vehicles(response=Response(), db=fake_db, limit=50, cursor=None)
+    assert [d["availability"] for d in fresh["items"]] == [True, False, True]
+
+    await vehicle_repo.delete_vehicle(fake_db, owner_uid="owner_1", vehicle_id="veh_2")
+    fresh = await general_router.public_list_vehicles(response=Response(), db=fake_db, limit=50, cursor=None)
+    assert [d["_id"] for d in fresh["items"]] == ["veh_0", "veh_1"]
+    assert catalog_cache.stats()["invalidations"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cold_key_is_loaded_once_for_concurrent_requests(fake_db):
+    await _seed(fake_db)
+    fake_db.interleave = True
+    fake_db.round_trips = 0
+
+    pages = await asyncio.gather(
+        *(general_router.public_list_vehicles(response=Response(), db=fake_db, limit=50, cursor=None) for _ in range(50))
+    )
+
+    assert all(page == pages[0] for page in pages)
+    assert fake_db.round_trips == 1
+    assert catalog_cache.stats()["coalesced"] == 49
+
+
+@pytest.mark.asyncio
+async def test_load_started_before_invalidation_is_not_stored():
+    cache = TTLCache(ttl=60)
+    release = asyncio.Event()
+
+    async def slow_load():
+        await release.wait()
+        return "stale"
+
+    pending = asyncio.ensure_future(cache.get_or_load("key", slow_load))
+    await asyncio.sleep(0)
+    cache.invalidate()
+    release.set()
+
+    assert await pending == "stale"
+    assert cache.get("key") is None
+    assert await cache.get_or_load("key", lambda: asyncio.sleep(0, result="fresh")) == "fresh"
@@ -0,0 +1,95 @@
+import pytest
+from fastapi import HTTPException, Response
+
+from app.core.etag import etag_matches
+from app.repositories.user import update_user_profile_by_uid
+from app.routers import general as general_router
+from app.routers import rents as rents_router
+from app.routers import users as users_router
+
+
+@pytest.mark.asyncio
+async def test_profile_poll_gets_304_until_the_profile_changes(fake_db):
+    await fake_db["users"].insert_one({"_id": "uid_1", "email": "a@example.com", "address": "A", "nic": "N", "phone": "P"})
+    token = {"uid": "uid_1"}
+
+    first = Response()
+    await users_router.read_current_user(response=first, decoded_token=token, db=fake_db)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    repeat = await users_router.read_current_user(response=Response(), decoded_token=token, db=fake_db, if_none_match=etag)
+    assert repeat.status_code == 304
+    assert repeat.body == b""
+    assert repeat.headers["etag"] == etag
+
+    await update_user_profile_by_uid(fake_db, uid="uid_1", update_data={"phone": "Q"})
+    changed = Response()
+    profile = await users_router.read_current_user(response=changed, decoded_token=token, db=fake_db, if_none_match=etag)
+    assert profile["phone"] == "Q"
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_owner_rents_etag_follows_status_changes(fake_db):
+    await fake_db["vehicles"].insert_one({"_id": "veh_1", "owner_uid": "owner_1", "price": 50.0, "availability": True})
+    await fake_db["rents"].insert_one(
+        {
+            "_id": "rent_1",
+            "renter_uid": "renter_1",
+            "owner_uid": "owner_1",
+            "vehicle_id": "veh_1",
+            "start_date": "2026-04-01T09:00:00Z",
+            "end_date": "2026-04-03T09:00:00Z",
+            "booking_status": "pending",
+        }
+    )
+    params = {"decoded_token": {"uid": "owner_1"}, "db": fake_db, "limit": 50, "cursor": None}
+
+    first = Response()
+    await rents_router.list_owner_rents(response=first, **params)
+    etag = first.headers["etag"]
+    assert (await rents_router.list_owner_rents(response=Response(), if_none_match=etag, **params)).status_code == 304
+
+    await rents_router.accept_rent_request("rent_1", decoded_token={"uid": "owner_1"}, db=fake_db)
+    page = await rents_router.list_owner_rents(response=Response(), if_none_match=etag, **params)
+    assert page["items"][0]["booking_status"] == "accepted"
+
+
+@pytest.mark.asyncio
+async def test_public_listing_revalidates_without_database_reads(fake_db):
+    await fake_db["vehicles"].insert_one({"_id": "veh_1", "owner_uid": "owner_1", "price": 50.0})
+    first = Response()
+    await general_router.public_list_vehicles(response=first, db=fake_db, limit=50, cursor=None)
+
+    fake_db.round_trips = 0
+    repeat = await general_router.public_list_vehicles(
+        response=Response(), db=fake_db, limit=50, cursor=None, if_none_match=f'W/{first.headers["etag"]}'
+    )
+
+    assert repeat.status_code == 304
+    assert fake_db.round_trips == 0
+
+
+@pytest.mark.asyncio
+async def test_public_vehicle_read_needs_no_owner_and_revalidates(fake_db):
+    await fake_db["vehicles"].insert_one({"_id": "veh_1", "owner_uid": "owner_1", "price": 50.0, "version": 2})
+    first = Response()
+    doc = await general_router.public_get_vehicle("veh_1", response=first, db=fake_db)
+    assert doc["_id"] == "veh_1"
+
+    repeat = await general_router.public_get_vehicle(
+        "veh_1", response=Response(), db=fake_db, if_none_match=first.headers["etag"]
+    )
+    assert repeat.status_code == 304
+
+    with pytest.raises(HTTPException) as exc_info:
+        await general_router.public_get_vehicle("missing", response=Response(), db=fake_db)
+    assert exc_info.value.status_code == 404
+
+
+def test_if_none_match_lists_and_wildcard():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
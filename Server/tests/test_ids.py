@@ -0,0 +1,52 @@
+import pytest
+from bson import ObjectId
+
+from app.repositories import ids
+from app.repositories.rent import RentRepository
+
+
+def test_codec_encodes_by_policy():
+    hex_id = str(ObjectId())
+
+    assert ids.IdCodec(ids.OBJECT_ID_POLICY).encode(hex_id) == ObjectId(hex_id)
+    assert ids.IdCodec(ids.OBJECT_ID_POLICY).condition("veh_1") == "veh_1"
+    assert ids.IdCodec(ids.STRING_POLICY).condition(hex_id) == hex_id
+    assert ids.IdCodec(ids.MIXED_POLICY).condition(hex_id) == {"$in": [ObjectId(hex_id), hex_id]}
+    assert ids.IdCodec.decode({"_id": ObjectId(hex_id)}) == {"_id": hex_id}
+
+
+def test_policy_overrides_are_validated():
+    assert ids.parse_policy_overrides(" vehicles=mixed, rents=objectid ") == {"vehicles": "mixed", "rents": "objectid"}
+    assert ids.parse_policy_overrides(None) == {}
+    with pytest.raises(ValueError):
+        ids.parse_policy_overrides("vehicles=uuid")
+
+
+@pytest.mark.asyncio
+async def test_lookup_is_a_single_query(fake_db):
+    oid = ObjectId()
+    await fake_db["rents"].insert_one({"_id": oid, "renter_uid": "renter_1", "owner_uid": "owner_1"})
+
+    fake_db.round_trips = 0
+    assert (await RentRepository(fake_db).get_rent_by_id(rent_id=str(oid)))["_id"] == str(oid)
+    assert await RentRepository(fake_db).get_rent_by_id(rent_id=str(ObjectId())) is None
+    assert fake_db.round_trips == 2
+
+
+@pytest.mark.asyncio
+async def test_migration_rekeys_string_object_ids(fake_db):
+    legacy, twin = str(ObjectId()), ObjectId()
+    await fake_db["rents"].insert_one({"_id": legacy, "renter_uid": "renter_1"})
+    await fake_db["rents"].insert_one({"_id": str(twin), "renter_uid": "renter_2"})
+    await fake_db["rents"].insert_one({"_id": twin, "renter_uid": "renter_2"})
+    await fake_db["rents"].insert_one({"_id": "rent_custom", "renter_uid": "renter_3"})
+
+    dry_run = await ids.migrate_string_object_ids(fake_db, collection_name="rents", batch_size=1)
+    assert (dry_run["scanned"], dry_run["migrated"], dry_run["conflicts"]) == (2, 1, [str(twin)])
+    assert await fake_db["rents"].find_one({"_id": legacy}) is not None
+
+    summary = await ids.migrate_string_object_ids(fake_db, collection_name="rents", apply=True, batch_size=1)
+    assert summary["migrated"] == 1
+    assert await fake_db["rents"].find_one({"_id": legacy}) is None
+    assert (await fake_db["rents"].find_one({"_id": ObjectId(legacy)}))["renter_uid"] == "renter_1"
+    assert await fake_db["rents"].find_one({"_id": "rent_custom"}) is not None
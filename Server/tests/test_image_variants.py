@@ -0,0 +1,91 @@
+import io
+
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+from starlette.datastructures import Headers
+
+from app.routers import users as users_router
+from app.routers import vehicles as vehicles_router
+from app.schemas import Vehicle
+from app.services import image_variants
+from app.services.image_processing import render_variants
+
+
+def png_bytes(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def make_upload(data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="photo.png", headers=Headers({"content-type": "image/png"}))
+
+
+def test_render_variants_writes_thumbnail_and_webp(tmp_path):
+    source = tmp_path / "car.png"
+    source.write_bytes(png_bytes(1200, 800))
+
+    rendered = render_variants(str(source), 300, 1000, 80)
+
+    assert rendered == {"thumbnail": "car_w300.webp", "webp": "car_full.webp", "width": 1200, "height": 800}
+    with Image.open(tmp_path / "car_w300.webp") as thumbnail:
+        assert (thumbnail.format, thumbnail.size) == ("WEBP", (300, 200))
+    with Image.open(tmp_path / "car_full.webp") as webp:
+        assert webp.size == (1000, 667)
+
+
+@pytest.mark.asyncio
+async def test_vehicle_upload_generates_variants_in_background(fake_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(vehicles_router, "VEHICLE_UPLOAD_DIR", tmp_path)
+    await fake_db["vehicles"].insert_one(
+        {
+            "_id": "veh_1",
+            "owner_uid": "owner_1",
+            "type": "car",
+            "fuel": "petrol",
+            "transmission": "automatic",
+            "price": 100.0,
+            "availability": True,
+            "location": "Colombo",
+            "brand": "Toyota",
+            "year": 2022,
+            "model": "Yaris",
+        }
+    )
+
+    uploaded = await vehicles_router.upload_vehicle_image(
+        "veh_1", make_upload(png_bytes(640, 480)), decoded_token={"uid": "owner_1"}, db=fake_db
+    )
+    assert Vehicle(**uploaded).thumbnail_url is None
+
+    await image_variants.wait_for_pending_variants()
+    stored = await fake_db["vehicles"].find_one({"_id": "veh_1"})
+    vehicle = Vehicle(**stored)
+    stem = vehicle.image_url.rsplit("/", 1)[1].rsplit(".", 1)[0]
+    assert vehicle.thumbnail_url == f"/uploads/vehicles/{stem}_w300.webp"
+    assert vehicle.image_variants[0].webp_url == f"/uploads/vehicles/{stem}_full.webp"
+    assert (vehicle.image_variants[0].width, vehicle.image_variants[0].height) == (640, 480)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [f"{stem}.png", f"{stem}_full.webp", f"{stem}_w300.webp"]
+
+    removed = await vehicles_router.delete_vehicle_image(
+        "veh_1", image_url=vehicle.image_url, decoded_token={"uid": "owner_1"}, db=fake_db
+    )
+    assert removed["image_variants"] == []
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_avatar_variants_discarded_when_avatar_replaced(fake_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(users_router, "UPLOAD_DIR", tmp_path)
+    await fake_db["users"].insert_one({"_id": "user_1", "email": "u@example.com", "address": "a", "nic": "n", "phone": "p"})
+
+    await users_router.upload_avatar(make_upload(png_bytes(400, 400)), decoded_token={"uid": "user_1"}, db=fake_db)
+    # a second upload lands before the first job finishes
+    latest = await users_router.upload_avatar(make_upload(png_bytes(500, 500)), decoded_token={"uid": "user_1"}, db=fake_db)
+    await image_variants.wait_for_pending_variants()
+
+    stored = await fake_db["users"].find_one({"_id": "user_1"})
+    assert stored["avatar_variants"]["source_url"] == latest["avatar_url"]
+    assert stored["avatar_variants"]["width"] == 500
+    assert len([path for path in tmp_path.iterdir() if path.suffix == ".webp"]) == 2
@@ -0,0 +1,123 @@
+import pytest
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.repositories.base import BaseRepository
+from app.repositories.registry import REPOSITORIES, ensure_all_indexes, summarize_plan
+
+
+@pytest.mark.asyncio
+async def test_ensure_all_indexes_is_idempotent(fake_db):
+    first = await ensure_all_indexes(fake_db)
+    second = await ensure_all_indexes(fake_db)
+
+    assert first == second
+    assert first["users"] == []
+    assert "owner_page" in first["vehicles"]
+    assert {"renter_page", "owner_page", "owner_recent"} <= set(first["rents"])
+    assert first["owner_earnings_monthly"] == ["owner_month"]
+
+
+def test_every_repository_declares_query_shapes():
+    for repository_cls in REPOSITORIES:
+        assert repository_cls.query_shapes, repository_cls.__name__
+        names = [shape.name for shape in repository_cls.query_shapes]
+        assert len(names) == len(set(names))
+
+
+def test_summarize_plan_flags_collection_scans_and_blocking_sorts():
+    collscan = {"queryPlanner": {"winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}}}
+    summary = summarize_plan(collscan)
+    assert summary["collection_scan"] and summary["in_memory_sort"]
+
+    indexed = {
+        "queryPlanner": {
+            "winningPlan": {
+                "stage": "LIMIT",
+                "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "owner_page"}},
+            }
+        },
+        "executionStats": {"totalDocsExamined": 5, "totalKeysExamined": 5, "nReturned": 5},
+    }
+    summary = summarize_plan(indexed)
+    assert summary["indexes"] == ["owner_page"]
+    assert not summary["collection_scan"] and not summary["in_memory_sort"]
+    assert (summary["keys_examined"], summary["docs_examined"], summary["returned"]) == (5, 5, 5)
+
+    # slot-based engine plans nest under queryPlan; aggregates put the planner in a $cursor stage
+    aggregate = {
+        "stages": [
+            {
+                "$cursor": {
+                    "queryPlanner": {
+                        "winningPlan": {"queryPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "owner_recent"}}}
+                    }
+                }
+            },
+            {"$lookup": {}},
+        ]
+    }
+    assert summarize_plan(aggregate)["indexes"] == ["owner_recent"]
+
+
+class ConflictingCollection:
+    """Collection whose first `create_indexes` hits an index conflict, as after a definition change."""
+
+    def __init__(self, existing: dict):
+        self.existing = existing
+        self.dropped = []
+        self.attempts = 0
+
+    async def create_indexes(self, models):
+        self.attempts += 1
+        if self.attempts == 1:
+            raise OperationFailure("Index already exists with a different name or options", code=85)
+        return [model.document["name"] for model in models]
+
+    async def index_information(self):
+        return self.existing
+
+    async def drop_index(self, name):
+        self.dropped.append(name)
+
+
+class CatalogRepository(BaseRepository):
+    indexes = [
+        IndexModel([("brand", TEXT), ("model", TEXT)], name="search_text", weights={"brand": 10}),
+        IndexModel(
+            [("owner_uid", ASCENDING)],
+            name="by_owner",
+            partialFilterExpression={"owner_uid": {"$exists": True}},
+        ),
+    ]
+
+
+def _stored_indexes(*, weights: dict, partial_filter: dict) -> dict:
+    # the shape `index_information()` returns for the declared indexes
+    return {
+        "_id_": {"v": 2, "key": [("_id", 1)]},
+        "search_text": {
+            "v": 2,
+            "key": [("_fts", "text"), ("_ftsx", 1)],
+            "weights": weights,
+            "default_language": "english",
+            "language_override": "language",
+            "textIndexVersion": 3,
+        },
+        "by_owner": {"v": 2, "key": [("owner_uid", 1)], "partialFilterExpression": partial_filter},
+    }
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_keeps_matching_text_index_and_rebuilds_changed_options():
+    collection = ConflictingCollection(
+        _stored_indexes(weights={"brand": 10, "model": 1}, partial_filter={"owner_uid": {"$type": "string"}})
+    )
+    await CatalogRepository({"catalog": collection}, "catalog").ensure_indexes()
+    assert collection.dropped == ["by_owner"]
+
+    collection = ConflictingCollection(
+        _stored_indexes(weights={"brand": 1, "model": 1}, partial_filter={"owner_uid": {"$exists": True}})
+    )
+    await CatalogRepository({"catalog": collection}, "catalog").ensure_indexes()
+    assert collection.dropped == ["search_text"]
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.db_monitoring import DbMetricsMiddleware, command_listener
+from app.core.metrics import REGISTRY, Histogram
+from app.routers import general as general_router
+
+
+def _app(server_timing: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: str):
+        # What pymongo reports for the commands this request would run.
+        command_listener.succeeded(SimpleNamespace(command_name="find", duration_micros=2_000))
+        command_listener.succeeded(SimpleNamespace(command_name="aggregate", duration_micros=5_000))
+        command_listener.succeeded(SimpleNamespace(command_name="hello", duration_micros=9_000))
+        return {"id": item_id}
+
+    app.add_middleware(DbMetricsMiddleware, server_timing=server_timing)
+    return app
+
+
+async def _get(app: FastAPI, path: str) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get(path)
+
+
+@pytest.mark.asyncio
+async def test_commands_are_attributed_to_the_route_template():
+    response = await _get(_app(server_timing=True), "/items/abc")
+
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith('db;dur=7.00;desc="2 commands", app;dur=')
+    assert response.headers["server-timing"].endswith('db-slowest;dur=5.00;desc="aggregate"')
+
+    rendered = REGISTRY.render()
+    assert 'http_request_db_commands_bucket{method="GET",route="/items/{item_id}",le="2"}' in rendered
+    assert 'http_request_db_slowest_command_seconds_sum{method="GET",route="/items/{item_id}"} 0.005' in rendered
+    assert 'mongodb_commands_total{command="aggregate",outcome="success"}' in rendered
+    assert 'command="hello"' not in rendered
+
+
+@pytest.mark.asyncio
+async def test_server_timing_is_off_by_default_and_unmatched_paths_share_a_label():
+    response = await _get(_app(server_timing=False), "/nowhere/42")
+
+    assert response.status_code == 404
+    assert "server-timing" not in response.headers
+    assert 'route="unmatched"' in REGISTRY.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency.", (0.1, 1.0), ("route",))
+    for value in (0.05, 0.5, 2.0):
+        histogram.observe(value, route="/a")
+
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1.0"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 2.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_metrics_endpoint_includes_cache_gauges():
+    body = general_router.metrics().body.decode()
+    assert '# TYPE app_cache_hits gauge' in body
+    assert 'app_cache_size{cache="catalog"}' in body
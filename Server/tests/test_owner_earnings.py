@@ -1,8 +1,94 @@
+import asyncio
+import random
 from datetime import datetime, timedelta, timezone
 
 import pytest
+from bson import ObjectId
 
+from app.repositories.earnings_rollup import replace_owner_earnings
+from app.repositories.ids import IdCodec
+from app.repositories.vehicle import list_vehicles_by_owner
 from app.routers import rents as rents_router
+from app.services import owner_earnings
+
+
+def _is_same_month(value: datetime | None, reference: datetime) -> bool:
+    return bool(value and value.year == reference.year and value.month == reference.month)
+
+
+async def _python_earnings_overview(db, *, owner_uid: str) -> dict:
+    """The original per-rent Python loop, kept as the reference the aggregations must agree with."""
+    rents = [IdCodec.decode(doc) for doc in await db["rents"].find({"owner_uid": owner_uid}).to_list(length=None)]
+    vehicles = await list_vehicles_by_owner(db, owner_uid=owner_uid)
+    vehicle_by_id = {vehicle["_id"]: vehicle for vehicle in vehicles}
+
+    now = datetime.now(timezone.utc)
+    last_month_reference = owner_earnings._previous_month(now)
+
+    this_month_amount = 0.0
+    this_month_bookings = 0
+    last_month_amount = 0.0
+    last_month_bookings = 0
+    all_time_amount = 0.0
+    all_time_bookings = 0
+    transactions: list[dict] = []
+
+    for rent in rents:
+        vehicle = vehicle_by_id.get(rent.get("vehicle_id"))
+        if not vehicle:
+            continue
+
+        booking_status = rent.get("booking_status", "pending")
+        if booking_status not in owner_earnings.ACTIVE_EARNING_STATUSES:
+            continue
+
+        start_date = owner_earnings._parse_datetime(rent.get("start_date"))
+        end_date = owner_earnings._parse_datetime(rent.get("end_date"))
+        if not start_date or not end_date:
+            continue
+
+        amount = owner_earnings._calculate_rent_amount(rent, float(vehicle.get("price", 0)))
+
+        transactions.append(
+            {
+                "rent_id": rent.get("_id", ""),
+                "vehicle_id": rent.get("vehicle_id", ""),
+                "vehicle_name": owner_earnings._vehicle_name(vehicle, rent.get("vehicle_id", "")),
+                "renter_uid": rent.get("renter_uid", ""),
+                "start_date": start_date,
+                "end_date": end_date,
+                "amount": amount,
+                "booking_status": booking_status,
+            }
+        )
+
+        if booking_status != owner_earnings.REALIZED_EARNING_STATUS:
+            continue
+
+        all_time_amount += amount
+        all_time_bookings += 1
+
+        if _is_same_month(end_date, now):
+            this_month_amount += amount
+            this_month_bookings += 1
+        elif _is_same_month(end_date, last_month_reference):
+            last_month_amount += amount
+            last_month_bookings += 1
+
+    transactions.sort(key=lambda item: item["end_date"], reverse=True)
+
+    return owner_earnings._build_overview(
+        this_month=(this_month_amount, this_month_bookings),
+        last_month=(last_month_amount, last_month_bookings),
+        all_time=(all_time_amount, all_time_bookings),
+        transactions=transactions[: owner_earnings.RECENT_TRANSACTIONS_LIMIT],
+    )
+
+
+async def _backfill(db, owner_uid):
+    # what scripts/rebuild_earnings_rollup.py --apply does for one owner
+    expected = await owner_earnings.compute_expected_rollups(db, owner_uid=owner_uid)
+    return await replace_owner_earnings(db, owner_uid=owner_uid, months=expected.get(owner_uid, {}))
 
 
 @pytest.mark.asyncio
@@ -85,3 +171,225 @@ async def test_owner_earnings_returns_summary_and_recent_transactions(fake_db):
         "rent_completed_this_month",
         "rent_completed_last_month",
     ]
+
+
+@pytest.mark.asyncio
+async def test_aggregation_engine_matches_python_implementation(fake_db):
+    rng = random.Random(7)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    object_vehicle_id = ObjectId()
+    vehicles = [
+        {"_id": "veh_str", "owner_uid": "owner_1", "price": 42.5, "brand": " Toyota ", "model": "Aqua"},
+        {"_id": object_vehicle_id, "owner_uid": "owner_1", "price": 19.99, "brand": "", "model": ""},
+        {"_id": "veh_foreign", "owner_uid": "owner_2", "price": 70.0, "brand": "Honda", "model": "Fit"},
+    ]
+    for vehicle in vehicles:
+        await fake_db["vehicles"].insert_one(vehicle)
+
+    vehicle_ids = ["veh_str", str(object_vehicle_id), "veh_foreign", "veh_missing"]
+    statuses = ["pending", "accepted", "cancelled", "completed", "completed"]
+    # more than the old 200-document cap, with every end date unique so ordering is deterministic
+    for index in range(260):
+        end_date = now - timedelta(days=rng.randint(-20, 80), minutes=index)
+        start_date = end_date - timedelta(hours=rng.randint(1, 24 * 6))
+        as_string = rng.random() < 0.5
+        await fake_db["rents"].insert_one(
+            {
+                "_id": f"rent_{index}",
+                "renter_uid": f"renter_{rng.randint(1, 9)}",
+                "owner_uid": "owner_1",
+                "vehicle_id": rng.choice(vehicle_ids),
+                "start_date": start_date.isoformat() if as_string else start_date,
+                "end_date": "not-a-date" if index % 37 == 0 else (end_date.isoformat() if as_string else end_date),
+                "booking_status": rng.choice(statuses),
+            }
+        )
+
+    expected = await _python_earnings_overview(fake_db, owner_uid="owner_1")
+    actual = await owner_earnings.aggregate_owner_earnings_overview(fake_db, owner_uid="owner_1")
+
+    assert expected["summary"]["all_time"]["bookings"] > 0
+    assert actual["summary"] == expected["summary"]
+    assert actual["transactions"] == expected["transactions"]
+
+
+@pytest.mark.asyncio
+async def test_rollup_tracks_completion_and_reversal(fake_db):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    await fake_db["vehicles"].insert_one({"_id": "veh_1", "owner_uid": "owner_1", "price": 50.0, "brand": "Toyota"})
+    await fake_db["rents"].insert_one(
+        {
+            "_id": "rent_1",
+            "renter_uid": "renter_1",
+            "owner_uid": "owner_1",
+            "vehicle_id": "veh_1",
+            "start_date": (now - timedelta(days=3)).isoformat(),
+            "end_date": now.isoformat(),
+            "booking_status": "accepted",
+        }
+    )
+
+    await _backfill(fake_db, "owner_1")
+    overview = await rents_router.get_owner_earnings(decoded_token={"uid": "owner_1"}, db=fake_db)
+    assert overview["summary"]["all_time"]["amount"] == 0.0
+    assert (await fake_db["owner_earnings_monthly"].find_one({"_id": "owner_1:total"}))["rebuilt_at"]
+
+    await rents_router.complete_rent_request("rent_1", decoded_token={"uid": "owner_1"}, db=fake_db)
+    await fake_db["vehicles"].update_one({"_id": "veh_1"}, {"$set": {"price": 999.0}})
+
+    overview = await rents_router.get_owner_earnings(decoded_token={"uid": "owner_1"}, db=fake_db)
+    assert (overview["summary"]["this_month"]["amount"], overview["summary"]["this_month"]["bookings"]) == (150.0, 1)
+    assert overview["summary"]["all_time"]["amount"] == 150.0
+    assert overview["transactions"][0]["amount"] == 150.0
+    assert await owner_earnings.find_earnings_rollup_discrepancies(fake_db) == []
+
+    completed = await fake_db["rents"].find_one({"_id": "rent_1"})
+    await owner_earnings.record_rent_status_change(
+        fake_db, before=completed, after={**completed, "booking_status": "cancelled"}, vehicle=None
+    )
+    total = await fake_db["owner_earnings_monthly"].find_one({"_id": "owner_1:total"})
+    assert (total["amount"], total["bookings"]) == (0.0, 0)
+
+    # the rent itself still says completed, so the checker reports the drift
+    drift = await owner_earnings.find_earnings_rollup_discrepancies(fake_db)
+    assert {item["bucket"] for item in drift} == {"total", f"{now.year:04d}-{now.month:02d}"}
+
+
+@pytest.mark.asyncio
+async def test_deleting_completed_rent_takes_it_out_of_rollup(fake_db):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    await fake_db["vehicles"].insert_one({"_id": "veh_1", "owner_uid": "owner_1", "price": 40.0})
+    await fake_db["rents"].insert_one(
+        {
+            "_id": "rent_1",
+            "renter_uid": "renter_1",
+            "owner_uid": "owner_1",
+            "vehicle_id": "veh_1",
+            "start_date": (now - timedelta(days=2)).isoformat(),
+            "end_date": now.isoformat(),
+            "booking_status": "accepted",
+        }
+    )
+    await rents_router.get_owner_earnings(decoded_token={"uid": "owner_1"}, db=fake_db)
+    await rents_router.complete_rent_request("rent_1", decoded_token={"uid": "owner_1"}, db=fake_db)
+
+    await rents_router.remove_rent("rent_1", decoded_token={"uid": "renter_1"}, db=fake_db)
+
+    total = await fake_db["owner_earnings_monthly"].find_one({"_id": "owner_1:total"})
+    assert (total["amount"], total["bookings"]) == (0.0, 0)
+    assert await owner_earnings.find_earnings_rollup_discrepancies(fake_db) == []
+
+
+@pytest.mark.asyncio
+async def test_reads_before_backfill_sum_rents_without_writing(fake_db):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    await fake_db["vehicles"].insert_one({"_id": "veh_1", "owner_uid": "owner_1", "price": 30.0})
+    await fake_db["rents"].insert_one(
+        {
+            "_id": "rent_1",
+            "renter_uid": "renter_1",
+            "owner_uid": "owner_1",
+            "vehicle_id": "veh_1",
+            "start_date": now - timedelta(days=2),
+            "end_date": now,
+            "booking_status": "completed",
+        }
+    )
+
+    overview = await rents_router.get_owner_earnings(decoded_token={"uid": "owner_1"}, db=fake_db)
+
+    assert (overview["summary"]["all_time"]["amount"], overview["summary"]["all_time"]["bookings"]) == (60.0, 1)
+    assert await fake_db["owner_earnings_monthly"].find({}).to_list(length=None) == []
+
+
+@pytest.mark.asyncio
+async def test_first_delta_for_new_owner_marks_rollup_so_reads_skip_the_rent_scan(fake_db):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    await fake_db["vehicles"].insert_one({"_id": "veh_1", "owner_uid": "owner_1", "price": 20.0})
+    await fake_db["rents"].insert_one(
+        {
+            "_id": "rent_1",
+            "renter_uid": "renter_1",
+            "owner_uid": "owner_1",
+            "vehicle_id": "veh_1",
+            "start_date": now - timedelta(days=2),
+            "end_date": now,
+            "booking_status": "accepted",
+        }
+    )
+
+    await rents_router.complete_rent_request("rent_1", decoded_token={"uid": "owner_1"}, db=fake_db)
+    assert (await fake_db["owner_earnings_monthly"].find_one({"_id": "owner_1:total"}))["rebuilt_at"]
+
+    # written behind the rollup's back: only the rent scan would count it
+    await fake_db["rents"].insert_one(
+        {
+            "_id": "rent_untracked",
+            "renter_uid": "renter_2",
+            "owner_uid": "owner_1",
+            "vehicle_id": "veh_1",
+            "start_date": now - timedelta(days=5),
+            "end_date": now - timedelta(days=4),
+            "booking_status": "completed",
+        }
+    )
+    overview = await rents_router.get_owner_earnings(decoded_token={"uid": "owner_1"}, db=fake_db)
+
+    assert (overview["summary"]["all_time"]["amount"], overview["summary"]["all_time"]["bookings"]) == (40.0, 1)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_rebuilds_upsert_buckets_and_drop_stale_ones(fake_db):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    await fake_db["vehicles"].insert_one({"_id": "veh_1", "owner_uid": "owner_1", "price": 25.0})
+    await fake_db["rents"].insert_one(
+        {
+            "_id": "rent_1",
+            "renter_uid": "renter_1",
+            "owner_uid": "owner_1",
+            "vehicle_id": "veh_1",
+            "start_date": (now - timedelta(days=1)).isoformat(),
+            "end_date": now.isoformat(),
+            "booking_status": "completed",
+        }
+    )
+    # a bucket for a month that no longer has completed rents
+    await owner_earnings.apply_earnings_delta(fake_db, owner_uid="owner_1", year=2001, month=1, amount=10.0, bookings=1)
+
+    fake_db.interleave = True
+    await asyncio.gather(_backfill(fake_db, "owner_1"), _backfill(fake_db, "owner_1"))
+    fake_db.interleave = False
+
+    docs = await fake_db["owner_earnings_monthly"].find({"owner_uid": "owner_1"}).to_list(length=None)
+    assert sorted(doc["_id"] for doc in docs) == sorted(["owner_1:total", f"owner_1:{now.year:04d}-{now.month:02d}"])
+    assert await owner_earnings.find_earnings_rollup_discrepancies(fake_db) == []
+
+
+@pytest.mark.asyncio
+async def test_recent_transactions_are_sorted_and_limited_before_the_vehicle_join(fake_db):
+    stages = [next(iter(stage)) for stage in owner_earnings.build_recent_transactions_pipeline(owner_uid="owner_1")]
+    assert stages[:3] == ["$match", "$sort", "$limit"]
+    assert stages.index("$lookup") > stages.index("$limit")
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    await fake_db["vehicles"].insert_one({"_id": "veh_1", "owner_uid": "owner_1", "price": 10.0})
+    for index in range(owner_earnings.RECENT_TRANSACTIONS_LIMIT + 3):
+        end = now - timedelta(days=index)
+        await fake_db["rents"].insert_one(
+            {
+                "_id": f"rent_{index:02d}",
+                "renter_uid": "renter_1",
+                "owner_uid": "owner_1",
+                "vehicle_id": "veh_1",
+                "start_date": end - timedelta(days=1),
+                "end_date": end,
+                "booking_status": "accepted" if index % 2 else "completed",
+            }
+        )
+    await _backfill(fake_db, "owner_1")
+
+    overview = await owner_earnings.rollup_owner_earnings_overview(fake_db, owner_uid="owner_1")
+
+    assert [t["rent_id"] for t in overview["transactions"]] == [
+        f"rent_{index:02d}" for index in range(owner_earnings.RECENT_TRANSACTIONS_LIMIT)
+    ]
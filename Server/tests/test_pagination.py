@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, Response
+
+from app.repositories import pagination
+from app.repositories import vehicle as vehicle_repo
+from app.routers import general as general_router
+from app.routers import rents as rents_router
+
+
+def test_cursor_round_trips_bson_values():
+    sort = [("start_date", -1), ("_id", -1)]
+    doc = {"start_date": datetime(2026, 4, 1, 9, tzinfo=timezone.utc), "_id": ObjectId()}
+
+    token = pagination.encode_cursor(doc, sort)
+    values = pagination.decode_cursor(token, sort)
+
+    assert values[0] == doc["start_date"]
+    assert values[1] == doc["_id"]
+    assert "=" not in token
+
+
+@pytest.mark.parametrize("token", ["not-a-cursor!", pagination.encode_cursor({"_id": "a"}, [("_id", 1)])])
+def test_decode_rejects_malformed_or_mismatched_cursor(token):
+    with pytest.raises(pagination.InvalidCursorError):
+        pagination.decode_cursor(token, [("price", 1), ("_id", 1)])
+
+
+@pytest.mark.asyncio
+async def test_public_vehicle_pages_cover_mixed_id_types_without_gaps(fake_db):
+    expected = []
+    for index in range(3):
+        await fake_db["vehicles"].insert_one({"_id": f"veh_{index}", "owner_uid": "o", "price": 10.0})
+        expected.append(f"veh_{index}")
+    for _ in range(4):
+        oid = ObjectId()
+        await fake_db["vehicles"].insert_one({"_id": oid, "owner_uid": "o", "price": 10.0})
+        expected.append(str(oid))
+
+    seen = []
+    cursor = None
+    while True:
+        page = await general_router.public_list_vehicles(response=Response(), db=fake_db, limit=2, cursor=cursor)
+        seen.extend(doc["_id"] for doc in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort", ["year_desc", "price_asc"])
+async def test_search_pages_keep_vehicles_missing_the_sort_field(fake_db, sort):
+    for index in range(6):
+        doc = {"_id": f"veh_{index}", "owner_uid": "o", "price": 10.0 + index, "year": 2010 + index}
+        if index % 2:
+            # a missing sort field sorts as null: last in descending order, first in ascending order
+            del doc["year" if sort == "year_desc" else "price"]
+        await fake_db["vehicles"].insert_one(doc)
+    await fake_db["vehicles"].insert_one({"_id": "veh_null", "owner_uid": "o", "price": None, "year": None})
+
+    seen = []
+    cursor = None
+    while True:
+        docs, cursor = await vehicle_repo.search_vehicles(fake_db, query={}, sort=sort, limit=2, cursor=cursor)
+        seen.extend(doc["_id"] for doc in docs)
+        if cursor is None:
+            break
+
+    assert sorted(seen) == sorted(["veh_null", *(f"veh_{index}" for index in range(6))])
+    assert len(seen) == 7
+
+
+@pytest.mark.asyncio
+async def test_owner_rents_page_newest_first_past_former_cap(fake_db):
+    start = datetime(2026, 1, 1, 9, tzinfo=timezone.utc)
+    for index in range(250):
+        await fake_db["rents"].insert_one(
+            {
+                "_id": f"rent_{index:03d}",
+                "renter_uid": "renter_1",
+                "owner_uid": "owner_1",
+                "vehicle_id": "veh_1",
+                # pairs of rents share a start date to exercise the _id tie-breaker
+                "start_date": start + timedelta(days=index // 2),
+                "end_date": start + timedelta(days=index // 2 + 1),
+                "booking_status": "pending",
+            }
+        )
+
+    seen = []
+    cursor = None
+    while True:
+        page = await rents_router.list_owner_rents(response=Response(), decoded_token={"uid": "owner_1"}, db=fake_db, limit=100, cursor=cursor)
+        seen.extend(doc["_id"] for doc in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 250
+    assert seen[:3] == ["rent_249", "rent_248", "rent_247"]
+    assert seen[-1] == "rent_000"
+
+
+@pytest.mark.asyncio
+async def test_list_endpoint_rejects_bad_cursor(fake_db):
+    with pytest.raises(HTTPException) as exc_info:
+        await rents_router.list_my_rents(decoded_token={"uid": "renter_1"}, db=fake_db, cursor="garbage")
+
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,152 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.catalog_cache import catalog_cache
+from app.routers import rents as rents_router
+from app.services.vehicle_facets import facet_cache
+from conftest import FakeClient
+
+
+async def _seed(fake_db, *, booking_status="pending", vehicle_owner="owner_1"):
+    await fake_db["vehicles"].insert_one({"_id": "veh_1", "owner_uid": vehicle_owner, "price": 100.0, "availability": True})
+    await fake_db["rents"].insert_one(
+        {
+            "_id": "rent_1",
+            "renter_uid": "renter_1",
+            "owner_uid": "owner_1",
+            "vehicle_id": "veh_1",
+            "start_date": "2026-04-01T09:00:00Z",
+            "end_date": "2026-04-03T09:00:00Z",
+            "booking_status": booking_status,
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_accept_takes_two_round_trips(fake_db):
+    await _seed(fake_db)
+
+    fake_db.round_trips = 0
+    updated = await rents_router.accept_rent_request("rent_1", decoded_token={"uid": "owner_1"}, db=fake_db)
+
+    assert updated["booking_status"] == "accepted"
+    assert fake_db.round_trips == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_accepts_only_one_wins(fake_db):
+    await _seed(fake_db)
+
+    results = await asyncio.gather(
+        *(rents_router.accept_rent_request("rent_1", decoded_token={"uid": "owner_1"}, db=fake_db) for _ in range(2)),
+        return_exceptions=True,
+    )
+
+    accepted = [r for r in results if isinstance(r, dict)]
+    rejected = [r for r in results if isinstance(r, HTTPException)]
+    assert len(accepted) == 1
+    assert [e.status_code for e in rejected] == [409]
+
+
+@pytest.mark.asyncio
+async def test_transition_not_allowed_from_current_status(fake_db):
+    await _seed(fake_db, booking_status="completed")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await rents_router.cancel_rent_request("rent_1", decoded_token={"uid": "owner_1"}, db=fake_db)
+
+    assert exc_info.value.status_code == 409
+    assert (await fake_db["rents"].find_one({"_id": "rent_1"}))["booking_status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_complete_books_earned_amount(fake_db):
+    await _seed(fake_db, booking_status="accepted")
+
+    updated = await rents_router.complete_rent_request("rent_1", decoded_token={"uid": "owner_1"}, db=fake_db)
+
+    assert (updated["booking_status"], updated["earned_amount"]) == ("completed", 200.0)
+    assert (await fake_db["rents"].find_one({"_id": "rent_1"}))["earned_amount"] == 200.0
+    assert (await fake_db["vehicles"].find_one({"_id": "veh_1"}))["availability"] is True
+
+
+@pytest.mark.parametrize("transactional", [False, True])
+@pytest.mark.asyncio
+async def test_rent_is_left_unchanged_when_vehicle_update_fails(fake_db, transactional):
+    if transactional:
+        fake_db.client = FakeClient(fake_db)
+    await _seed(fake_db, vehicle_owner="someone_else")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await rents_router.accept_rent_request("rent_1", decoded_token={"uid": "owner_1"}, db=fake_db)
+
+    assert exc_info.value.status_code == 404
+    assert (await fake_db["rents"].find_one({"_id": "rent_1"}))["booking_status"] == "pending"
+
+
+@pytest.mark.parametrize("transactional", [False, True])
+@pytest.mark.asyncio
+async def test_complete_books_amount_and_rollup_together(fake_db, transactional):
+    if transactional:
+        fake_db.client = FakeClient(fake_db)
+    await _seed(fake_db, booking_status="accepted")
+
+    await rents_router.complete_rent_request("rent_1", decoded_token={"uid": "owner_1"}, db=fake_db)
+
+    rent = await fake_db["rents"].find_one({"_id": "rent_1"})
+    assert (rent["booking_status"], rent["earned_amount"], rent["version"]) == ("completed", 200.0, 1)
+    total = await fake_db["owner_earnings_monthly"].find_one({"_id": "owner_1:total"})
+    assert (total["amount"], total["bookings"]) == (200.0, 1)
+
+
+@pytest.mark.parametrize("transactional", [False, True])
+@pytest.mark.asyncio
+async def test_complete_leaves_rent_and_rollup_untouched_when_vehicle_is_missing(fake_db, transactional):
+    if transactional:
+        fake_db.client = FakeClient(fake_db)
+    await _seed(fake_db, booking_status="accepted", vehicle_owner="someone_else")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await rents_router.complete_rent_request("rent_1", decoded_token={"uid": "owner_1"}, db=fake_db)
+
+    assert exc_info.value.status_code == 404
+    rent = await fake_db["rents"].find_one({"_id": "rent_1"})
+    assert (rent["booking_status"], "earned_amount" in rent) == ("accepted", False)
+    assert await fake_db["owner_earnings_monthly"].find_one({"_id": "owner_1:total"}) is None
+
+
+class CommitRecordingClient(FakeClient):
+    def __init__(self, db, events: list):
+        super().__init__(db)
+        self.events = events
+
+    async def start_session(self):
+        session = await super().start_session()
+        start_transaction = session.start_transaction
+
+        @asynccontextmanager
+        async def recording_transaction():
+            async with start_transaction() as inner:
+                yield inner
+            self.events.append("commit")
+
+        session.start_transaction = recording_transaction
+        return session
+
+
+@pytest.mark.parametrize("action", ["accept", "complete"])
+@pytest.mark.asyncio
+async def test_caches_are_invalidated_after_the_transaction_commits(fake_db, monkeypatch, action):
+    events = []
+    fake_db.client = CommitRecordingClient(fake_db, events)
+    monkeypatch.setattr(catalog_cache, "invalidate", lambda: events.append("catalog"))
+    monkeypatch.setattr(facet_cache, "invalidate", lambda: events.append("facets"))
+    await _seed(fake_db, booking_status="pending" if action == "accept" else "accepted")
+
+    handler = rents_router.accept_rent_request if action == "accept" else rents_router.complete_rent_request
+    await handler("rent_1", decoded_token={"uid": "owner_1"}, db=fake_db)
+
+    assert events == ["commit", "catalog", "facets"]
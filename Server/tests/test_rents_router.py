@@ -1,4 +1,5 @@
 import pytest
+from bson import ObjectId
 from fastapi import HTTPException
 
 from app.routers import rents as rents_router
@@ -7,6 +8,7 @@ from app.schemas import RentCreate
 
 @pytest.mark.asyncio
 async def test_create_rent_defaults_to_pending(fake_db):
+    await fake_db["vehicles"].insert_one({"_id": "veh_1", "owner_uid": "owner_1", "price": 100.0})
     payload = RentCreate(
         vehicle_id="veh_1",
         owner_uid="owner_1",
@@ -16,7 +18,8 @@ async def test_create_rent_defaults_to_pending(fake_db):
 
     created = await rents_router.create_rent_endpoint(payload, decoded_token={"uid": "renter_1"}, db=fake_db)
 
-    assert created["_id"] == "auto_1"
+    # the booking service picks the id up front so the calendar slot can refer to it
+    assert ObjectId.is_valid(created["_id"])
     assert created["booking_status"] == "pending"
 
 
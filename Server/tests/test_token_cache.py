@@ -0,0 +1,103 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from firebase_admin import auth
+
+from app.core import auth_deps, identity
+from app.core.token_cache import TokenCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_never_serves_token_past_exp():
+    clock = FakeClock()
+    cache = TokenCache(clock=clock)
+    cache.put("token-a", {"uid": "user_1", "exp": 1_060})
+
+    assert cache.get("token-a") == {"uid": "user_1", "exp": 1_060}
+    clock.now = 1_059.9
+    assert cache.get("token-a") is not None
+    clock.now = 1_060
+    assert cache.get("token-a") is None
+
+    cache.put("token-b", {"uid": "user_2", "exp": 900})
+    cache.put("token-c", {"uid": "user_3"})
+    assert cache.get("token-b") is None
+    assert cache.get("token-c") is None
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["expirations"]) == (0, 2, 3, 1)
+
+
+def test_cache_evicts_least_recently_used_and_caps_ttl():
+    clock = FakeClock()
+    cache = TokenCache(max_entries=2, max_ttl=30, clock=clock)
+    cache.put("a", {"uid": "a", "exp": 5_000})
+    cache.put("b", {"uid": "b", "exp": 5_000})
+    cache.get("a")
+    cache.put("c", {"uid": "c", "exp": 5_000})
+
+    assert cache.get("b") is None
+    assert cache.get("a")["uid"] == "a"
+    assert cache.stats()["evictions"] == 1
+
+    clock.now += 30
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_verifies_each_token_once(monkeypatch):
+    calls = []
+
+    def fake_verify(id_token):
+        calls.append(id_token)
+        if id_token == "bad":
+            raise auth.InvalidIdTokenError("bad signature")
+        return {"uid": "user_1", "exp": 4_102_444_800}
+
+    monkeypatch.setattr(auth_deps.auth, "verify_id_token", fake_verify)
+    monkeypatch.setattr(auth_deps, "token_cache", TokenCache())
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials="good")
+
+    first = await auth_deps.get_current_user(creds)
+    first["uid"] = "tampered"
+    second = await auth_deps.get_current_user(creds)
+
+    assert second["uid"] == "user_1"
+    assert calls == ["good"]
+
+    bad = HTTPAuthorizationCredentials(scheme="Bearer", credentials="bad")
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc:
+            await auth_deps.get_current_user(bad)
+        assert exc.value.status_code == 401
+    assert calls == ["good", "bad", "bad"]
+    assert auth_deps.token_cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_token_verification_does_not_queue_behind_admin_calls(monkeypatch):
+    monkeypatch.setenv("FIREBASE_ADMIN_MAX_WORKERS", "1")
+    monkeypatch.setattr(identity, "_admin_executor", None)
+    monkeypatch.setattr(auth_deps.auth, "verify_id_token", lambda id_token: {"uid": "user_1", "exp": 4_102_444_800})
+    monkeypatch.setattr(auth_deps, "token_cache", TokenCache())
+    release = threading.Event()
+    # a slow create_user holding the only admin worker
+    busy = asyncio.ensure_future(identity.run_admin_call(release.wait, 5))
+    try:
+        creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials="good")
+        decoded = await asyncio.wait_for(auth_deps.get_current_user(creds), timeout=2)
+        assert decoded["uid"] == "user_1"
+        assert not busy.done()
+    finally:
+        release.set()
+        await busy
+        await identity.close_identity_clients()
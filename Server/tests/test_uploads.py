@@ -0,0 +1,64 @@
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+
+from app.routers import users as users_router
+from app.services.image_variants import wait_for_pending_variants
+from app.services.uploads import UploadRejectedError, save_upload
+
+
+def make_upload(data: bytes, content_type: str = "image/png", size: int | None = None) -> UploadFile:
+    return UploadFile(
+        file=io.BytesIO(data),
+        size=size,
+        filename="photo.png",
+        headers=Headers({"content-type": content_type}),
+    )
+
+
+@pytest.mark.asyncio
+async def test_save_upload_streams_in_chunks_and_moves_into_place(tmp_path):
+    data = bytes(range(256)) * 40
+
+    written = await save_upload(make_upload(data), tmp_path / "photo.png", max_bytes=len(data), chunk_size=1000)
+
+    assert written == len(data)
+    assert (tmp_path / "photo.png").read_bytes() == data
+    assert [path.name for path in tmp_path.iterdir()] == ["photo.png"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("data", "size", "message"),
+    [
+        (b"x" * 2049, None, "Image exceeds 2048 byte limit."),
+        (b"x" * 10, 4096, "Image exceeds 2048 byte limit."),
+        (b"", None, "Uploaded file is empty."),
+    ],
+)
+async def test_save_upload_rejects_without_leaving_files(tmp_path, data, size, message):
+    with pytest.raises(UploadRejectedError, match=message):
+        await save_upload(make_upload(data, size=size), tmp_path / "photo.png", max_bytes=2048, chunk_size=512)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_avatar_rejects_oversized_image(fake_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(users_router, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(users_router, "MAX_AVATAR_SIZE_BYTES", 1024)
+    await fake_db["users"].insert_one({"_id": "user_1", "email": "u@example.com", "address": "a", "nic": "n", "phone": "p"})
+
+    with pytest.raises(HTTPException) as exc:
+        await users_router.upload_avatar(make_upload(b"x" * 1025), decoded_token={"uid": "user_1"}, db=fake_db)
+    assert exc.value.status_code == 400
+    assert list(tmp_path.iterdir()) == []
+
+    updated = await users_router.upload_avatar(make_upload(b"x" * 1024), decoded_token={"uid": "user_1"}, db=fake_db)
+    # not a decodable image, so the variant job fails and leaves only the upload itself
+    await wait_for_pending_variants()
+    stored = list(tmp_path.iterdir())
+    assert len(stored) == 1
+    assert updated["avatar_url"] == f"/uploads/{stored[0].name}"
@@ -0,0 +1,86 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+import httpx
+
+from app.core.uploads_static import IMMUTABLE_CACHE_CONTROL, UploadsStaticFiles
+
+UUID_NAME = "veh_1_0123456789abcdef0123456789abcdef"
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    (tmp_path / "vehicles").mkdir()
+    (tmp_path / "vehicles" / f"{UUID_NAME}.jpg").write_bytes(b"J" * 1000)
+    (tmp_path / "vehicles" / f"{UUID_NAME}_full.webp").write_bytes(b"W" * 300)
+    (tmp_path / "legacy.svg").write_bytes(b"<svg/>" * 50)
+    (tmp_path / "legacy.svg.gz").write_bytes(gzip.compress(b"<svg/>" * 50))
+    return tmp_path
+
+
+def make_client(directory, **kwargs) -> httpx.AsyncClient:
+    app = Starlette(routes=[Mount("/uploads", UploadsStaticFiles(directory=str(directory), **kwargs))])
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_uuid_named_upload_is_immutable_with_strong_etag_and_ranges(uploads):
+    client = make_client(uploads)
+    url = f"/uploads/vehicles/{UUID_NAME}.jpg"
+
+    response = await client.get(url, headers={"accept": "image/jpeg"})
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["vary"] == "Accept-Encoding"
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+
+    cached = await client.get(url, headers={"if-none-match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert cached.content == b""
+
+    partial = await client.get(url, headers={"range": "bytes=10-19", "if-range": etag})
+    assert partial.status_code == 206
+    assert partial.headers["content-range"] == "bytes 10-19/1000"
+    assert partial.content == b"J" * 10
+
+    stale = await client.get(url, headers={"range": "bytes=10-19", "if-range": '"other"'})
+    assert stale.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_serves_precompressed_variants_but_never_swaps_in_downscaled_webp(uploads):
+    client = make_client(uploads)
+
+    # `_full.webp` is capped at 1600px, so the original URL must keep serving the original bytes.
+    original = await client.get(f"/uploads/vehicles/{UUID_NAME}.jpg", headers={"accept": "image/avif,image/webp,*/*"})
+    assert original.headers["content-type"] == "image/jpeg"
+    assert original.content == b"J" * 1000
+
+    webp = await client.get(f"/uploads/vehicles/{UUID_NAME}_full.webp", headers={"accept": "image/webp"})
+    assert webp.headers["content-type"] == "image/webp"
+    assert webp.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert webp.content == b"W" * 300
+
+    svg = await client.get("/uploads/legacy.svg", headers={"accept-encoding": "gzip"})
+    assert svg.headers["content-encoding"] == "gzip"
+    assert svg.headers["content-type"].startswith("image/svg+xml")
+    assert svg.headers["cache-control"] == "public, no-cache"
+    assert svg.content == b"<svg/>" * 50
+
+    assert (await client.get("/uploads/missing.jpg")).status_code == 404
+    assert (await client.post(f"/uploads/vehicles/{UUID_NAME}.jpg")).status_code == 405
+
+
+@pytest.mark.asyncio
+async def test_accel_redirect_hands_body_to_proxy(uploads):
+    client = make_client(uploads, accel_redirect_prefix="/_uploads/")
+
+    response = await client.get(f"/uploads/vehicles/{UUID_NAME}.jpg")
+
+    assert response.headers["x-accel-redirect"] == f"/_uploads/vehicles/{UUID_NAME}.jpg"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.content == b""
@@ -1,5 +1,5 @@
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 
 from app.routers import users as users_router
 from app.schemas import UserProfileBase
@@ -14,7 +14,7 @@ async def test_read_current_user_success(fake_db):
     await fake_db["users"].insert_one(profile)
 
     decoded_token = {"uid": uid}
-    result = await users_router.read_current_user(decoded_token=decoded_token, db=fake_db)
+    result = await users_router.read_current_user(response=Response(), decoded_token=decoded_token, db=fake_db)
     # The router returns the raw dict; Pydantic response_model mapping is exercised by FastAPI runtime,
     # but we ensure the dict contains expected keys
     assert result["_id"] == uid
@@ -25,7 +25,7 @@ async def test_read_current_user_success(fake_db):
 async def test_read_current_user_not_found_raises(fake_db):
     decoded_token = {"uid": "missing"}
     with pytest.raises(HTTPException):
-        await users_router.read_current_user(decoded_token=decoded_token, db=fake_db)
+        await users_router.read_current_user(response=Response(), decoded_token=decoded_token, db=fake_db)
 
 
 @pytest.mark.asyncio
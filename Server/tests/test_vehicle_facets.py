@@ -0,0 +1,92 @@
+import pytest
+
+from app.core.ttl_cache import TTLCache
+from app.routers import general as general_router
+from app.services.vehicle_facets import facet_cache_key
+
+FACET_DEFAULTS = {
+    "q": None,
+    "type": None,
+    "fuel": None,
+    "transmission": None,
+    "min_price": None,
+    "max_price": None,
+    "min_seats": None,
+    "location": None,
+    "availability": None,
+}
+
+
+async def _seed_vehicles(fake_db):
+    vehicles = [
+        ("v1", "SUV", "Diesel", "automatic", 80.0, 7, "Colombo 07"),
+        ("v2", "Sedan", "Petrol", "manual", 40.0, 5, "Kandy"),
+        ("v3", "SUV", "Hybrid", "automatic", 60.0, 5, "colombo"),
+        ("v4", "Hatchback", "Petrol", "automatic", 20.0, 4, "Colombo"),
+        ("v5", "SUV", "Diesel", "manual", 320.0, 7, "Galle"),
+    ]
+    for vid, type_, fuel, transmission, price, seats, location in vehicles:
+        await fake_db["vehicles"].insert_one(
+            {
+                "_id": vid,
+                "owner_uid": "owner_1",
+                "type": type_,
+                "fuel": fuel,
+                "transmission": transmission,
+                "price": price,
+                "seats": seats,
+                "location": location,
+                "location_lc": location.lower(),
+                "availability": True,
+            }
+        )
+
+
+@pytest.mark.asyncio
+async def test_facets_count_each_field_without_its_own_filter(fake_db):
+    await _seed_vehicles(fake_db)
+
+    params = {**FACET_DEFAULTS, "type": ["SUV"], "location": "colombo"}
+    facets = await general_router.public_vehicle_facets(db=fake_db, **params)
+
+    assert facets["total"] == 2
+    # `type` ignores the type filter but keeps the location one
+    assert facets["type"] == [{"value": "SUV", "count": 2}, {"value": "Hatchback", "count": 1}]
+    assert facets["fuel"] == [{"value": "Diesel", "count": 1}, {"value": "Hybrid", "count": 1}]
+    assert facets["seats"] == [{"value": 5, "count": 1}, {"value": 7, "count": 1}]
+    assert facets["price"] == [{"min": 50, "max": 75, "count": 1}, {"min": 75, "max": 100, "count": 1}]
+
+    everything = await general_router.public_vehicle_facets(db=fake_db, **FACET_DEFAULTS)
+    assert everything["total"] == 5
+    assert everything["price"][0] == {"min": 0, "max": 25, "count": 1}
+    assert everything["price"][-1] == {"min": 300, "max": None, "count": 1}
+
+
+@pytest.mark.asyncio
+async def test_facets_are_cached_per_normalized_filter(fake_db):
+    await _seed_vehicles(fake_db)
+
+    first = await general_router.public_vehicle_facets(db=fake_db, **{**FACET_DEFAULTS, "fuel": ["Petrol", "Diesel"]})
+    fake_db.round_trips = 0
+    again = await general_router.public_vehicle_facets(
+        db=fake_db, **{**FACET_DEFAULTS, "fuel": ["Diesel", "Petrol", "Diesel"]}
+    )
+
+    assert again == first
+    assert fake_db.round_trips == 0
+    assert facet_cache_key({"location": {"$regex": "^Colombo", "$options": "i"}}, " Toyota  SUV") == facet_cache_key(
+        {"location": {"$regex": "^colombo", "$options": "i"}}, "toyota suv"
+    )
+
+
+def test_ttl_cache_expires_and_evicts():
+    now = [0.0]
+    cache = TTLCache(ttl=10, max_entries=2, clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    now[0] = 10
+    assert cache.get("a") is None
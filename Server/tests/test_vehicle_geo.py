@@ -0,0 +1,52 @@
+import pytest
+
+from app.routers import general as general_router
+from app.routers import vehicles as vehicles_router
+from app.schemas import VehicleCreate
+from app.services.geocoding import geocode_location
+
+NEAR_DEFAULTS = {"radius_km": 10, "availability": None, "limit": 20}
+
+
+def test_geocode_location_matches_free_text():
+    assert geocode_location("Colombo 07") == {"type": "Point", "coordinates": [79.8612, 6.9271]}
+    assert geocode_location("Galle Fort, Galle")["coordinates"] == [80.2210, 6.0535]
+    assert geocode_location("  NUWARA-ELIYA ")["coordinates"] == [80.7891, 6.9497]
+    assert geocode_location("Atlantis") is None
+    assert geocode_location(None) is None
+
+
+@pytest.mark.asyncio
+async def test_near_returns_closest_first_within_radius(fake_db):
+    vehicles = [
+        ("colombo", [79.8612, 6.9271], True),
+        ("dehiwala", [79.8650, 6.8511], True),  # ~1km from the search point, Colombo ~7.5km
+        ("kandy", [80.6337, 7.2906], True),  # ~95km away
+        ("negombo_unavailable", [79.8358, 7.2083], False),
+        ("no_geo", None, True),
+    ]
+    for vid, coordinates, availability in vehicles:
+        doc = {"_id": vid, "owner_uid": "owner_1", "availability": availability}
+        if coordinates:
+            doc["geo"] = {"type": "Point", "coordinates": coordinates}
+        await fake_db["vehicles"].insert_one(doc)
+
+    result = await general_router.public_vehicles_near(db=fake_db, lat=6.86, lng=79.86, **NEAR_DEFAULTS)
+    assert [d["_id"] for d in result["items"]] == ["dehiwala", "colombo"]
+    assert result["items"][0]["distance_m"] < result["items"][1]["distance_m"]
+
+    wide = {**NEAR_DEFAULTS, "radius_km": 200, "availability": True, "limit": 3}
+    result = await general_router.public_vehicles_near(db=fake_db, lat=6.86, lng=79.86, **wide)
+    assert [d["_id"] for d in result["items"]] == ["dehiwala", "colombo", "kandy"]
+
+
+@pytest.mark.asyncio
+async def test_create_vehicle_geocodes_location(fake_db):
+    payload = VehicleCreate(
+        type="car", fuel="petrol", transmission="automatic", price=30.0, availability=True,
+        location="Kandy", brand="Toyota", year=2020, model="Corolla",
+    )
+
+    created = await vehicles_router.create_vehicle_endpoint(payload, decoded_token={"uid": "owner_1"}, db=fake_db)
+
+    assert created["geo"] == {"type": "Point", "coordinates": [80.6337, 7.2906]}
@@ -1,4 +1,5 @@
 import pytest
+from bson import ObjectId
 
 from app.repositories import vehicle as vehicle_repo
 
@@ -26,6 +27,7 @@ async def test_create_get_update_delete_vehicle(fake_db):
     assert created is not None
     assert created["_id"] == vid
     assert created["owner_uid"] == owner
+    assert created["location_lc"] == "colombo"
 
     # Get by id
     fetched = await vehicle_repo.get_vehicle_by_id(fake_db, vehicle_id=vid)
@@ -41,6 +43,8 @@ async def test_create_get_update_delete_vehicle(fake_db):
     updated = await vehicle_repo.update_vehicle(fake_db, owner_uid=owner, vehicle_id=vid, update_fields={"price": 45.0})
     assert updated is not None
     assert updated["price"] == 45.0
+    moved = await vehicle_repo.update_vehicle(fake_db, owner_uid=owner, vehicle_id=vid, update_fields={"location": " Kandy "})
+    assert moved["location_lc"] == "kandy"
 
     # Delete
     deleted = await vehicle_repo.delete_vehicle(fake_db, owner_uid=owner, vehicle_id=vid)
@@ -61,3 +65,28 @@ async def test_update_nonexistent_vehicle_returns_none(fake_db):
 async def test_delete_nonexistent_vehicle_returns_false(fake_db):
     res = await vehicle_repo.delete_vehicle(fake_db, owner_uid="nope", vehicle_id="nope")
     assert res is False
+
+
+@pytest.mark.asyncio
+async def test_writes_cost_one_round_trip(fake_db):
+    oid = ObjectId()
+    await fake_db["vehicles"].insert_one({"_id": oid, "owner_uid": "owner_1", "price": 10.0})
+    payload = {"vehicleid": "veh_1", "price": 30.0, "brand": "Toyota"}
+
+    fake_db.round_trips = 0
+    created = await vehicle_repo.create_vehicle(fake_db, owner_uid="owner_1", vehicle_doc=payload)
+    assert created["price"] == 30.0
+    assert fake_db.round_trips == 1
+
+    # ObjectId-keyed documents are matched by their hex string without a second query
+    fake_db.round_trips = 0
+    updated = await vehicle_repo.update_vehicle(fake_db, owner_uid="owner_1", vehicle_id=str(oid), update_fields={"price": 12.0})
+    # a document written before versioning gets its first version on its first write
+    assert updated == {"_id": str(oid), "owner_uid": "owner_1", "price": 12.0, "version": 1}
+    assert fake_db.round_trips == 1
+
+    fake_db.round_trips = 0
+    assert await vehicle_repo.get_vehicle_by_id(fake_db, vehicle_id=str(oid)) is not None
+    assert await vehicle_repo.update_vehicle(fake_db, owner_uid="other", vehicle_id=str(oid), update_fields={"price": 1}) is None
+    assert await vehicle_repo.delete_vehicle(fake_db, owner_uid="owner_1", vehicle_id=str(oid)) is True
+    assert fake_db.round_trips == 3
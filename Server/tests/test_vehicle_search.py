@@ -0,0 +1,236 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.repositories import vehicle as vehicle_repo
+from app.routers import general as general_router
+from app.services import availability
+
+
+SEARCH_DEFAULTS = {
+    "q": None,
+    "type": None,
+    "fuel": None,
+    "transmission": None,
+    "min_price": None,
+    "max_price": None,
+    "min_seats": None,
+    "location": None,
+    "availability": None,
+    "available_from": None,
+    "available_to": None,
+    "sort": "newest",
+    "limit": 24,
+    "cursor": None,
+}
+
+
+async def _seed_vehicles(fake_db):
+    vehicles = [
+        ("v1", "SUV", "Diesel", "automatic", 80.0, 7, "Colombo 07", True, 2021),
+        ("v2", "Sedan", "Petrol", "manual", 40.0, 5, "Kandy", True, 2018),
+        ("v3", "SUV", "Hybrid", "automatic", 60.0, 5, "colombo", False, 2022),
+        ("v4", "Hatchback", "Petrol", "automatic", 25.0, 4, "Galle", True, 2016),
+        ("v5", "SUV", "Diesel", "manual", 55.0, 7, "Negombo", True, 2019),
+    ]
+    for vid, type_, fuel, transmission, price, seats, location, availability, year in vehicles:
+        await fake_db["vehicles"].insert_one(
+            {
+                "_id": vid,
+                "owner_uid": "owner_1",
+                "type": type_,
+                "fuel": fuel,
+                "transmission": transmission,
+                "price": price,
+                "seats": seats,
+                "availability": availability,
+                "location": location,
+                "location_lc": location.lower(),
+                "brand": "Toyota",
+                "year": year,
+                "model": "Model",
+            }
+        )
+
+
+def test_build_vehicle_search_query_translates_filters():
+    query = vehicle_repo.build_vehicle_search_query(
+        types=["SUV"],
+        fuels=["Diesel", "Hybrid"],
+        min_price=10,
+        max_price=90,
+        min_seats=5,
+        location=" Colombo ",
+        availability=True,
+    )
+
+    assert query == {
+        "type": {"$in": ["SUV"]},
+        "fuel": {"$in": ["Diesel", "Hybrid"]},
+        "price": {"$gte": 10, "$lte": 90},
+        "seats": {"$gte": 5},
+        "location_lc": {"$regex": "^colombo"},
+        "availability": True,
+    }
+    assert vehicle_repo.build_vehicle_search_query() == {}
+
+
+@pytest.mark.asyncio
+async def test_search_filters_sorts_and_pages(fake_db):
+    await _seed_vehicles(fake_db)
+
+    params = {**SEARCH_DEFAULTS, "type": ["SUV"], "max_price": 70.0, "sort": "price_asc"}
+    page = await general_router.public_search_vehicles(db=fake_db, **params)
+    assert [d["_id"] for d in page["items"]] == ["v5", "v3"]
+    assert page["next_cursor"] is None
+
+    params = {**SEARCH_DEFAULTS, "location": "colombo", "min_seats": 5, "sort": "year_desc"}
+    page = await general_router.public_search_vehicles(db=fake_db, **params)
+    assert [d["_id"] for d in page["items"]] == ["v3", "v1"]
+
+    params = {**SEARCH_DEFAULTS, "availability": True, "sort": "price_desc", "limit": 2}
+    first = await general_router.public_search_vehicles(db=fake_db, **params)
+    assert [d["_id"] for d in first["items"]] == ["v1", "v5"]
+    second = await general_router.public_search_vehicles(db=fake_db, **{**params, "cursor": first["next_cursor"]})
+    assert [d["_id"] for d in second["items"]] == ["v2", "v4"]
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_search_rejects_inverted_price_range(fake_db):
+    params = {**SEARCH_DEFAULTS, "min_price": 50.0, "max_price": 10.0}
+    with pytest.raises(HTTPException) as exc_info:
+        await general_router.public_search_vehicles(db=fake_db, **params)
+
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_excludes_vehicles_booked_in_range(fake_db):
+    await _seed_vehicles(fake_db)
+    bookings = [
+        ("v1", "2026-06-01", "2026-06-04", "accepted"),  # overlaps the start
+        ("v2", "2026-06-06", "2026-06-09", "pending"),  # overlaps the end
+        ("v3", "2026-06-01", "2026-06-03", "accepted"),  # ends as the range starts
+        ("v4", "2026-06-04", "2026-06-05", "cancelled"),  # cancelled bookings don't block
+    ]
+    for index, (vid, start, end, booking_status) in enumerate(bookings):
+        await fake_db["rents"].insert_one(
+            {
+                "_id": f"rent_{index}",
+                "vehicle_id": vid,
+                "start_date": datetime.fromisoformat(start).replace(tzinfo=timezone.utc),
+                "end_date": datetime.fromisoformat(end).replace(tzinfo=timezone.utc),
+                "booking_status": booking_status,
+            }
+        )
+
+    params = {
+        **SEARCH_DEFAULTS,
+        "available_from": datetime(2026, 6, 3),
+        "available_to": datetime(2026, 6, 7, tzinfo=timezone.utc),
+        "sort": "price_asc",
+        "limit": 1,
+    }
+    seen, cursor = [], None
+    while True:
+        page = await general_router.public_search_vehicles(db=fake_db, **{**params, "cursor": cursor})
+        seen += [d["_id"] for d in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["v4", "v5", "v3"]
+
+    with pytest.raises(HTTPException) as exc_info:
+        await general_router.public_search_vehicles(db=fake_db, **{**SEARCH_DEFAULTS, "available_from": datetime(2026, 6, 3)})
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_availability_search_caps_batches_per_request(fake_db):
+    for index in range(20):
+        await fake_db["vehicles"].insert_one(
+            {"_id": f"v{index:02d}", "owner_uid": "owner_1", "type": "SUV", "price": float(index), "availability": True}
+        )
+        if index < 19:
+            await fake_db["rents"].insert_one(
+                {
+                    "_id": f"rent_{index}",
+                    "vehicle_id": f"v{index:02d}",
+                    "start_date": datetime(2026, 6, 1, tzinfo=timezone.utc),
+                    "end_date": datetime(2026, 6, 9, tzinfo=timezone.utc),
+                    "booking_status": "accepted",
+                }
+            )
+
+    params = {
+        **SEARCH_DEFAULTS,
+        "available_from": datetime(2026, 6, 3),
+        "available_to": datetime(2026, 6, 7, tzinfo=timezone.utc),
+        "sort": "price_asc",
+        "limit": 1,
+    }
+    pages, cursor = [], None
+    while True:
+        fake_db.round_trips = 0
+        page = await general_router.public_search_vehicles(db=fake_db, **{**params, "cursor": cursor})
+        # one vehicle batch and one booking check per batch, whatever the catalog size
+        assert fake_db.round_trips <= 2 * availability.MAX_AVAILABILITY_BATCHES
+        pages.append([d["_id"] for d in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages[0] == [] and [vid for items in pages for vid in items] == ["v19"]
+
+
+@pytest.mark.asyncio
+async def test_text_search_ranks_by_relevance_and_pages(fake_db):
+    await vehicle_repo.ensure_vehicle_indexes(fake_db)
+    vehicles = [
+        ("t1", "Toyota", "Prius", "Colombo 03", "automatic", True),
+        ("t2", "Toyota", "Corolla", "Kandy", "manual", True),
+        ("t3", "Honda", "Vezel", "Colombo", "automatic", True),
+        ("t4", "Suzuki", "Alto", "Galle", "manual", True),
+        ("t5", "Toyota", "Aqua", "Colombo", "automatic", False),
+    ]
+    for vid, brand, model, location, transmission, availability in vehicles:
+        await fake_db["vehicles"].insert_one(
+            {
+                "_id": vid,
+                "owner_uid": "owner_1",
+                "brand": brand,
+                "model": model,
+                "location": location,
+                "transmission": transmission,
+                "type": "Sedan",
+                "fuel": "Petrol",
+                "price": 50.0,
+                "availability": availability,
+            }
+        )
+
+    params = {**SEARCH_DEFAULTS, "q": " toyota colombo automatic ", "sort": "price_asc", "limit": 2}
+    seen, cursor = [], None
+    while True:
+        page = await general_router.public_search_vehicles(db=fake_db, **{**params, "cursor": cursor})
+        seen += [d["_id"] for d in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    # all three tokens, then brand alone outranks town + transmission; Suzuki matches nothing
+    assert seen == ["t1", "t5", "t2", "t3"]
+
+    page = await general_router.public_search_vehicles(db=fake_db, **{**params, "availability": True, "limit": 24})
+    assert [d["_id"] for d in page["items"]] == ["t1", "t2", "t3"]
+
+
+@pytest.mark.asyncio
+async def test_ensure_vehicle_indexes_is_idempotent(fake_db):
+    first = await vehicle_repo.ensure_vehicle_indexes(fake_db)
+    second = await vehicle_repo.ensure_vehicle_indexes(fake_db)
+
+    assert first == second
+    assert "search_type_fuel_price" in fake_db["vehicles"].indexes
+    assert len(fake_db["vehicles"].indexes) == len(vehicle_repo.VEHICLE_INDEXES)
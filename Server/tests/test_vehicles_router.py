@@ -1,5 +1,5 @@
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 
 from app.routers import vehicles as vehicles_router
 from app.schemas import VehicleCreate, VehicleUpdate
@@ -28,9 +28,10 @@ async def test_create_and_list_my_vehicles(fake_db):
     assert created["owner_uid"] == owner
 
     # list
-    docs = await vehicles_router.list_my_vehicles(decoded_token={"uid": owner}, db=fake_db)
-    assert isinstance(docs, list)
-    assert any(d.get("_id") == "rv1" for d in docs)
+    page = await vehicles_router.list_my_vehicles(decoded_token={"uid": owner}, db=fake_db)
+    assert isinstance(page["items"], list)
+    assert any(d.get("_id") == "rv1" for d in page["items"])
+    assert page["next_cursor"] is None
 
 
 @pytest.mark.asyncio
@@ -41,12 +42,12 @@ async def test_get_vehicle_and_ownership_checks(fake_db):
     await fake_db["vehicles"].insert_one(doc)
 
     # success when owner matches
-    res = await vehicles_router.get_vehicle(vehicle_id=vid, decoded_token={"uid": owner}, db=fake_db)
+    res = await vehicles_router.get_vehicle(response=Response(), vehicle_id=vid, decoded_token={"uid": owner}, db=fake_db)
     assert res["_id"] == vid
 
     # forbidden when owner mismatches
     with pytest.raises(HTTPException):
-        await vehicles_router.get_vehicle(vehicle_id=vid, decoded_token={"uid": "other"}, db=fake_db)
+        await vehicles_router.get_vehicle(response=Response(), vehicle_id=vid, decoded_token={"uid": "other"}, db=fake_db)
 
 
 @pytest.mark.asyncio